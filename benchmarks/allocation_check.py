@@ -0,0 +1,102 @@
+# benchmarks/allocation_check.py
+#
+# Runs the frame path (pooled video decode, processing, packetization and
+# sending) under AllocationGuard and fails if a frame allocates anything
+# frame-sized once warmed up. Every configuration streams to a local UDP
+# socket that is never read.
+#
+#   python benchmarks/allocation_check.py [--frames 100]
+
+import argparse
+import os
+import socket
+import sys
+import tempfile
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.capture.video_file_capture import VideoFileCapture  # noqa: E402
+from src.managers.streamer_manager import StreamerManager  # noqa: E402
+from src.utils.allocation_guard import AllocationGuard  # noqa: E402
+from src.utils.frame_pool import FramePool  # noqa: E402
+
+
+def write_video(path: str, frames: int, width: int, height: int) -> None:
+    writer = cv2.VideoWriter(
+        path, cv2.VideoWriter_fourcc(*"MJPG"), 30, (width, height)
+    )
+    for index in range(frames):
+        frame = np.full((height, width, 3), index * 7 % 256, np.uint8)
+        cv2.circle(frame, (index * 13 % width, height // 2), height // 4, (0, 0, 255), -1)
+        writer.write(frame)
+    writer.release()
+
+
+def configurations(port: int) -> dict:
+    device = {"host": "127.0.0.1", "port": port, "width": 64, "height": 64}
+    return {
+        "dnrgb": ([dict(device, protocol="dnrgb")], {}),
+        "drgb": ([dict(device, protocol="drgb", width=16, height=16)], {}),
+        "ddp": ([dict(device, protocol="ddp")], {}),
+        "e131": ([dict(device, protocol="e131")], {}),
+        "dnrgb delta": ([dict(device, protocol="dnrgb", delta=True)], {}),
+        "ledmap": ([dict(device, protocol="dnrgb", ledmap="serpentine")], {}),
+        "4 devices": ([dict(device, protocol="dnrgb", crop=[i, 0, 0, 0]) for i in range(4)], {}),
+        "4 devices, pool": (
+            [dict(device, protocol="dnrgb", crop=[i, 0, 0, 0]) for i in range(4)],
+            {"workers": 4},
+        ),
+        "sync commit": (
+            [dict(device, protocol="ddp"), dict(device, protocol="dnrgb")],
+            {"sync_commit": True},
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--source", default="1280x720", help="video frame WxH")
+    args = parser.parse_args()
+
+    width, height = (int(value) for value in args.source.split("x"))
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(("127.0.0.1", 0))
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as directory:
+        video = os.path.join(directory, "source.avi")
+        write_video(video, 30, width, height)
+
+        for name, (configs, options) in configurations(sink.getsockname()[1]).items():
+            manager = StreamerManager(configs, **options)
+            capture = VideoFileCapture(video, loop=True)
+            pool = FramePool()
+            guard = AllocationGuard(
+                limit_bytes=4096 + 2048 * len(manager.active_streamers)
+            )
+            try:
+                for _ in range(args.frames):
+                    with guard.frame():
+                        frame = capture.read(pool)
+                        manager.process_and_send_frame(frame)
+                        pool.release(frame)
+                result = f"ok, peak {guard.max_peak} bytes"
+            except AssertionError as e:
+                failures += 1
+                result = f"FAILED: {e}"
+            finally:
+                guard.stop()
+                capture.stop()
+                manager.close_all()
+            print(f"{name:>16}: {result} ({pool.allocated} pooled buffers)")
+
+    sink.close()
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
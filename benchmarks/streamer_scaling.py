@@ -0,0 +1,88 @@
+# benchmarks/streamer_scaling.py
+#
+# Measures how StreamerManager frame time scales with the number of devices,
+# sequential versus the parallel worker pool. Every device is a 64x64 DNRGB
+# streamer sending to a local UDP socket that is never read, so the numbers
+# cover processing and packetization, not a real network.
+#
+#   python benchmarks/streamer_scaling.py [--frames 100] [--workers 8]
+
+import argparse
+import os
+import socket
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.managers.streamer_manager import StreamerManager  # noqa: E402
+
+DEVICE_COUNTS = [1, 2, 4, 8, 16, 32]
+
+
+def build_manager(device_count: int, port: int, workers: int) -> StreamerManager:
+    configs = [
+        {
+            "host": "127.0.0.1",
+            "port": port,
+            "protocol": "dnrgb",
+            "width": 64,
+            "height": 64,
+            # a different crop per device so nothing can be shared
+            "crop": [index, 0, 0, 0],
+            "scale": "fill",
+            "interpolation": "smooth",
+            "gamma": 0.5,
+        }
+        for index in range(device_count)
+    ]
+    return StreamerManager(configs, workers=workers)
+
+
+def time_frames(manager: StreamerManager, frame: np.ndarray, frames: int) -> float:
+    # warm up buffers and the worker pool
+    for _ in range(5):
+        manager.process_and_send_frame(frame)
+    start = time.perf_counter()
+    for _ in range(frames):
+        manager.process_and_send_frame(frame)
+    return (time.perf_counter() - start) / frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--source", default="1920x1080", help="source frame WxH")
+    args = parser.parse_args()
+
+    width, height = (int(value) for value in args.source.split("x"))
+    frame = np.random.randint(0, 256, (height, width, 3), np.uint8)
+
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(("127.0.0.1", 0))
+    port = sink.getsockname()[1]
+
+    print(f"source {width}x{height}, {args.frames} frames, {args.workers} workers")
+    print(f"{'devices':>8} {'sequential ms':>14} {'parallel ms':>12} {'speedup':>8}")
+    for device_count in DEVICE_COUNTS:
+        results = []
+        for workers in (0, args.workers):
+            manager = build_manager(device_count, port, workers)
+            try:
+                results.append(time_frames(manager, frame, args.frames))
+            finally:
+                manager.close_all()
+        sequential, parallel = results
+        print(
+            f"{device_count:>8} {sequential * 1000:>14.3f} {parallel * 1000:>12.3f}"
+            f" {sequential / parallel:>7.2f}x"
+        )
+
+    sink.close()
+
+
+if __name__ == "__main__":
+    main()
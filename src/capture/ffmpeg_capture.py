@@ -0,0 +1,181 @@
+# src/capture/ffmpeg_capture.py
+
+import logging
+import math
+import shutil
+import subprocess
+import tempfile
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+from src.utils.frame_pool import FramePool
+
+# decoded frames keep this much more resolution than the LEDs need, so
+# scaling down to the LEDs still averages over several source pixels
+DECODE_OVERSAMPLE = 2
+
+
+def decode_resolution(source_size: Tuple[int, int], led_size: Tuple[int, int]) -> Tuple[int, int]:
+    """
+    (width, height) to decode a `source_size` video at so that it keeps its
+    aspect ratio and covers `led_size` times DECODE_OVERSAMPLE in both
+    directions. Never larger than the source.
+    """
+    factor = max(
+        led_size[0] * DECODE_OVERSAMPLE / source_size[0],
+        led_size[1] * DECODE_OVERSAMPLE / source_size[1],
+    )
+    if factor >= 1:
+        return source_size
+    return (
+        max(1, math.ceil(source_size[0] * factor)),
+        max(1, math.ceil(source_size[1] * factor)),
+    )
+
+
+def decode_filter(size: Tuple[int, int], source_fps: float, max_fps: float = 0) -> str:
+    """
+    FFmpeg filter chain that scales to `size` (width, height). With
+    `max_fps` below the video's rate, the fps filter drops the frames in
+    between first, so they are never scaled, converted or piped.
+    """
+    filters = []
+    if 0 < max_fps < source_fps:
+        filters.append(f"fps={max_fps:g}")
+    filters.append(f"scale={size[0]}:{size[1]}:flags=area")
+    return ",".join(filters)
+
+
+class FFmpegVideoCapture:
+    """
+    Reads a video file through an FFmpeg process that decodes with all
+    cores and scales every frame down to about the LED resolution, see
+    decode_resolution, before handing it over as raw BGR.
+
+    With `max_fps`, the video comes out at no more than that many frames
+    per second of video time, see decode_filter, and `fps` is that rate.
+    Set it to the stream rate divided by the playback speed, and the frames
+    TimedPlayback would skip are not produced at all. FFmpeg still decodes
+    them, since video frames depend on each other.
+    """
+
+    # read() reads straight into buffers from a FramePool
+    uses_frame_pool = True
+
+    @staticmethod
+    def available() -> bool:
+        return shutil.which("ffmpeg") is not None
+
+    def __init__(
+        self,
+        video_path: str,
+        decode_size: Tuple[int, int],
+        loop: bool = False,
+        threads: int = 0,
+        max_fps: float = 0,
+    ):
+        self.logger = logging.getLogger("FFmpegVideoCapture")
+        self.logger.debug(f"Loading video from {video_path}")
+
+        # OpenCV only reads the header here, the frames come from FFmpeg
+        probe = cv2.VideoCapture(video_path)
+        if not probe.isOpened():
+            self.logger.error(f"Unable to open video file {video_path}")
+            raise ValueError(f"Unable to open video file {video_path}")
+        source_size = (
+            int(probe.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            int(probe.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        )
+        source_fps = probe.get(cv2.CAP_PROP_FPS) or 30  # Default to 30 if FPS not available
+        self.frame_count = int(probe.get(cv2.CAP_PROP_FRAME_COUNT))
+        probe.release()
+        self.fps = source_fps
+        if 0 < max_fps < source_fps:
+            self.fps = max_fps
+            self.frame_count = math.ceil(self.frame_count * max_fps / source_fps)
+
+        width, height = decode_resolution(source_size, decode_size)
+        self.frame_shape = (height, width, 3)
+        self.loop = loop
+        command = [shutil.which("ffmpeg") or "ffmpeg", "-nostdin", "-loglevel", "error", "-threads", str(threads)]
+        if loop:
+            command += ["-stream_loop", "-1"]
+        command += [
+            "-i", video_path,
+            "-vf", decode_filter((width, height), source_fps, max_fps),
+            "-f", "rawvideo",
+            "-pix_fmt", "bgr24",
+            "-",
+        ]
+        # a file never blocks FFmpeg the way a full stderr pipe would
+        self._errors = tempfile.TemporaryFile()
+        self.process = subprocess.Popen(
+            command, stdout=subprocess.PIPE, stderr=self._errors, bufsize=0
+        )
+        self._scratch = None  # type: Optional[np.ndarray]
+        self.logger.info(
+            f"Decoding {source_size[0]}x{source_size[1]} video at {width}x{height}, "
+            f"{self.fps:g} of {source_fps:g} FPS, {self.frame_count} frames"
+        )
+
+    def _read_into(self, buffer: np.ndarray) -> bool:
+        view = memoryview(buffer).cast("B")
+        filled = 0
+        while filled < len(view):
+            count = self.process.stdout.readinto(view[filled:])
+            if not count:
+                return False
+            filled += count
+        return True
+
+    def read(self, pool: FramePool = None):
+        """
+        Returns the next frame, or None at the end. With a pool, the frame is
+        read into a buffer acquired from it, which the caller has to release
+        once done with it.
+        """
+        if pool is not None:
+            frame = pool.acquire(self.frame_shape)
+        else:
+            frame = np.empty(self.frame_shape, np.uint8)
+        if self._read_into(frame):
+            return frame
+        if pool is not None:
+            pool.release(frame)
+        self._log_exit()
+        return None
+
+    def grab(self) -> bool:
+        """
+        Skips the next frame. FFmpeg still decodes and scales it, but it is
+        only a few kilobytes at this size, and with `max_fps` set to the
+        stream rate this is rare. Returns False at the end.
+        """
+        if self._scratch is None:
+            self._scratch = np.empty(self.frame_shape, np.uint8)
+        return self._read_into(self._scratch)
+
+    def _log_exit(self):
+        try:
+            self.process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            pass
+        if self.process.returncode:
+            self._errors.seek(0)
+            errors = self._errors.read().decode(errors="replace").strip()
+            self.logger.error(f"FFmpeg exited with code {self.process.returncode}: {errors}")
+        else:
+            self.logger.debug("End of video reached.")
+
+    def stop(self):
+        self.logger.debug("Stopping FFmpegVideoCapture and its FFmpeg process.")
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        self.process.stdout.close()
+        self._errors.close()
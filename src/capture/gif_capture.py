@@ -31,6 +31,8 @@ class GIFCapture:
                 frame = self.gif.convert('RGB')
                 frame_np = np.array(frame)
                 frame_bgr = cv2.cvtColor(frame_np, cv2.COLOR_RGB2BGR)
+                # Frames are handed out as they are, nobody may change them
+                frame_bgr.flags.writeable = False
                 self.frames.append(frame_bgr)
             self.logger.debug(f"Preloaded {len(self.frames)} frames from GIF")
         except EOFError:
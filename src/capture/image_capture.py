@@ -12,10 +12,11 @@ class ImageCapture:
         if self.image is None:
             self.logger.error(f"Unable to load image from {image_path}")
             raise ValueError(f"Unable to load image from {image_path}")
+        # Every read hands out the same read-only frame instead of a copy
+        self.image.flags.writeable = False
 
     def read(self):
-        self.logger.debug("Reading image frame")
-        return self.image.copy()
+        return self.image
 
     def stop(self):
         self.logger.debug("Stopping ImageCapture (no action needed)")
@@ -0,0 +1,113 @@
+# src/capture/timed_playback.py
+
+import logging
+import time
+from typing import Callable, Optional
+
+import numpy as np
+from src.utils.frame_pool import FramePool
+
+
+class TimedPlayback:
+    """
+    Plays a video source at its own frame rate, times `speed`, whatever
+    rate frames are read at.
+
+    Every read returns the source frame that is due by the wall clock since
+    the first read. Frames that were due in between are skipped with the
+    source's grab(), which doesn't convert them to BGR, and when reads come
+    faster than the video the last frame is returned again. Conversion and
+    copying thus follow the output frame rate, at most the video's; the
+    decoder itself still sees every frame, they depend on each other. The source is opened with
+    `source_factory`, so a TimedPlayback can be created in another process.
+    """
+
+    def __init__(self, source_factory: Callable, speed: float = 1.0):
+        if speed <= 0:
+            raise ValueError("Playback speed must be positive")
+        self.logger = logging.getLogger("TimedPlayback")
+        self.source = source_factory()
+        self.fps = self.source.fps
+        self.speed = speed
+        self.uses_frame_pool = getattr(self.source, "uses_frame_pool", False)
+        # source frames read or skipped so far, across loops
+        self.position = 0
+        self.decoded = 0
+        self.skipped = 0
+        self.repeated = 0
+        self._origin_time = None  # type: Optional[float]
+        self._origin_frame = 0.0
+        self._last = None  # type: Optional[np.ndarray]
+
+    def due_frame(self) -> int:
+        """
+        Index of the source frame that is showing now.
+        """
+        now = time.perf_counter()
+        if self._origin_time is None:
+            self._origin_time = now
+        return int(self._origin_frame + (now - self._origin_time) * self.fps * self.speed)
+
+    def set_speed(self, speed: float) -> None:
+        """
+        Changes the playback speed from the frame that is showing now on.
+        """
+        if speed <= 0:
+            raise ValueError("Playback speed must be positive")
+        if self._origin_time is not None:
+            now = time.perf_counter()
+            self._origin_frame += (now - self._origin_time) * self.fps * self.speed
+            self._origin_time = now
+        self.speed = speed
+
+    def read(self, pool: FramePool = None):
+        """
+        Returns the frame that is due, or None at the end of the source.
+        With a pool, the frame is in a buffer acquired from it, which the
+        caller has to release once done with it.
+        """
+        due = self.due_frame()
+        if due < self.position and self._last is not None:
+            self.repeated += 1
+            return self._repeat(pool)
+
+        while self.position < due:
+            if not self.source.grab():
+                return None
+            self.position += 1
+            self.skipped += 1
+
+        frame = self.source.read(pool) if self.uses_frame_pool else self.source.read()
+        if frame is None:
+            return None
+        self.position += 1
+        self.decoded += 1
+        if pool is None:
+            self._last = frame
+        else:
+            # the caller gives the pooled frame back, a repeat needs a copy
+            if self._last is None or self._last.shape != frame.shape:
+                self._last = np.empty_like(frame)
+            np.copyto(self._last, frame)
+        return frame
+
+    def _repeat(self, pool: Optional[FramePool]):
+        if pool is None:
+            return self._last
+        frame = pool.acquire(self._last.shape, self._last.dtype)
+        np.copyto(frame, self._last)
+        return frame
+
+    def grab(self) -> bool:
+        """
+        Skipped ticks need no work here, the next read catches up with the
+        clock by itself.
+        """
+        return True
+
+    def stop(self):
+        self.logger.info(
+            f"Played at {self.speed:g}x of {self.fps:g} FPS: {self.decoded} frames "
+            f"decoded, {self.skipped} skipped without decoding, {self.repeated} repeated"
+        )
+        self.source.stop()
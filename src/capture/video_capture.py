@@ -1,16 +1,33 @@
 # src/capture/video_capture.py
 
 import logging
+from src.capture.ffmpeg_capture import decode_resolution
 from src.capture.loopablecamgear import LoopableCamGear
 from src.utils.logger_handler import logger_handler
 
+# stream heights yt-dlp can pick from, see STREAM_RESOLUTION
+STREAM_HEIGHTS = (144, 240, 360, 480, 720, 1080, 1440, 2160)
+
 class VideoCapture(LoopableCamGear):
-    def __init__(self, source, loop=False, logger=None):
+    def __init__(self, source, loop=False, logger=None, decode_size=None):
+        """
+        With `decode_size`, the LED (width, height) to cover, streams are
+        fetched in the smallest resolution that covers it, see
+        decode_resolution, and cameras are asked for that size.
+        """
         stream_mode = False
         options = {}
         if isinstance(source, str) and "://" in source:
             stream_mode = True
             options = {"STREAM_RESOLUTION": "360p"}
+            if decode_size is not None:
+                # most streams are 16:9
+                height = decode_resolution((1920, 1080), decode_size)[1]
+                height = min((h for h in STREAM_HEIGHTS if h >= height), default=STREAM_HEIGHTS[-1])
+                options["STREAM_RESOLUTION"] = f"{height}p"
+        elif decode_size is not None:
+            width, height = decode_resolution((1920, 1080), decode_size)
+            options = {"CAP_PROP_FRAME_WIDTH": width, "CAP_PROP_FRAME_HEIGHT": height}
 
         self.logger = logger or logging.getLogger("VideoCapture")
         self.logger.debug(f"Initializing VideoCapture with source={source}, loop={loop}, stream_mode={stream_mode}")
@@ -2,9 +2,13 @@
 
 import cv2
 import logging
+from src.utils.frame_pool import FramePool
 from src.utils.logger_handler import logger_handler
 
 class VideoFileCapture:
+    # read() can decode straight into buffers from a FramePool
+    uses_frame_pool = True
+
     def __init__(self, video_path: str, loop: bool = False):
         self.logger = logging.getLogger("VideoFileCapture")
         self.logger.debug(f"Loading video from {video_path}")
@@ -16,22 +20,54 @@ class VideoFileCapture:
         self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
         self.current_frame = 0
         self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30  # Default to 30 if FPS not available
+        self.frame_shape = None  # Known after the first frame
         self.logger.debug(f"Video FPS: {self.fps}, Total Frames: {self.frame_count}")
 
-    def read(self):
-        ret, frame = self.cap.read()
+    def read(self, pool: FramePool = None):
+        """
+        Returns the next frame, or None at the end. With a pool, the frame is
+        decoded into a buffer acquired from it, which the caller has to
+        release once done with it.
+        """
+        buffer = None
+        if pool is not None and self.frame_shape is not None:
+            buffer = pool.acquire(self.frame_shape)
+
+        ret, frame = self.cap.read(buffer)
         if not ret:
             if self.loop:
                 self.logger.debug("Looping video.")
                 self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                ret, frame = self.cap.read()
+                ret, frame = self.cap.read(buffer)
                 if not ret:
                     self.logger.error("Failed to read frame after looping.")
-                    return None
             else:
                 self.logger.debug("End of video reached.")
-                return None
-        return frame.copy()
+        if not ret:
+            if buffer is not None:
+                pool.release(buffer)
+            return None
+
+        if pool is not None and frame is not buffer:
+            # first frame or a new resolution, OpenCV allocated its own array
+            if buffer is not None:
+                pool.release(buffer)
+            self.frame_shape = frame.shape
+            buffer = pool.acquire(self.frame_shape)
+            buffer[...] = frame
+            frame = buffer
+        return frame
+
+    def grab(self) -> bool:
+        """
+        Skips the next frame without decoding it. Returns False at the end.
+        """
+        if self.cap.grab():
+            return True
+        if self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            return self.cap.grab()
+        return False
 
     def stop(self):
         self.logger.debug("Stopping VideoFileCapture and releasing video file.")
@@ -0,0 +1,108 @@
+# src/gui/live_preview.py
+
+import logging
+import threading
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image, ImageTk
+
+
+class LivePreview:
+    """
+    Shows the latest streamed frame in a label.
+
+    `submit` may be called from any thread for every frame: it only copies
+    the frame into a single slot, replacing one that was not shown yet. The
+    Tk main loop picks up the slot at most `fps` times per second, upscales
+    it to the label with nearest-neighbour scaling and shows it. While the
+    window is minimized or the label hidden, nothing is rendered and
+    `submit` returns right away.
+    """
+
+    # how often a paused preview checks whether it is visible again
+    PAUSED_POLL_MS = 250
+
+    def __init__(
+        self,
+        root,
+        label,
+        size: Tuple[int, int] = (400, 300),
+        fps: float = 10,
+        logger: logging.Logger = None,
+    ):
+        self.root = root
+        self.label = label
+        self.size = size
+        self.interval_ms = int(1000 / fps)
+        self.logger = logger or logging.getLogger("LivePreview")
+        self.paused = False
+        self.rendered = 0
+        self._lock = threading.Lock()
+        self._pending = None  # type: Optional[np.ndarray]
+        self._shown = None  # type: Optional[np.ndarray]
+        self._has_pending = False
+        self._job = None
+
+    def submit(self, frame: np.ndarray) -> None:
+        """
+        Offers a BGR frame for the preview, it is copied and not kept.
+        """
+        if self.paused or self._job is None:
+            return
+        with self._lock:
+            if self._pending is None or self._pending.shape != frame.shape:
+                self._pending = np.empty(frame.shape, frame.dtype)
+            np.copyto(self._pending, frame)
+            self._has_pending = True
+
+    def start(self) -> None:
+        if self._job is None:
+            self._job = self.root.after(self.interval_ms, self._refresh)
+
+    def stop(self) -> None:
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+        with self._lock:
+            self._has_pending = False
+
+    def clear(self) -> None:
+        self.label.configure(image="")
+        self.label.image = None
+
+    def _visible(self) -> bool:
+        return self.root.state() != "iconic" and bool(self.label.winfo_viewable())
+
+    def _refresh(self) -> None:
+        self.paused = not self._visible()
+        if self.paused:
+            self._job = self.root.after(self.PAUSED_POLL_MS, self._refresh)
+            return
+
+        frame = None
+        with self._lock:
+            if self._has_pending:
+                # the pending slot is handed over, the shown one takes its place
+                self._pending, self._shown = self._shown, self._pending
+                self._has_pending = False
+                frame = self._shown
+        if frame is not None:
+            try:
+                self._render(frame)
+            except Exception:
+                self.logger.exception("Failed to update live preview")
+        self._job = self.root.after(self.interval_ms, self._refresh)
+
+    def _render(self, frame: np.ndarray) -> None:
+        height, width = frame.shape[:2]
+        scale = min(self.size[0] / width, self.size[1] / height)
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        image = cv2.resize(frame, size, interpolation=cv2.INTER_NEAREST)
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+        imgtk = ImageTk.PhotoImage(image=Image.fromarray(image))
+        self.label.configure(image=imgtk)
+        self.label.image = imgtk  # Keep a reference to prevent garbage collection
+        self.rendered += 1
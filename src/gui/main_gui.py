@@ -7,20 +7,30 @@ from tkinter import filedialog, messagebox
 import logging
 import cv2
 import numpy as np
-import time
+import os
 import threading
-from PIL import Image, ImageTk, ImageGrab
+from functools import partial
+from PIL import ImageGrab
 from typing import List, Optional, Tuple  # Added List here
 
 from src.capture.video_capture import VideoCapture
 from src.capture.video_file_capture import VideoFileCapture
+from src.capture.ffmpeg_capture import FFmpegVideoCapture
+from src.capture.timed_playback import TimedPlayback
 from src.capture.image_capture import ImageCapture
 from src.capture.gif_capture import GIFCapture
 from src.capture.text_animator import TextAnimator
 from src.managers.streamer_manager import StreamerManager
+from src.managers.canvas_layout import CanvasLayout
 from src.gui.loading_screen import LoadingScreen
 from src.gui.device_selection import DeviceSelectionWindow
+from src.gui.live_preview import LivePreview
 from src.utils.logger_handler import logger_handler
+from src.utils.allocation_guard import AllocationGuard
+from src.utils.led_monitor import LedMonitor
+from src.managers.frame_pipeline import FramePipeline
+from src.managers.async_engine import AsyncStreamingEngine
+from src.managers.multiprocess_engine import MultiprocessEngine
 from src.capture.display_capture import DisplayCapture  # Add this import
 
 
@@ -48,6 +58,8 @@ class StreamingApp:
         self.text_direction = ctk.StringVar(value="left")
         self.host = ctk.StringVar()
         self.port = ctk.IntVar(value=21324)
+        self.protocol = ctk.StringVar(value="auto")
+        self.layout_path = ctk.StringVar()  # Optional virtual canvas layout (JSON)
         self.serial = ctk.StringVar(value="")
         self.baudrate = ctk.IntVar(value=115200)
         self.width = ctk.IntVar(value=0)
@@ -56,9 +68,25 @@ class StreamingApp:
         self.scale = ctk.StringVar(value="fill")
         self.interpolation = ctk.StringVar(value="smooth")
         self.gamma = ctk.DoubleVar(value=0.5)
+        self.brightness = ctk.DoubleVar(value=1.0)
+        self.white_balance = ctk.StringVar(value="1,1,1")  # R,G,B gains
+        self.lut_path = ctk.StringVar()  # Optional .cube calibration LUT
+        self.ledmap = ctk.StringVar()  # "serpentine" or a ledmap.json path/URL
         self.loop = ctk.BooleanVar(value=False)  # Loop variable
+        self.delta = ctk.BooleanVar(value=False)  # Only send changed DNRGB chunks
+        self.pacing = ctk.BooleanVar(value=False)  # Spread packets over the frame interval
+        self.packet_spacing = ctk.DoubleVar(value=0.0)  # Minimum ms between packets
+        self.max_rate = ctk.IntVar(value=0)  # Bytes/sec budget per device, 0 = unlimited
+        self.catch_up = ctk.BooleanVar(value=False)  # Catch up on late frames instead of skipping them
+        self.async_engine = ctk.BooleanVar(value=False)  # Stream from one asyncio event loop
+        self.multiprocess = ctk.BooleanVar(value=False)  # Decode and stream in separate processes
+        self.sync_commit = ctk.BooleanVar(value=False)  # Send each frame to all devices back to back
+        self.show_preview = ctk.BooleanVar(value=True)  # Hidden previews are not rendered
+        self.web_monitor = ctk.BooleanVar(value=False)  # Serve the LED frames to browsers
+        self.decode_downscale = ctk.BooleanVar(value=True)  # Decode sources near LED resolution
         self.debug = ctk.BooleanVar(value=False)
         self.fps = ctk.IntVar(value=15)
+        self.playback_speed = ctk.DoubleVar(value=1.0)  # Video files play at their own FPS times this
 
         # Text Options Variables
         self.font_path = ctk.StringVar()
@@ -73,12 +101,12 @@ class StreamingApp:
         self.shadow_color = ctk.StringVar(value="0,0,0")
         self.shadow_offset = ctk.StringVar(value="2,2")
 
-        # Initialize preview image holder
-        self.preview_image = None
-
         # Initialize streamer manager
         self.streamer_manager = None
 
+        # Web monitor, started the first time streaming uses it
+        self.led_monitor = None
+
         # Initialize player
         self.player = None
 
@@ -196,6 +224,16 @@ class StreamingApp:
         # Preview Image Label
         self.preview = ctk.CTkLabel(preview_frame, text="", width=400, height=300)
         self.preview.grid(row=1, column=0, pady=10, padx=10, sticky="n")
+        self.live_preview = LivePreview(self.root, self.preview, logger=self.logger)
+        self.live_preview.start()
+
+        preview_checkbox = ctk.CTkCheckBox(
+            preview_frame,
+            text="Show Preview",
+            variable=self.show_preview,
+            command=self.toggle_preview
+        )
+        preview_checkbox.grid(row=0, column=0, sticky="e", pady=(10, 5), padx=10)
 
         # Streamer Settings Section
         streamer_frame = ctk.CTkFrame(content_scrollable_frame, corner_radius=10)
@@ -210,21 +248,32 @@ class StreamingApp:
         settings = [
             ("Host:", self.host),
             ("Port:", self.port),
+            ("Protocol:", self.protocol),
+            ("Layout File:", self.layout_path),
             ("Width:", self.width),
             ("Height:", self.height),
             ("Crop (L,T,R,B):", self.crop),
             ("Scale:", self.scale),
             ("Interpolation:", self.interpolation),
             ("Gamma:", self.gamma),
+            ("Brightness:", self.brightness),
+            ("White Balance (R,G,B):", self.white_balance),
+            ("Color LUT (.cube):", self.lut_path),
+            ("LED Map:", self.ledmap),
             ("FPS:", self.fps),
+            ("Playback Speed:", self.playback_speed),
+            ("Packet Spacing (ms):", self.packet_spacing),
+            ("Max Bytes/sec:", self.max_rate),
         ]
 
         for i, (label_text, var) in enumerate(settings, start=1):
             label = ctk.CTkLabel(streamer_frame, text=label_text)
             label.grid(row=i, column=0, sticky="e", padx=5, pady=5)
-            if label_text in ["Scale:", "Interpolation:"]:
+            if label_text in ["Scale:", "Interpolation:", "Protocol:"]:
                 if label_text == "Scale:":
                     options = ["stretch", "fill", "fit", "crop"]
+                elif label_text == "Protocol:":
+                    options = ["auto", "drgb", "dnrgb", "ddp", "e131", "artnet"]
                 else:
                     options = ["hard", "smooth"]
                 combobox = ctk.CTkOptionMenu(
@@ -252,6 +301,27 @@ class StreamingApp:
                     command=self.rescan_network
                 )
                 rescan_button.grid(row=i, column=2, sticky="w", padx=5, pady=5)
+            elif label_text == "Layout File:":
+                layout_button = ctk.CTkButton(
+                    streamer_frame, 
+                    text="Browse", 
+                    command=self.browse_layout
+                )
+                layout_button.grid(row=i, column=2, sticky="w", padx=5, pady=5)
+            elif label_text == "Color LUT (.cube):":
+                lut_button = ctk.CTkButton(
+                    streamer_frame, 
+                    text="Browse", 
+                    command=self.browse_lut
+                )
+                lut_button.grid(row=i, column=2, sticky="w", padx=5, pady=5)
+            elif label_text == "LED Map:":
+                ledmap_button = ctk.CTkButton(
+                    streamer_frame, 
+                    text="Browse", 
+                    command=self.browse_ledmap
+                )
+                ledmap_button.grid(row=i, column=2, sticky="w", padx=5, pady=5)
 
         # Streamer Settings Frame Configuration
         for i in range(len(settings) + 1):
@@ -324,7 +394,7 @@ class StreamingApp:
         # Debug and Loop Mode Checkboxes
         checkbox_frame = ctk.CTkFrame(bottom_frame)
         checkbox_frame.pack(fill="x", pady=(0, 10))
-        checkbox_frame.grid_columnconfigure((0, 1), weight=1)
+        checkbox_frame.grid_columnconfigure((0, 1, 2, 3, 4, 5, 6, 7, 8), weight=1)
 
         debug_checkbox = ctk.CTkCheckBox(
             checkbox_frame, 
@@ -341,6 +411,62 @@ class StreamingApp:
         )
         loop_checkbox.grid(row=0, column=1, sticky="w", padx=5, pady=5)
 
+        delta_checkbox = ctk.CTkCheckBox(
+            checkbox_frame, 
+            text="Delta Transmission", 
+            variable=self.delta
+        )
+        delta_checkbox.grid(row=0, column=2, sticky="w", padx=5, pady=5)
+
+        pacing_checkbox = ctk.CTkCheckBox(
+            checkbox_frame, 
+            text="Packet Pacing", 
+            variable=self.pacing
+        )
+        pacing_checkbox.grid(row=0, column=3, sticky="w", padx=5, pady=5)
+
+        catch_up_checkbox = ctk.CTkCheckBox(
+            checkbox_frame,
+            text="Catch Up Late Frames",
+            variable=self.catch_up
+        )
+        catch_up_checkbox.grid(row=0, column=4, sticky="w", padx=5, pady=5)
+
+        async_checkbox = ctk.CTkCheckBox(
+            checkbox_frame,
+            text="Async Engine",
+            variable=self.async_engine
+        )
+        async_checkbox.grid(row=0, column=5, sticky="w", padx=5, pady=5)
+
+        multiprocess_checkbox = ctk.CTkCheckBox(
+            checkbox_frame,
+            text="Multiprocess",
+            variable=self.multiprocess
+        )
+        multiprocess_checkbox.grid(row=0, column=6, sticky="w", padx=5, pady=5)
+
+        web_monitor_checkbox = ctk.CTkCheckBox(
+            checkbox_frame,
+            text="Web Monitor",
+            variable=self.web_monitor
+        )
+        web_monitor_checkbox.grid(row=0, column=7, sticky="w", padx=5, pady=5)
+
+        decode_checkbox = ctk.CTkCheckBox(
+            checkbox_frame,
+            text="Downscale on Decode",
+            variable=self.decode_downscale
+        )
+        decode_checkbox.grid(row=0, column=8, sticky="w", padx=5, pady=5)
+
+        sync_checkbox = ctk.CTkCheckBox(
+            checkbox_frame,
+            text="Sync Devices",
+            variable=self.sync_commit
+        )
+        sync_checkbox.grid(row=1, column=0, sticky="w", padx=5, pady=5)
+
         # Ensure all columns expand equally in the control_frame
         control_frame.grid_columnconfigure(0, weight=1)
         control_frame.grid_columnconfigure(1, weight=1)
@@ -537,6 +663,30 @@ class StreamingApp:
         if file_path:
             self.video_path.set(file_path)
 
+    def browse_lut(self):
+        file_path = filedialog.askopenfilename(
+            title="Select Color LUT",
+            filetypes=[("Cube LUT", "*.cube")]
+        )
+        if file_path:
+            self.lut_path.set(file_path)
+
+    def browse_layout(self):
+        file_path = filedialog.askopenfilename(
+            title="Select Canvas Layout",
+            filetypes=[("Layout Files", "*.json")]
+        )
+        if file_path:
+            self.layout_path.set(file_path)
+
+    def browse_ledmap(self):
+        file_path = filedialog.askopenfilename(
+            title="Select LED Map",
+            filetypes=[("WLED ledmap", "*.json")]
+        )
+        if file_path:
+            self.ledmap.set(file_path)
+
     def validate_youtube_url(self):
         url = self.youtube_url.get()
         if "youtube.com/watch?v=" in url or "youtu.be/" in url:
@@ -559,6 +709,19 @@ class StreamingApp:
             messagebox.showerror("Invalid Crop", "Crop must be in format L,T,R,B with integer values.")
             return [0, 0, 0, 0]
 
+    def parse_white_balance(self, balance_str: str) -> List[float]:
+        try:
+            parts = [float(x.strip()) for x in balance_str.split(",")]
+            if len(parts) == 1:
+                return parts * 3
+            elif len(parts) == 3:
+                return parts
+            else:
+                raise ValueError
+        except Exception:
+            messagebox.showerror("Invalid White Balance", "White balance must be in format R,G,B with numeric gains.")
+            return [1.0, 1.0, 1.0]
+
     def toggle_debug_mode(self):
         if self.debug.get():
             # Set logger to DEBUG level
@@ -577,7 +740,7 @@ class StreamingApp:
 
         # Validate and prepare settings
         source_type = self.source_type.get()
-        player = None
+        source = None  # Opens the player, see MultiprocessEngine
         frame_rate = self.fps.get()
 
         if frame_rate <= 0:
@@ -585,6 +748,15 @@ class StreamingApp:
             self.logger.error("Invalid FPS value")
             return
 
+        try:
+            playback_speed = self.playback_speed.get()
+        except Exception:
+            playback_speed = 0
+        if playback_speed <= 0:
+            messagebox.showerror("Error", "Invalid playback speed. Please enter a positive number.")
+            self.logger.error("Invalid playback speed")
+            return
+
         self.logger.debug(f"Starting streaming with source_type={source_type}, frame_rate={frame_rate}")
 
         try:
@@ -596,29 +768,29 @@ class StreamingApp:
                 # Detect if the selected file is a GIF
                 if image_path.lower().endswith('.gif'):
                     self.logger.debug(f"Selected file is a GIF: {image_path}")
-                    player = GIFCapture(gif_path=image_path, fps=frame_rate)
+                    source = partial(GIFCapture, gif_path=image_path, fps=frame_rate)
                 else:
                     self.logger.debug(f"Selected file is a static image: {image_path}")
-                    player = ImageCapture(image_path=image_path)
+                    source = partial(ImageCapture, image_path=image_path)
 
             elif source_type == "video":
                 video_path = self.video_path.get()
                 if not video_path:
                     raise ValueError("Video path is not specified.")
-                player = VideoFileCapture(video_path=video_path, loop=self.loop.get())
+                source = partial(VideoFileCapture, video_path=video_path, loop=self.loop.get())
 
             elif source_type == "display":
-                player = DisplayCapture()
+                source = partial(DisplayCapture)
 
             elif source_type == "camera":
                 camera_index = int(self.camera_source.get())
-                player = VideoCapture(source=camera_index, loop=self.loop.get())
+                source = partial(VideoCapture, source=camera_index, loop=self.loop.get())
 
             elif source_type == "youtube":
                 youtube_url = self.youtube_url.get()
                 if not youtube_url:
                     raise ValueError("YouTube URL is not specified.")
-                player = VideoCapture(source=youtube_url, loop=self.loop.get())
+                source = partial(VideoCapture, source=youtube_url, loop=self.loop.get())
 
             elif source_type == "text":
                 text = self.text_input.get()
@@ -658,7 +830,8 @@ class StreamingApp:
                 font_italic = self.font_italic.get()
 
                 # Initialize TextAnimator with enhanced options
-                player = TextAnimator(
+                source = partial(
+                    TextAnimator,
                     text=text,
                     width=self.width.get(),
                     height=self.height.get(),
@@ -684,9 +857,6 @@ class StreamingApp:
                 self.logger.error(f"Unknown source type selected: {source_type}")
                 return
 
-            # Assign player to self.player for proper stopping
-            self.player = player
-
             # Initialize streamer manager with GUI settings
             stream_configs = self.build_streamer_configs()
 
@@ -695,12 +865,89 @@ class StreamingApp:
                 self.logger.error("No streamer configurations found")
                 return
 
-            self.streamer_manager = StreamerManager(stream_configs, logger=self.logger)
+            # A layout file splits the source across its devices, the GUI
+            # settings serve as defaults for each of them
+            layout = None
+            if self.layout_path.get():
+                layout = CanvasLayout.load(self.layout_path.get())
+                stream_configs = layout.stream_configs(stream_configs[0])
+                self.logger.info(
+                    f"Canvas layout {layout.width}x{layout.height} with {len(stream_configs)} devices"
+                )
+
+            # Video is decoded close to the LED resolution when possible
+            decode_size = self.decode_size(stream_configs, layout)
+            if decode_size is not None:
+                if source.func is VideoFileCapture:
+                    if FFmpegVideoCapture.available():
+                        # frames between two stream frames never leave FFmpeg
+                        source = partial(
+                            FFmpegVideoCapture,
+                            decode_size=decode_size,
+                            max_fps=frame_rate / playback_speed,
+                            **source.keywords,
+                        )
+                    else:
+                        self.logger.info("FFmpeg not found, video files are decoded at full resolution")
+                elif source.func is VideoCapture:
+                    source = partial(source, decode_size=decode_size)
+
+            # Video files play in real time at any FPS, skipping frames
+            # that would not be shown without converting them
+            if source.func in (VideoFileCapture, FFmpegVideoCapture):
+                source = partial(TimedPlayback, source, speed=playback_speed)
+
+            # In multiprocess mode the engine's processes open the source
+            # and the devices, this process only supervises them
+            multiprocess = self.multiprocess.get()
+            player = None if multiprocess else source()
+
+            # Assign player to self.player for proper stopping
+            self.player = player
+
+            # Devices show each frame together when the GUI or the layout asks for it
+            sync_commit = self.sync_commit.get() or (layout is not None and layout.sync_commit)
+            mirror = layout is not None and layout.mirror
+
+            engine = None
+            if multiprocess:
+                self.streamer_manager = None
+                engine = MultiprocessEngine(
+                    source,
+                    stream_configs,
+                    frame_rate,
+                    processes=min(len(stream_configs), os.cpu_count() or 1),
+                    manager_options={"layout": layout, "sync_commit": sync_commit, "mirror": mirror},
+                    preview=self.live_preview.submit,
+                    clock_policy="catch_up" if self.catch_up.get() else "skip",
+                    logger=self.logger,
+                )
+            else:
+                self.streamer_manager = StreamerManager(
+                    stream_configs,
+                    logger=self.logger,
+                    layout=layout,
+                    sync_commit=sync_commit,
+                    mirror=mirror,
+                    workers=min(len(stream_configs), os.cpu_count() or 1),
+                )
+
+            if self.web_monitor.get():
+                self.attach_monitor()
+
+            max_fps = self.streamer_manager.max_fps if self.streamer_manager else None
+            if max_fps and frame_rate > max_fps:
+                self.logger.warning(
+                    f"FPS {frame_rate} exceeds the {max_fps:.1f} fps the serial link can sustain, frames will be dropped"
+                )
+                self.status_label.configure(
+                    text=f"Serial link limited to {max_fps:.1f} fps, extra frames are dropped"
+                )
 
             # Start streaming thread
             self.streaming = True
             self.stop_event.clear()  # Ensure the stop_event is cleared
-            self.thread = threading.Thread(target=self.streaming_loop, args=(player, frame_rate), daemon=True)
+            self.thread = threading.Thread(target=self.streaming_loop, args=(player, frame_rate, engine), daemon=True)
             self.thread.start()
 
             self.logger.info("Streaming started successfully")
@@ -741,6 +988,12 @@ class StreamingApp:
         config = {
             "host": self.host.get(),
             "port": self.port.get(),
+            "protocol": self.protocol.get(),
+            "delta": self.delta.get(),
+            "pacing": self.pacing.get(),
+            "packet_spacing_ms": self.packet_spacing.get(),
+            "max_bytes_per_second": self.max_rate.get(),
+            "frame_interval": 1.0 / max(self.fps.get(), 1),
             "serialport": self.serial.get(),
             "baudrate": self.baudrate.get(),
             "width": self.width.get(),
@@ -749,6 +1002,10 @@ class StreamingApp:
             "scale": self.scale.get(),
             "interpolation": self.interpolation.get(),
             "gamma": self.gamma.get(),
+            "brightness": self.brightness.get(),
+            "white_balance": self.parse_white_balance(self.white_balance.get()),
+            "lut_path": self.lut_path.get(),
+            "ledmap": self.ledmap.get(),
             # "loop": self.loop.get(),       # Exclude 'loop'
             # "fps": self.fps.get(),         # Exclude 'fps' if not supported by streamer
         }
@@ -765,6 +1022,10 @@ class StreamingApp:
                 "scale": config["scale"],
                 "interpolation": config["interpolation"],
                 "gamma": config["gamma"],
+                "brightness": config["brightness"],
+                "white_balance": config["white_balance"],
+                "lut_path": config["lut_path"],
+                "ledmap": config["ledmap"],
             }
             stream_configs.append(streamer_config)
             self.logger.debug(f"Added SerialWLEDStreamer config: {streamer_config}")
@@ -773,12 +1034,22 @@ class StreamingApp:
             streamer_config = {
                 "host": config["host"],
                 "port": config["port"],
+                "protocol": config["protocol"],
+                "delta": config["delta"],
+                "pacing": config["pacing"],
+                "packet_spacing_ms": config["packet_spacing_ms"],
+                "max_bytes_per_second": config["max_bytes_per_second"],
+                "frame_interval": config["frame_interval"],
                 "width": config["width"],
                 "height": config["height"],
                 "crop": config["crop"],
                 "scale": config["scale"],
                 "interpolation": config["interpolation"],
                 "gamma": config["gamma"],
+                "brightness": config["brightness"],
+                "white_balance": config["white_balance"],
+                "lut_path": config["lut_path"],
+                "ledmap": config["ledmap"],
             }
             stream_configs.append(streamer_config)
             self.logger.debug(f"Added UDPWLEDStreamer config: {streamer_config}")
@@ -806,42 +1077,57 @@ class StreamingApp:
         args.fps = self.fps.get()
         return args
 
-    def streaming_loop(self, player, frame_rate):
+    def streaming_loop(self, player, frame_rate, engine=None):
         self.logger.debug("Streaming loop started")
-        frame_interval = 1.0 / frame_rate
 
-        if player is None:
+        if player is None and engine is None:
             self.logger.error("Player is not initialized.")
             self.root.after(0, lambda: messagebox.showerror("Streaming Error", "Player is not initialized."))
             return
 
-        try:
-            while not self.stop_event.is_set():
-                start_time = time.perf_counter()
-
-                # Read and process frame
-                frame = player.read()
-                if frame is None:
-                    self.logger.warning("Received None frame, stopping streaming")
-                    break
-
-                # Update live preview
-                self.update_preview(frame)
-
-                # Process and send frame
-                self.streamer_manager.process_and_send_frame(frame, debug=False)  # Debug handled via logger
-
-                # Measure elapsed time
-                elapsed_time = time.perf_counter() - start_time
-                time_to_wait = frame_interval - elapsed_time
-                if time_to_wait > 0:
-                    time.sleep(time_to_wait)
-                else:
-                    self.logger.debug(f"Processing took longer than frame interval: {elapsed_time:.6f} seconds")
+        # WLED_STUDIO_ASSERT_NO_ALLOC=1 fails the loop on any frame-sized
+        # allocation, leaving room for per-device bookkeeping like futures
+        guard = None
+        if engine is None and os.environ.get("WLED_STUDIO_ASSERT_NO_ALLOC"):
+            guard = AllocationGuard(
+                limit_bytes=4096 + 2048 * len(self.streamer_manager.active_streamers)
+            )
+            self.logger.info(f"Asserting allocation-free frames, limit {guard.limit_bytes} bytes")
+
+        # Capture, processing and sending run in their own threads or on an
+        # event loop, this one only waits for a stop request or the end of
+        # the source. The allocation check needs all stages in one thread.
+        clock_policy = "catch_up" if self.catch_up.get() else "skip"
+        if engine is not None:
+            pipeline = engine
+        elif self.async_engine.get() and guard is None:
+            pipeline = AsyncStreamingEngine(logger=self.logger)
+            pipeline.add_session(
+                player,
+                self.streamer_manager,
+                frame_rate,
+                preview=self.live_preview.submit,
+                clock_policy=clock_policy,
+            )
+        else:
+            pipeline = FramePipeline(
+                player,
+                self.streamer_manager,
+                frame_rate,
+                preview=self.live_preview.submit,
+                pipelined=guard is None,
+                guard=guard,
+                clock_policy=clock_policy,
+                logger=self.logger,
+            )
 
-                # Log total time per frame
-                total_time = time.perf_counter() - start_time
-                self.logger.debug(f"Total time per frame: {total_time:.6f} seconds")
+        try:
+            pipeline.start()
+            while not self.stop_event.is_set() and pipeline.is_alive():
+                self.stop_event.wait(0.1)
+            pipeline.stop()
+            if pipeline.error is not None:
+                raise pipeline.error
 
         except Exception as e:
             self.logger.exception("Error in streaming loop")
@@ -849,6 +1135,11 @@ class StreamingApp:
             self.root.after(0, lambda e=e: messagebox.showerror("Streaming Error", f"An error occurred during streaming: {e}"))
         finally:
             self.logger.debug("Streaming loop terminating")
+            if guard:
+                guard.stop()
+                self.logger.info(
+                    f"Largest allocation peak over {guard.frames} frames: {guard.max_peak} bytes"
+                )
             # Perform cleanup
             if self.player:
                 self.player.stop()
@@ -898,6 +1189,9 @@ class StreamingApp:
         if self.streaming:
             self.logger.debug("Application closing while streaming is active")
             self.stop_streaming()
+        self.live_preview.stop()
+        if self.led_monitor is not None:
+            self.led_monitor.stop()
         self.root.destroy()
 
 
@@ -979,30 +1273,52 @@ class StreamingApp:
             self.logger.exception("Failed to capture crop area")
             messagebox.showerror("Error", f"Failed to capture crop area: {e}")
 
-    def update_preview(self, frame):
+    def decode_size(self, stream_configs: list, layout: Optional[CanvasLayout]) -> Optional[Tuple[int, int]]:
+        """
+        LED (width, height) the source has to cover, or None to decode it at
+        full resolution.
+        """
+        if not self.decode_downscale.get():
+            return None
+        if layout is not None:
+            sizes = [(layout.width, layout.height)]
+            crops = [layout.crop]
+        else:
+            sizes = [(config["width"], config["height"]) for config in stream_configs]
+            crops = [config.get("crop") for config in stream_configs]
+        # crops are in source pixels
+        if any(crop and any(crop) for crop in crops):
+            self.logger.info("Cropping needs the full source resolution, decoding at full size")
+            return None
+        if any(width <= 0 or height <= 0 for width, height in sizes):
+            return None
+        return (max(width for width, _ in sizes), max(height for _, height in sizes))
+
+    def attach_monitor(self):
         """
-        Updates the live preview area with the given frame in a thread-safe manner.
+        Serves the frames of the new streamer manager to the web monitor.
         """
-        def update_image():
+        if self.streamer_manager is None:
+            self.logger.warning("The web monitor is not available in multiprocess mode")
+            return
+        if self.led_monitor is None:
+            monitor = LedMonitor(logger=self.logger)
             try:
-                # Convert the frame from BGR (OpenCV) to RGB (PIL)
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-                # Convert to PIL Image
-                pil_image = Image.fromarray(frame_rgb)
-
-                # Resize the image to fit the preview area if necessary
-                pil_image = pil_image.resize((400, 300), Image.Resampling.LANCZOS)
-
-                # Convert to ImageTk
-                imgtk = ImageTk.PhotoImage(image=pil_image)
-
-                # Update the preview label
-                self.preview.configure(image=imgtk)
-                self.preview.image = imgtk  # Keep a reference to prevent garbage collection
-
-            except Exception as e:
-                self.logger.exception("Failed to update live preview")
+                monitor.start()
+            except OSError as e:
+                self.logger.error(f"Failed to start the web monitor: {e}")
+                return
+            self.led_monitor = monitor
+        self.led_monitor.reset()
+        self.streamer_manager.monitor = self.led_monitor
+        self.status_label.configure(text=f"Web monitor at {self.led_monitor.url}")
 
-        # Schedule the update in the main thread
-        self.root.after(0, update_image)
+    def toggle_preview(self):
+        """
+        Shows or hides the live preview, a hidden preview is not rendered.
+        """
+        if self.show_preview.get():
+            self.preview.grid()
+        else:
+            self.preview.grid_remove()
+            self.live_preview.clear()
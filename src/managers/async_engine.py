@@ -0,0 +1,332 @@
+# src/managers/async_engine.py
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from ..streamers.serialstreamer import SerialWLEDStreamer
+from ..utils.frame_clock import FrameClock
+from ..utils.static_content_gate import StaticContentGate
+from .frame_pipeline import KEEPALIVE_SECONDS, StageStats
+from .streamer_manager import StreamerManager
+
+
+class AsyncSerialWriter:
+    """
+    Writes the frames of a SerialWLEDStreamer from an executor, one write in
+    flight at a time. Frames submitted while the port is busy replace each
+    other, only the newest one is written next.
+    """
+
+    def __init__(
+        self,
+        streamer: SerialWLEDStreamer,
+        loop: asyncio.AbstractEventLoop,
+        executor: Executor,
+    ):
+        self.streamer = streamer
+        self._loop = loop
+        self._executor = executor
+        shape = (streamer.height, streamer.width, 3)
+        self._frame = np.empty(shape, np.uint8)
+        self._pending = np.empty(shape, np.uint8)
+        self._has_pending = False
+        self._writing = False
+        self.written = 0
+        self.dropped = 0
+        self.error = None  # type: Optional[BaseException]
+
+    def submit(self, frame: np.ndarray) -> None:
+        """
+        Queues `frame` for writing, called on the event loop.
+        """
+        if self.error is not None:
+            raise self.error
+        if self._writing:
+            if self._has_pending:
+                self.dropped += 1
+            np.copyto(self._pending, frame)
+            self._has_pending = True
+            return
+        np.copyto(self._frame, frame)
+        self._write()
+
+    def _write(self) -> None:
+        self._writing = True
+        future = self._loop.run_in_executor(
+            self._executor, self.streamer.writeMessage, self._frame
+        )
+        future.add_done_callback(self._written)
+
+    def _written(self, future: asyncio.Future) -> None:
+        self._writing = False
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            self.error = future.exception()
+            self.streamer.logger.error("Serial write failed: %s" % self.error)
+            return
+        self.written += 1
+        if self._has_pending:
+            self._frame, self._pending = self._pending, self._frame
+            self._has_pending = False
+            self._write()
+
+
+class AsyncSession:
+    """
+    One source streamed through one StreamerManager, as a task on the
+    engine's event loop.
+
+    Every tick the frame is read and processed in the executor, then the
+    prepared frames are committed on the loop, where sends never block: UDP
+    based streamers send through datagram transports and serial devices
+    through an AsyncSerialWriter. Ticks follow a FrameClock's deadlines, and
+    with `adaptive_rate` static frames are only sent as keepalives, see
+    StaticContentGate.
+    """
+
+    def __init__(
+        self,
+        player,
+        streamer_manager: StreamerManager,
+        frame_rate: float,
+        preview: Optional[Callable] = None,
+        clock_policy: str = "skip",
+        adaptive_rate: bool = True,
+        logger: logging.Logger = None,
+    ):
+        self.player = player
+        self.manager = streamer_manager
+        self.clock = FrameClock(frame_rate, policy=clock_policy)
+        # previews get the first device's frame, see StreamerManager.preview
+        if preview is not None:
+            streamer_manager.preview = preview
+        self.gate = None  # type: Optional[StaticContentGate]
+        if adaptive_rate:
+            self.gate = StaticContentGate(
+                streamer_manager.max_resolution,
+                keepalive=KEEPALIVE_SECONDS,
+                on_keepalive=streamer_manager.force_keyframe,
+                geometries=streamer_manager.geometries,
+            )
+        self.logger = logger or logging.getLogger("AsyncSession")
+        self.stage_stats = {
+            "capture": StageStats(),
+            "process": StageStats(),
+            "send": StageStats(),
+        }
+        self.error = None  # type: Optional[BaseException]
+        self._transports = []
+        self._serial_writers = []  # type: List[AsyncSerialWriter]
+
+    @property
+    def stats(self) -> dict:
+        stats = {name: stage.as_dict() for name, stage in self.stage_stats.items()}
+        stats["capture"]["clock"] = self.clock.stats
+        stats["send"]["serial_dropped"] = sum(
+            writer.dropped for writer in self._serial_writers
+        )
+        if self.gate is not None:
+            stats["capture"]["static"] = self.gate.stats
+        return stats
+
+    async def open(self, loop: asyncio.AbstractEventLoop, io_executor: Executor):
+        """
+        Moves the outputs of the manager's streamers onto the loop. Paced
+        streamers keep sending from their pacer thread.
+        """
+        for streamer in self.manager.active_streamers:
+            if isinstance(streamer, SerialWLEDStreamer):
+                writer = AsyncSerialWriter(streamer, loop, io_executor)
+                streamer.attachWriter(writer.submit)
+                self._serial_writers.append(writer)
+                continue
+            engine = getattr(streamer, "_engine", None)
+            if engine is None or getattr(streamer, "_pacer", None) is not None:
+                continue
+            for sock in engine.sockets:
+                transport, _ = await loop.create_datagram_endpoint(
+                    asyncio.DatagramProtocol, sock=sock
+                )
+                engine.attachTransport(sock, transport)
+                self._transports.append((engine, sock, transport))
+
+    async def close(self):
+        for writer in self._serial_writers:
+            writer.streamer.attachWriter(None)
+        # the transports own the sockets now and close them
+        for engine, sock, transport in self._transports:
+            engine.attachTransport(sock, None)
+            transport.close()
+        self._transports = []
+        await asyncio.sleep(0)
+
+    def read_frame(self):
+        start = time.perf_counter()
+        frame = self.player.read()
+        self.stage_stats["capture"].add(time.perf_counter() - start)
+        return frame
+
+    def prepare(self, frame) -> dict:
+        start = time.perf_counter()
+        errors = self.manager.prepare_streamer_frames(frame)
+        self.stage_stats["process"].add(time.perf_counter() - start)
+        return errors
+
+    def commit(self, errors: dict):
+        start = time.perf_counter()
+        try:
+            self.manager.commit_prepared(errors)
+        finally:
+            self.stage_stats["send"].add(time.perf_counter() - start)
+
+    async def run(self, loop: asyncio.AbstractEventLoop, executor: Executor):
+        self.clock.start()
+        while True:
+            frame = await loop.run_in_executor(executor, self.read_frame)
+            if frame is None:
+                self.logger.warning("Received None frame, stopping streaming")
+                break
+            if self.gate is None or self.gate.should_send(frame):
+                errors = await loop.run_in_executor(executor, self.prepare, frame)
+                self.commit(errors)
+
+            deadline = self.clock.next_deadline()
+            delay = deadline - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.clock.record(time.perf_counter() - deadline)
+
+
+class AsyncStreamingEngine:
+    """
+    Streams any number of sessions from a single event loop thread.
+
+    Frame ticks and sends of all sessions are multiplexed on the loop, while
+    reading and processing frames runs in a shared executor of `workers`
+    threads, cv2 and NumPy release the GIL there. Serial writes get their own
+    executor of `io_workers` threads, so a slow port never holds up frame
+    processing. Unlike FramePipeline, the stages of one session run one after
+    the other, the engine scales with the number of sessions and devices
+    rather than the speed of a single source.
+    """
+
+    def __init__(
+        self,
+        workers: int = 0,
+        io_workers: int = 4,
+        logger: logging.Logger = None,
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.io_workers = io_workers
+        self.logger = logger or logging.getLogger("AsyncStreamingEngine")
+        self.sessions = []  # type: List[AsyncSession]
+        self.error = None  # type: Optional[BaseException]
+        self._loop = None  # type: Optional[asyncio.AbstractEventLoop]
+        self._tasks = []
+        self._stopping = threading.Event()
+        self._thread = None  # type: Optional[threading.Thread]
+
+    def add_session(
+        self,
+        player,
+        streamer_manager: StreamerManager,
+        frame_rate: float,
+        preview: Optional[Callable] = None,
+        clock_policy: str = "skip",
+    ) -> AsyncSession:
+        session = AsyncSession(
+            player,
+            streamer_manager,
+            frame_rate,
+            preview=preview,
+            clock_policy=clock_policy,
+            logger=self.logger,
+        )
+        self.sessions.append(session)
+        return session
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=asyncio.run, args=(self.run(),), name="AsyncStreamingEngine", daemon=True
+        )
+        self._thread.start()
+
+    def is_alive(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self):
+        self._stopping.set()
+        if self._loop is not None and self.is_alive():
+            try:
+                self._loop.call_soon_threadsafe(self._cancel_sessions)
+            except RuntimeError:
+                # the loop closed in the meantime
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+        for index, session in enumerate(self.sessions):
+            stats = session.stats
+            clock = stats["capture"]["clock"]
+            self.logger.info(
+                f"Session {index}: {stats['capture']['frames']} frames, "
+                f"capture {stats['capture']['mean_ms']:.2f} ms, "
+                f"process {stats['process']['mean_ms']:.2f} ms, "
+                f"send {stats['send']['mean_ms']:.2f} ms each, "
+                f"deadline error p50 {clock['p50_ms']:.3f} ms, "
+                f"p99 {clock['p99_ms']:.3f} ms, {clock['skipped']} skipped"
+            )
+
+    async def run(self):
+        """
+        Runs all sessions until they end or `stop` is called.
+        """
+        self._loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="AsyncStreamingEngine"
+        )
+        io_executor = ThreadPoolExecutor(
+            max_workers=self.io_workers, thread_name_prefix="AsyncStreamingEngineIO"
+        )
+        try:
+            for session in self.sessions:
+                await session.open(self._loop, io_executor)
+            self._tasks = [
+                self._loop.create_task(session.run(self._loop, executor))
+                for session in self.sessions
+            ]
+            if self._stopping.is_set():
+                self._cancel_sessions()
+
+            results = await asyncio.gather(*self._tasks, return_exceptions=True)
+            for session, result in zip(self.sessions, results):
+                if isinstance(result, Exception):
+                    self.logger.error(
+                        "Error in streaming session", exc_info=result
+                    )
+                    session.error = result
+                    if self.error is None:
+                        self.error = result
+        except Exception as e:
+            self.logger.exception("Error in streaming engine")
+            if self.error is None:
+                self.error = e
+        finally:
+            for session in self.sessions:
+                await session.close()
+            # work still running in the executors has to finish before the
+            # streamers are closed
+            executor.shutdown(wait=True)
+            io_executor.shutdown(wait=True)
+
+    def _cancel_sessions(self):
+        for task in self._tasks:
+            task.cancel()
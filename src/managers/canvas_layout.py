@@ -0,0 +1,192 @@
+# src/managers/canvas_layout.py
+
+import json
+from typing import List
+
+import cv2
+import numpy as np
+
+from ..streamers.geometry import GeometryPlanCache
+
+# Device entries are streamer configs plus these placement keys
+TILE_KEYS = ("x", "y", "rotation")
+
+# Settings that only make sense for a whole source, the canvas takes them over
+CANVAS_ONLY_KEYS = ("crop", "scale", "interpolation")
+
+# How a streamer reaches its device. An entry with its own "host" or
+# "serialport" takes none of these from the defaults.
+TRANSPORT_KEYS = ("host", "port", "protocol", "serialport", "baudrate")
+
+
+class CanvasTile:
+    """
+    Placement of one device matrix on the canvas. `width` and `height` are
+    the matrix as the device sees it, `rotation` is how far the panel is
+    turned clockwise on the wall (0, 90, 180 or 270 degrees).
+    """
+
+    def __init__(self, x: int, y: int, width: int, height: int, rotation: int = 0):
+        if rotation % 90:
+            raise ValueError(f"Tile rotation must be a multiple of 90, got {rotation}")
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.rotation = rotation % 360
+        # footprint on the canvas, turned panels swap their sides
+        if self.rotation in (90, 270):
+            self.canvas_width, self.canvas_height = height, width
+        else:
+            self.canvas_width, self.canvas_height = width, height
+
+    def key(self) -> tuple:
+        return (self.x, self.y, self.width, self.height, self.rotation)
+
+    def view(self, canvas: np.ndarray) -> np.ndarray:
+        """
+        The part of `canvas` shown by this device, in the device's own
+        orientation. Always a view, nothing is copied.
+        """
+        region = canvas[
+            self.y : self.y + self.canvas_height, self.x : self.x + self.canvas_width
+        ]
+        return np.rot90(region, self.rotation // 90)
+
+
+class CanvasLayout:
+    """
+    One large logical canvas split across many devices.
+
+    The source is scaled once to canvas resolution with `render`, and every
+    device gets a zero-copy view of its tile.
+    """
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        tiles: List[CanvasTile],
+        devices: List[dict],
+        crop: List[int] = [],
+        scale: str = "fill",
+        interpolation: str = "smooth",
+        sync_commit: bool = False,
+        mirror: bool = False,
+    ):
+        self.width = width
+        self.height = height
+        self.tiles = tiles
+        self.devices = devices
+        self.crop = crop
+        self.scale = scale
+        # devices of one wall usually have to show each frame together
+        self.sync_commit = sync_commit
+        # devices showing the same tile share one packet buffer
+        self.mirror = mirror
+        self._interpolation = (
+            cv2.INTER_NEAREST if interpolation == "hard" else cv2.INTER_AREA
+        )
+        self._geometry = GeometryPlanCache()
+
+        for index, tile in enumerate(tiles):
+            if (
+                tile.x < 0
+                or tile.y < 0
+                or tile.x + tile.canvas_width > width
+                or tile.y + tile.canvas_height > height
+            ):
+                raise ValueError(
+                    f"Device {index} at ({tile.x}, {tile.y}) does not fit on the "
+                    f"{width}x{height} canvas"
+                )
+
+    @classmethod
+    def load(cls, path: str) -> "CanvasLayout":
+        """
+        Reads a layout file:
+
+            {
+                "canvas": {"width": 64, "height": 32, "scale": "fill", "sync": true},
+                "devices": [
+                    {"host": "192.168.1.50", "x": 0, "y": 0, "width": 32, "height": 32},
+                    {"host": "192.168.1.51", "x": 32, "y": 0, "width": 32, "height": 32,
+                     "rotation": 180, "gamma": 0.6}
+                ]
+            }
+
+        Besides the placement, a device entry takes any streamer setting.
+        With "sync", all devices send each frame back to back, see
+        StreamerManager.process_and_commit_frame. With "mirror", devices with
+        the same tile and settings are fed from one packet buffer, which is
+        sent once to a broadcast or multicast address if one of them has a
+        "mirror_address", see StreamerManager.group_mirrors.
+        """
+        with open(path) as f:
+            layout = json.load(f)
+
+        canvas = layout["canvas"]
+        tiles = []
+        devices = []
+        for device in layout["devices"]:
+            device = dict(device)
+            placement = {key: device.pop(key) for key in TILE_KEYS if key in device}
+            tiles.append(
+                CanvasTile(
+                    placement.get("x", 0),
+                    placement.get("y", 0),
+                    device["width"],
+                    device["height"],
+                    placement.get("rotation", 0),
+                )
+            )
+            devices.append(device)
+
+        return cls(
+            canvas["width"],
+            canvas["height"],
+            tiles,
+            devices,
+            canvas.get("crop", []),
+            canvas.get("scale", "fill"),
+            canvas.get("interpolation", "smooth"),
+            canvas.get("sync", False),
+            canvas.get("mirror", False),
+        )
+
+    def stream_configs(self, defaults: dict) -> List[dict]:
+        """
+        One streamer config per device: `defaults`, overridden by the device
+        entry, with the device's tile under "tile". Entries that name their
+        own host or serial port don't inherit the default transport.
+        """
+        configs = []
+        for tile, device in zip(self.tiles, self.devices):
+            skipped = CANVAS_ONLY_KEYS
+            if device.get("host") or device.get("serialport"):
+                skipped += TRANSPORT_KEYS
+            config = {
+                key: value
+                for key, value in defaults.items()
+                if key not in skipped
+            }
+            config.update(device)
+            config["tile"] = tile
+            configs.append(config)
+        return configs
+
+    def render(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Scales `frame` to canvas resolution into a reused buffer, which is
+        only valid until the next call.
+        """
+        plan = self._geometry.get(
+            frame.shape,
+            frame.dtype,
+            self.crop,
+            self.scale,
+            self.width,
+            self.height,
+            self._interpolation,
+        )
+        return plan.apply(frame)
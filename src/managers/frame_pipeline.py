@@ -0,0 +1,409 @@
+# src/managers/frame_pipeline.py
+
+import logging
+import threading
+import time
+from contextlib import nullcontext
+from typing import Callable, Optional
+
+import numpy as np
+
+from ..utils.allocation_guard import AllocationGuard
+from ..utils.frame_clock import FrameClock
+from ..utils.frame_pool import FramePool
+from ..utils.frame_ring import FrameRing
+from ..utils.load_shedder import LoadShedder
+from ..utils.static_content_gate import StaticContentGate
+from ..streamers.udpstreamer import UDPWLEDStreamer
+from .streamer_manager import StreamerManager
+
+# Load levels from normal operation to the deepest, each with the expected
+# increase in frame time from undoing it, see LoadShedder
+LOAD_LEVELS = (
+    ("normal", 1.0),
+    ("preview", 1.1),
+    ("interpolation", 1.25),
+    ("decode_skip", 2.0),
+    ("output_fps", 2.0),
+)
+# once previews are shed, only every n-th frame is previewed
+SHED_PREVIEW_EVERY = 4
+# static content is refreshed twice per WLED realtime timeout
+KEEPALIVE_SECONDS = UDPWLEDStreamer.REALTIME_TIMEOUT / 2
+
+
+class StageStats:
+    """
+    Frame count and time spent in one pipeline stage.
+    """
+
+    def __init__(self):
+        self.frames = 0
+        self.busy = 0.0
+        self.last = 0.0
+
+    def add(self, seconds: float):
+        self.frames += 1
+        self.busy += seconds
+        self.last = seconds
+
+    def as_dict(self) -> dict:
+        mean = self.busy / self.frames if self.frames else 0.0
+        return {"frames": self.frames, "mean_ms": mean * 1000}
+
+
+class FramePipeline:
+    """
+    Streams frames from a capture through a StreamerManager.
+
+    Capture, processing and sending run in their own threads, connected by
+    FrameRings that drop the oldest frame when full, so decoding frame N+1
+    overlaps with processing and sending frame N and a slow stage costs
+    frames instead of latency. Capture frames come from a FramePool when the
+    capture supports it, and processed LED frames are copied into pooled
+    buffers before they are handed to the send thread.
+
+    With `pipelined=False` the same stages run one after the other in a
+    single thread, which is what an AllocationGuard needs to attribute
+    allocations to a frame.
+
+    Frames are read on absolute deadlines kept by a FrameClock, which skips
+    missed frames or catches up on them according to `clock_policy`.
+
+    `preview` gets the frame of the first device at LED resolution while it
+    is processed, see StreamerManager.preview, and must copy what it keeps.
+
+    With `load_shedding`, a LoadShedder watches how much of its time budget
+    the slowest stage uses per frame. Under sustained overload it previews
+    fewer frames first, then switches to nearest-neighbour scaling, then
+    skips decoding every other source frame, and finally halves the output
+    frame rate, undoing the steps in reverse as headroom returns.
+
+    With `adaptive_rate`, a StaticContentGate drops source frames that are
+    the same as the last streamed one before they are processed, apart from
+    a keepalive every KEEPALIVE_SECONDS, so still images and paused text
+    cost next to nothing.
+    """
+
+    def __init__(
+        self,
+        player,
+        streamer_manager: StreamerManager,
+        frame_rate: float,
+        preview: Optional[Callable] = None,
+        queue_depth: int = 2,
+        pipelined: bool = True,
+        guard: AllocationGuard = None,
+        clock_policy: str = "skip",
+        load_shedding: bool = True,
+        adaptive_rate: bool = True,
+        logger: logging.Logger = None,
+    ):
+        self.player = player
+        self.manager = streamer_manager
+        self.frame_rate = frame_rate
+        self.preview = preview
+        self.pipelined = pipelined
+        self.guard = guard
+        self.logger = logger or logging.getLogger("FramePipeline")
+
+        self._capture_pool = (
+            FramePool() if getattr(player, "uses_frame_pool", False) else None
+        )
+        self._led_pool = FramePool()
+        self.process_queue = FrameRing(queue_depth, on_drop=self._release_capture)
+        self.send_queue = FrameRing(queue_depth, on_drop=self._release_led_frames)
+        self.stage_stats = {
+            "capture": StageStats(),
+            "process": StageStats(),
+            "send": StageStats(),
+        }
+        self.error = None  # type: Optional[BaseException]
+        self._stop = threading.Event()
+        self.clock = FrameClock(frame_rate, policy=clock_policy, stop_event=self._stop)
+        self._threads = []
+
+        # settings changed by the load shedder, see _apply_load_level
+        self.preview_every = 1
+        self.decode_skip = 0
+        self.output_frame_rate = frame_rate
+        self._previews = 0
+        self._clock_rate = frame_rate
+        if preview is not None:
+            streamer_manager.preview = self._show_preview
+        # switching interpolation builds new geometry plans, which the
+        # allocation guard would report
+        self.load = None  # type: Optional[LoadShedder]
+        if load_shedding and guard is None:
+            self.load = LoadShedder(LOAD_LEVELS, self._apply_load_level, logger=self.logger)
+
+        self.gate = None  # type: Optional[StaticContentGate]
+        if adaptive_rate:
+            self.gate = StaticContentGate(
+                streamer_manager.max_resolution,
+                keepalive=KEEPALIVE_SECONDS,
+                on_keepalive=streamer_manager.force_keyframe,
+                geometries=streamer_manager.geometries,
+            )
+
+    @property
+    def stats(self) -> dict:
+        """
+        Per stage: frames handled and mean time per frame, plus the depth,
+        highest depth and drop count of the queue feeding the stage. The
+        capture stage also reports the frame clock's deadline statistics.
+        """
+        stats = {name: stage.as_dict() for name, stage in self.stage_stats.items()}
+        for name, queue in (("process", self.process_queue), ("send", self.send_queue)):
+            stats[name].update(
+                queue_depth=queue.depth,
+                max_queue_depth=queue.max_depth,
+                dropped=queue.dropped,
+            )
+        stats["capture"]["clock"] = self.clock.stats
+        if self.load is not None:
+            stats["load"] = self.load.stats
+        if self.gate is not None:
+            stats["capture"]["static"] = self.gate.stats
+        return stats
+
+    def start(self):
+        if self.pipelined:
+            loops = [self._capture_loop, self._process_loop, self._send_loop]
+        else:
+            loops = [self._serial_loop]
+        for loop in loops:
+            thread = threading.Thread(
+                target=loop, name=f"FramePipeline{loop.__name__}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def is_alive(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    def stop(self):
+        self._stop.set()
+        self.process_queue.close()
+        self.send_queue.close()
+        for thread in self._threads:
+            thread.join(timeout=2)
+        self.process_queue.clear()
+        self.send_queue.clear()
+
+        stats = self.stats
+        for name in self.stage_stats:
+            stage = stats[name]
+            details = f"{stage['frames']} frames, {stage['mean_ms']:.2f} ms each"
+            if "dropped" in stage:
+                details += (
+                    f", queue depth up to {stage['max_queue_depth']}, "
+                    f"{stage['dropped']} dropped"
+                )
+            if "clock" in stage:
+                clock = stage["clock"]
+                details += (
+                    f", deadline error p50 {clock['p50_ms']:.3f} ms, "
+                    f"p99 {clock['p99_ms']:.3f} ms, {clock['late']} late, "
+                    f"{clock['skipped']} skipped"
+                )
+            self.logger.info(f"Pipeline {name}: {details}")
+        if self.gate is not None and self.gate.static:
+            static = stats["capture"]["static"]
+            self.logger.info(
+                f"Static content: {static['static']} of {static['frames']} frames "
+                f"not streamed, {static['keepalives']} keepalives"
+            )
+        if self.load is not None and self.load.transitions:
+            load = stats["load"]
+            seconds = ", ".join(
+                f"{level} {time:.1f} s" for level, time in load["seconds"].items() if time
+            )
+            self.logger.info(
+                f"Load shedding: {load['steps_down']} steps down, {load['steps_up']} "
+                f"up, ended at {load['level']}; time per level: {seconds}"
+            )
+
+    def read_frame(self):
+        start = time.perf_counter()
+        if self._capture_pool is not None:
+            frame = self.player.read(self._capture_pool)
+        else:
+            frame = self.player.read()
+        self.stage_stats["capture"].add(time.perf_counter() - start)
+        return frame
+
+    def process(self, frame) -> list:
+        """
+        Processes a capture frame, returning LED frames in pooled buffers
+        that belong to the caller.
+        """
+        start = time.perf_counter()
+        led_frames = []
+        for output in self.manager.process_streamer_frames(frame):
+            buffer = self._led_pool.acquire(output.shape, output.dtype)
+            np.copyto(buffer, output)
+            led_frames.append(buffer)
+        self.stage_stats["process"].add(time.perf_counter() - start)
+        self._update_load()
+        return led_frames
+
+    def send(self, led_frames: list):
+        start = time.perf_counter()
+        self.manager.send_streamer_frames(led_frames)
+        self.stage_stats["send"].add(time.perf_counter() - start)
+
+    def _capture_loop(self):
+        try:
+            self.clock.start()
+            skipped = 0
+            while not self._stop.is_set():
+                if skipped < self.decode_skip:
+                    skipped += 1
+                    if not self._skip_source_frame():
+                        self.logger.warning("End of source, stopping streaming")
+                        break
+                else:
+                    skipped = 0
+                    frame = self.read_frame()
+                    if frame is None:
+                        self.logger.warning("Received None frame, stopping streaming")
+                        break
+                    if self.gate is None or self.gate.should_send(frame):
+                        self.process_queue.put(frame)
+                    else:
+                        self._release_capture(frame)
+                if not self._pace():
+                    break
+        except Exception as e:
+            self._fail(e)
+        finally:
+            self.process_queue.close()
+
+    def _process_loop(self):
+        try:
+            while not self._stop.is_set():
+                frame = self.process_queue.get()
+                if frame is None:
+                    break
+                try:
+                    led_frames = self.process(frame)
+                finally:
+                    self._release_capture(frame)
+                self.send_queue.put(led_frames)
+        except Exception as e:
+            self._fail(e)
+        finally:
+            self.send_queue.close()
+
+    def _send_loop(self):
+        try:
+            while not self._stop.is_set():
+                led_frames = self.send_queue.get()
+                if led_frames is None:
+                    break
+                try:
+                    self.send(led_frames)
+                finally:
+                    self._release_led_frames(led_frames)
+        except Exception as e:
+            self._fail(e)
+
+    def _serial_loop(self):
+        try:
+            self.clock.start()
+            skipped = 0
+            while not self._stop.is_set():
+                if skipped < self.decode_skip:
+                    skipped += 1
+                    if not self._skip_source_frame():
+                        self.logger.warning("End of source, stopping streaming")
+                        break
+                    if not self._pace():
+                        break
+                    continue
+                skipped = 0
+
+                with self.guard.frame() if self.guard else nullcontext():
+                    frame = self.read_frame()
+                    if frame is None:
+                        self.logger.warning("Received None frame, stopping streaming")
+                        break
+                    streamed = self.gate is None or self.gate.should_send(frame)
+                    if streamed:
+                        start = time.perf_counter()
+                        led_frames = self.manager.process_streamer_frames(frame)
+                        self.stage_stats["process"].add(time.perf_counter() - start)
+                        self.send(led_frames)
+
+                if streamed:
+                    self._update_load()
+                self._release_capture(frame)
+                if not self._pace():
+                    break
+        except Exception as e:
+            self._fail(e)
+
+    def _show_preview(self, frame):
+        if self.preview is None:
+            return
+        self._previews += 1
+        if self._previews >= self.preview_every:
+            self._previews = 0
+            self.preview(frame)
+
+    def _skip_source_frame(self) -> bool:
+        """
+        Moves the source past a frame without decoding it, live sources
+        simply aren't read. Returns False at the end of the source.
+        """
+        grab = getattr(self.player, "grab", None)
+        return grab() if grab is not None else True
+
+    def _pace(self) -> bool:
+        if self._clock_rate != self.output_frame_rate:
+            self._clock_rate = self.output_frame_rate
+            self.clock.set_frame_rate(self._clock_rate)
+        return self.clock.wait()
+
+    def _update_load(self):
+        """
+        Feeds the time the bottleneck spent on the last frame to the load
+        shedder. Pipelined stages overlap, so the slowest one counts,
+        otherwise all of them. Each streamed frame has the ticks it skipped
+        as budget too.
+        """
+        if self.load is None:
+            return
+        stages = self.stage_stats.values()
+        if self.pipelined:
+            busy = max(stage.last for stage in stages)
+        else:
+            busy = sum(stage.last for stage in stages)
+        self.load.update(busy, (1 + self.decode_skip) / self.output_frame_rate)
+
+    def _apply_load_level(self, level: int):
+        """
+        Switches to a level of LOAD_LEVELS, called from the thread that
+        processes frames. Each level keeps the steps of the ones before it.
+        """
+        self.preview_every = SHED_PREVIEW_EVERY if level >= 1 else 1
+        self.manager.set_fast_interpolation(level >= 2)
+        self.decode_skip = 1 if level >= 3 else 0
+        self.output_frame_rate = self.frame_rate / 2 if level >= 4 else self.frame_rate
+
+    def _fail(self, error: BaseException):
+        self.logger.exception("Error in streaming pipeline")
+        if self.error is None:
+            self.error = error
+        self._stop.set()
+        self.process_queue.close()
+        self.send_queue.close()
+
+    def _release_capture(self, frame):
+        if self._capture_pool is not None and self._capture_pool.owns(frame):
+            self._capture_pool.release(frame)
+
+    def _release_led_frames(self, led_frames: list):
+        for frame in led_frames:
+            self._led_pool.release(frame)
@@ -0,0 +1,327 @@
+# src/managers/multiprocess_engine.py
+
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from typing import Callable, List, Optional
+
+from ..utils.frame_clock import FrameClock
+from ..utils.shared_frame_ring import SharedFrameRing
+from .frame_pipeline import StageStats
+from .streamer_manager import StreamerFrameError, StreamerManager
+
+
+def split_groups(stream_configs: list, groups: int) -> List[list]:
+    """
+    Splits stream configs into at most `groups` consecutive groups whose
+    sizes differ by one at most.
+    """
+    groups = max(1, min(groups, len(stream_configs)))
+    size, extra = divmod(len(stream_configs), groups)
+    result = []
+    start = 0
+    for index in range(groups):
+        end = start + size + (1 if index < extra else 0)
+        result.append(stream_configs[start:end])
+        start = end
+    return result
+
+
+def _source_main(source_factory, frame_rate, clock_policy, capacity, condition, stop_event, messages):
+    """
+    Source process: decodes frames and publishes them into a new ring, which
+    is kept until the engine stops so late readers can still attach to it.
+    """
+    player = None
+    ring = None
+    try:
+        player = source_factory()
+        frame = player.read()
+        if frame is None:
+            messages.put(("error", "The source did not produce any frames"))
+            return
+        ring = SharedFrameRing.create(frame.shape, frame.dtype, capacity, condition)
+        messages.put(("ring", ring.description))
+
+        capture = StageStats()
+        clock = FrameClock(frame_rate, policy=clock_policy, stop_event=stop_event)
+        clock.start()
+        shape = frame.shape
+        while frame is not None:
+            if frame.shape != shape:
+                # the ring keeps its size, the workers keep their geometry
+                shape = frame.shape
+                messages.put((
+                    "warning",
+                    f"Source changed to {shape[1]}x{shape[0]}, frames are scaled "
+                    f"to the {ring.shape[1]}x{ring.shape[0]} shared frames",
+                ))
+            ring.publish(frame)
+            if not clock.wait():
+                break
+            start = time.perf_counter()
+            frame = player.read()
+            capture.add(time.perf_counter() - start)
+        ring.close()
+        messages.put(("source", dict(capture.as_dict(), clock=clock.stats)))
+        stop_event.wait()
+    except Exception as e:
+        messages.put(("error", f"Source failed: {e!r}"))
+    finally:
+        if ring is not None:
+            ring.close()
+            ring.release()
+        if player is not None:
+            player.stop()
+
+
+def _worker_main(index, stream_configs, manager_options, ring_description, condition, stop_event, messages, preview_condition=None):
+    """
+    Worker process: streams the newest frame of the ring to a group of
+    devices, reading it in place. With a `preview_condition`, it also
+    publishes what its first device shows into a ring of its own.
+    """
+    manager = None
+    ring = None
+    preview_ring = None
+    stats = {"frames": 0, "skipped": 0, "torn": 0}
+    process = StageStats()
+
+    def publish_preview(frame):
+        nonlocal preview_ring
+        if preview_ring is None:
+            preview_ring = SharedFrameRing.create(frame.shape, frame.dtype, 2, preview_condition)
+            messages.put(("preview", preview_ring.description))
+        preview_ring.publish(frame)
+
+    try:
+        manager = StreamerManager(stream_configs, **manager_options)
+        if preview_condition is not None:
+            manager.preview = publish_preview
+        ring = SharedFrameRing.attach(*ring_description, condition)
+        sequence = 0
+        while not stop_event.is_set():
+            latest = ring.wait_newer(sequence, timeout=0.1)
+            if latest is None:
+                if ring.closed:
+                    break
+                continue
+            newest, frame = latest
+            latest = None
+            stats["skipped"] += newest - sequence - 1
+            sequence = newest
+
+            start = time.perf_counter()
+            errors = manager.prepare_streamer_frames(frame)
+            del frame
+            if ring.intact(sequence):
+                manager.commit_prepared(errors)
+            else:
+                # the source lapped this worker while it was reading the frame
+                stats["torn"] += 1
+                if errors:
+                    raise StreamerFrameError(errors)
+            process.add(time.perf_counter() - start)
+            stats["frames"] += 1
+        messages.put(("worker", index, dict(stats, mean_ms=process.as_dict()["mean_ms"])))
+    except Exception as e:
+        messages.put(("error", f"Worker {index} failed: {e!r}"))
+    finally:
+        if ring is not None:
+            ring.release()
+        if preview_ring is not None:
+            preview_ring.close()
+            preview_ring.release()
+        if manager is not None:
+            manager.close_all()
+
+
+class MultiprocessEngine:
+    """
+    Streams one source from separate processes, so decoding, processing and
+    sending don't share a GIL.
+
+    The source is opened by `source_factory` in a process of its own, which
+    paces it with a FrameClock and publishes every frame into a
+    SharedFrameRing. The devices are split into `processes` groups, each
+    streamed by a worker process with its own StreamerManager built from the
+    group's stream configs and `manager_options`. Workers always take the
+    newest frame and read it from shared memory in place.
+
+    `source_factory`, the configs and the options are sent to the processes
+    and have to be picklable, e.g. a functools.partial of a capture class.
+    Devices in different groups are independent, sync commit and mirroring
+    only apply within a group. `preview` gets what the first device shows
+    at LED resolution, or the canvas with a layout, from the first worker.
+    """
+
+    def __init__(
+        self,
+        source_factory: Callable,
+        stream_configs: list,
+        frame_rate: float,
+        processes: int = 0,
+        manager_options: dict = None,
+        preview: Optional[Callable] = None,
+        clock_policy: str = "skip",
+        capacity: int = 4,
+        logger: logging.Logger = None,
+    ):
+        self.groups = split_groups(
+            stream_configs, processes or os.cpu_count() or 1
+        )
+        self.manager_options = manager_options or {}
+        self.preview = preview
+        self.logger = logger or logging.getLogger("MultiprocessEngine")
+        self.error = None  # type: Optional[BaseException]
+        self.source_stats = None  # type: Optional[dict]
+        self.worker_stats = {}
+
+        # spawned processes don't inherit the GUI's threads and windows
+        self._context = multiprocessing.get_context("spawn")
+        self._condition = self._context.Condition()
+        self._stop = self._context.Event()
+        self._messages = self._context.Queue()
+        self._preview_condition = self._context.Condition() if preview is not None else None
+        self._source = self._context.Process(
+            target=_source_main,
+            args=(
+                source_factory,
+                frame_rate,
+                clock_policy,
+                capacity,
+                self._condition,
+                self._stop,
+                self._messages,
+            ),
+            name="WLEDStudioSource",
+            daemon=True,
+        )
+        self._workers = []
+        self._preview_description = None  # type: Optional[tuple]
+        self._thread = None  # type: Optional[threading.Thread]
+
+    def start(self):
+        self._source.start()
+        self._thread = threading.Thread(
+            target=self._supervise, name="MultiprocessEngine", daemon=True
+        )
+        self._thread.start()
+
+    def is_alive(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        for process in self._workers + [self._source]:
+            if process.pid is None:
+                continue
+            process.join(timeout=2)
+            if process.is_alive():
+                self.logger.warning(f"{process.name} did not stop, terminating it")
+                process.terminate()
+
+        if self.source_stats is not None:
+            stats = self.source_stats
+            clock = stats["clock"]
+            self.logger.info(
+                f"Source process: {clock['frames']} frames, {stats['mean_ms']:.2f} ms "
+                f"to decode, deadline error p50 {clock['p50_ms']:.3f} ms, "
+                f"p99 {clock['p99_ms']:.3f} ms, {clock['skipped']} skipped"
+            )
+        for index, stats in sorted(self.worker_stats.items()):
+            self.logger.info(
+                f"Worker process {index} ({len(self.groups[index])} devices): "
+                f"{stats['frames']} frames, {stats['mean_ms']:.2f} ms each, "
+                f"{stats['skipped']} skipped, {stats['torn']} overwritten while read"
+            )
+
+    def _start_workers(self, ring_description: tuple):
+        for index, group in enumerate(self.groups):
+            process = self._context.Process(
+                target=_worker_main,
+                args=(
+                    index,
+                    group,
+                    self.manager_options,
+                    ring_description,
+                    self._condition,
+                    self._stop,
+                    self._messages,
+                    self._preview_condition if index == 0 else None,
+                ),
+                name=f"WLEDStudioWorker{index}",
+                daemon=True,
+            )
+            process.start()
+            self._workers.append(process)
+
+    def _supervise(self):
+        """
+        Starts the workers once the source published its ring, collects
+        their results, and ends when all of them are done or one failed.
+        """
+        ring = None
+        sequence = 0
+        try:
+            while True:
+                try:
+                    self._handle(self._messages.get(timeout=0.1))
+                except queue.Empty:
+                    pass
+                if ring is None and self._preview_description:
+                    try:
+                        ring = SharedFrameRing.attach(*self._preview_description, self._preview_condition)
+                    except FileNotFoundError:
+                        # the worker already ended and freed it
+                        self._preview_description = None
+
+                if ring is not None:
+                    latest = ring.wait_newer(sequence, timeout=0)
+                    if latest is not None:
+                        sequence = latest[0]
+                        self.preview(latest[1])
+                    latest = None
+
+                if self._workers:
+                    if not any(process.is_alive() for process in self._workers):
+                        break
+                elif not self._source.is_alive() or self._stop.is_set():
+                    if self.error is None and not self._stop.is_set():
+                        self.error = RuntimeError("The source process exited unexpectedly")
+                    break
+        finally:
+            # lets the source free the ring
+            self._stop.set()
+            if ring is not None:
+                ring.release()
+            self._source.join(timeout=2)
+            while True:
+                try:
+                    self._handle(self._messages.get_nowait())
+                except queue.Empty:
+                    break
+
+    def _handle(self, message: tuple):
+        kind = message[0]
+        if kind == "ring":
+            if not self._stop.is_set():
+                self._start_workers(message[1])
+        elif kind == "preview":
+            self._preview_description = message[1]
+        elif kind == "source":
+            self.source_stats = message[1]
+        elif kind == "worker":
+            self.worker_stats[message[1]] = message[2]
+        elif kind == "warning":
+            self.logger.warning(message[1])
+        elif kind == "error":
+            self.logger.error(message[1])
+            if self.error is None:
+                self.error = RuntimeError(message[1])
+            self._stop.set()
@@ -1,31 +1,644 @@
 # src/managers/streamer_manager.py
 
 import logging
+import math
+import re
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+import cv2
+import requests
+
 from ..streamers.udpstreamer import UDPWLEDStreamer
+from ..streamers.ddpstreamer import DDPWLEDStreamer
+from ..streamers.e131streamer import E131WLEDStreamer
+from ..streamers.artnetstreamer import ArtNetWLEDStreamer
 from ..streamers.serialstreamer import SerialWLEDStreamer
+from ..streamers.ledmap import LedMap
+from ..utils.frame_stage_cache import FrameStageCache
+from ..utils.led_monitor import LedMonitor
+from .canvas_layout import CanvasLayout
+
+# Oldest WLED release that accepts DDP realtime input
+DDP_MIN_VERSION = (0, 11, 0)
+
+# Protocols that are only used when explicitly configured, they bring their
+# own port so the WLED realtime UDP port from the config is dropped
+UNIVERSE_STREAMERS = {
+    "e131": E131WLEDStreamer,
+    "artnet": ArtNetWLEDStreamer,
+}
+
+# Options only understood by UDPWLEDStreamer (DRGB/DNRGB)
+UDP_OPTIONS = (
+    "delta",
+    "keyframe_interval",
+    "keyframe_ms",
+    "pacing",
+    "packet_spacing_ms",
+    "max_bytes_per_second",
+    "frame_interval",
+)
+
+# UDP_OPTIONS that turn on a feature, the others only tune one
+UDP_FEATURES = ("delta", "pacing")
+
+# Seconds a device's /json/info is reused for protocol selection, a failed
+# request is retried sooner
+DEVICE_INFO_TTL = 300
+DEVICE_INFO_RETRY = 30
+DEVICE_INFO_TIMEOUT = 2
+
+# Color calibration understood by every streamer, see ColorPipeline
+COLOR_OPTIONS = ("brightness", "white_balance", "lut_path")
+
+
+class StreamerFrameError(Exception):
+    """
+    Raised after a frame was handed to every streamer, when some of them
+    failed. `errors` maps the streamer index to its exception.
+    """
+
+    def __init__(self, errors: dict):
+        self.errors = errors
+        details = ", ".join(
+            f"streamer {index}: {error!r}" for index, error in sorted(errors.items())
+        )
+        super().__init__(f"{len(errors)} streamer(s) failed: {details}")
+
+
+def parse_wled_version(version: str) -> tuple:
+    """
+    Parses a WLED version string such as "0.14.0-b1" into a comparable tuple.
+    """
+    numbers = re.findall(r"\d+", version or "")[:3]
+    return tuple(int(n) for n in numbers) + (0,) * (3 - len(numbers))
+
+
+def protocol_costs(led_count: int, version: str = "") -> dict:
+    """
+    Returns the (packets, bytes) needed per frame for every UDP protocol that
+    can address `led_count` pixels on a device running WLED `version`.
+    Bytes include the IPv4/UDP headers of every packet.
+    """
+    overhead = DDPWLEDStreamer.IP_UDP_OVERHEAD
+    payload = led_count * 3
+    costs = {}
+
+    if led_count <= UDPWLEDStreamer.MAX_PIXELS_DRGB:
+        costs["drgb"] = (1, payload + 2 + overhead)
+
+    per_packet = UDPWLEDStreamer.MAX_PIXELS_PER_FRAME
+    packets = math.ceil(led_count / per_packet)
+    if (packets - 1) * per_packet <= UDPWLEDStreamer.MAX_START_DNRGB:
+        costs["dnrgb"] = (packets, payload + packets * (4 + overhead))
+
+    if parse_wled_version(version) >= DDP_MIN_VERSION:
+        per_packet = DDPWLEDStreamer.pixelsPerPacket()
+        packets = math.ceil(led_count / per_packet)
+        costs["ddp"] = (
+            packets,
+            payload + packets * (DDPWLEDStreamer.HEADER_SIZE + overhead),
+        )
+
+    return costs
+
 
 class StreamerManager:
-    def __init__(self, stream_configs: list, logger: logging.Logger = None):
+    # resolved host -> (time fetched, /json/info or None), shared by all
+    # managers so restarting the stream does not block on the device again
+    _device_info = {}
+
+    def __init__(
+        self,
+        stream_configs: list,
+        logger: logging.Logger = None,
+        sync_commit: bool = False,
+        mirror: bool = False,
+        workers: int = 0,
+        share_stages: bool = True,
+        layout: CanvasLayout = None,
+    ):
         self.streamers = []
         self.logger = logger or logging.getLogger("StreamerManager")
+        # with a layout, frames are scaled once to the canvas and every
+        # streamer gets a view of its tile, taken from its config's "tile"
+        self.layout = layout
+        self._tiles = {}
+        # prepare every device first, then send them all in one tight burst
+        self.sync_commit = sync_commit
+        self.sync_stats = {
+            "frames": 0,
+            "last_skew": 0.0,
+            "max_skew": 0.0,
+            "total_skew": 0.0,
+        }
+        mirror_addresses = {}
         for config in stream_configs:
+            config = dict(config)
+            protocol = config.pop("protocol", "auto") or "auto"
+            mirror_address = config.pop("mirror_address", None)
+            tile = config.pop("tile", None)
+            udp_options = {
+                key: config.pop(key) for key in UDP_OPTIONS if key in config
+            }
+            color_options = {
+                key: config.pop(key) for key in COLOR_OPTIONS if key in config
+            }
+            ledmap = config.pop("ledmap", None)
+            features = [key for key in UDP_FEATURES if udp_options.get(key)]
             if "serialport" in config and config["serialport"]:
+                if features:
+                    self.logger.warning(
+                        f"{', '.join(features)} only work(s) with DRGB/DNRGB, "
+                        f"ignored for serial port {config['serialport']}"
+                    )
                 self.logger.debug(f"Initializing SerialWLEDStreamer with config: {config}")
                 streamer = SerialWLEDStreamer(**config)
+                self.configure_output(streamer, color_options, ledmap)
+                if tile is not None:
+                    self._tiles[streamer] = tile
+                self.streamers.append(streamer)
+                continue
+
+            if protocol == "auto":
+                # only DNRGB sends changes, only DRGB/DNRGB can be paced
+                if udp_options.get("delta"):
+                    protocols = ("dnrgb",)
+                elif features:
+                    protocols = ("drgb", "dnrgb")
+                else:
+                    protocols = None
+                protocol = self.select_protocol(config, protocols)
+
+            if features and protocol not in ("drgb", "dnrgb"):
+                self.logger.warning(
+                    f"{', '.join(features)} only work(s) with DRGB/DNRGB, "
+                    f"ignored for {protocol.upper()} on {config.get('host')}"
+                )
+
+            if protocol in UNIVERSE_STREAMERS:
+                config.pop("port", None)
+                self.logger.debug(
+                    f"Initializing {UNIVERSE_STREAMERS[protocol].__name__} with config: {config}"
+                )
+                streamer = UNIVERSE_STREAMERS[protocol](**config)
+            elif protocol == "ddp":
+                # the configured port is WLED's realtime UDP port, DDP has its own
+                config.pop("port", None)
+                self.logger.debug(f"Initializing DDPWLEDStreamer with config: {config}")
+                streamer = DDPWLEDStreamer(**config)
             else:
-                self.logger.debug(f"Initializing UDPWLEDStreamer with config: {config}")
-                streamer = UDPWLEDStreamer(**config)
+                self.logger.debug(
+                    f"Initializing UDPWLEDStreamer ({protocol}) with config: {config}"
+                )
+                streamer = UDPWLEDStreamer(protocol=protocol, **udp_options, **config)
+            self.configure_output(streamer, color_options, ledmap)
+            if mirror_address and isinstance(streamer, E131WLEDStreamer):
+                # every universe has its own multicast group, one address
+                # for all of them would leave receivers without their data
+                self.logger.warning(
+                    f"E1.31 sends each universe to its own address, mirror_address "
+                    f"{mirror_address} is ignored and the devices are mirrored one by one"
+                )
+                mirror = True
+            elif mirror_address:
+                mirror_addresses[streamer] = mirror_address
+            if tile is not None:
+                self._tiles[streamer] = tile
             self.streamers.append(streamer)
 
+        if self.layout is not None and len(self._tiles) != len(self.streamers):
+            raise ValueError(
+                "A canvas layout needs a tile for every streamer, see CanvasLayout.stream_configs"
+            )
+        if self.layout is None and self._tiles:
+            raise ValueError("Streamer configs with a tile need a canvas layout")
+
+        # streamers that process and send frames, mirrors are fed by them
+        self.active_streamers = list(self.streamers)
+        self.mirror_groups = []
+        # a mirror address only makes sense with mirroring, it turns it on
+        if mirror or mirror_addresses:
+            self.group_mirrors(mirror_addresses)
+
+        if self.sync_commit:
+            paced = sum(streamer.paced for streamer in self.active_streamers)
+            if paced:
+                self.logger.warning(
+                    f"{paced} paced streamer(s) spread their packets over the "
+                    f"frame interval, they are not synchronized or in the commit skew"
+                )
+            for streamer in self.active_streamers:
+                if isinstance(streamer, DDPWLEDStreamer):
+                    streamer.deferPush()
+
+        # cv2.resize, cv2.LUT and socket sends release the GIL, so a persistent
+        # pool processes devices in parallel; 0 or 1 keeps the plain loop
+        self.workers = workers
+        self._executor = None
+        if workers > 1 and len(self.active_streamers) > 1:
+            self._executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="StreamerManager"
+            )
+
+        # devices with the same crop, size or color share those stages per frame
+        self._stage_cache = None
+        if share_stages and self.layout is None and len(self.active_streamers) > 1:
+            self._stage_cache = FrameStageCache()
+
+        # configured interpolation while it is overridden, see set_fast_interpolation
+        self._interpolations = {}
+
+        # called with what the first device shows at LED resolution (BGR),
+        # or the whole canvas with a layout; it must not keep the frame
+        self.preview = None  # type: Optional[Callable]
+        # gets every device's RGB frame at LED resolution, see LedMonitor
+        self.monitor = None  # type: Optional[LedMonitor]
+        self._monitor_indices = {
+            streamer: index for index, streamer in enumerate(self.active_streamers)
+        }
+
+    def configure_output(self, streamer, color_options: dict, ledmap=None):
+        """
+        Applies the color calibration and LED order of a streamer config.
+        """
+        streamer.color.configure(**color_options)
+        if ledmap:
+            streamer.ledmap = LedMap.fromConfig(ledmap, streamer.width, streamer.height)
+            self.logger.debug(f"LED map for {streamer.width}x{streamer.height}: {ledmap}")
+
+    def group_mirrors(self, mirror_addresses: dict = None):
+        """
+        Groups streamers that turn a frame into identical packets. Only the
+        first streamer of a group processes frames, its packet buffer is sent
+        to the other devices as well, or once to the group's broadcast or
+        multicast address if one of them has a `mirror_address`. E1.31
+        streamers never get one, see __init__.
+        """
+        mirror_addresses = mirror_addresses or {}
+        groups = {}
+        for streamer in self.streamers:
+            packet_key = streamer.packetKey()
+            if packet_key is None:
+                continue
+            tile = self._tiles.get(streamer)
+            tile_key = (tile.key(),) if tile is not None else ()
+            groups.setdefault(
+                streamer.processingKey() + tile_key + packet_key, []
+            ).append(streamer)
+
+        for leader, *members in groups.values():
+            if not members:
+                continue
+            self.mirror_groups.append([leader] + members)
+            for member in members:
+                self.active_streamers.remove(member)
+
+            address = next(
+                (
+                    mirror_addresses[streamer]
+                    for streamer in [leader] + members
+                    if streamer in mirror_addresses
+                ),
+                None,
+            )
+            if address:
+                self.logger.info(
+                    f"Mirroring {len(members) + 1} streamers to {address}:{leader._port}"
+                )
+                leader._socket.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+                leader._socket.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 1)
+                leader._engine.connect(
+                    leader._socket, [(address, leader._port)] * len(leader._engine.packets)
+                )
+                continue
+
+            self.logger.info(f"Mirroring {len(members) + 1} streamers from one packet buffer")
+            for member in members:
+                if member._engine.destinations != leader._engine.destinations:
+                    leader.addMirror(member)
+
+    def select_protocol(self, config: dict, protocols: Optional[tuple] = None) -> str:
+        """
+        Picks the UDP protocol with the fewest packets, then the fewest bytes,
+        per frame for the device described by `config`, based on its /json/info.
+        With `protocols`, only those are considered while one of them can
+        address the device.
+        """
+        info = self.device_info(config.get("host", "127.0.0.1"))
+
+        led_count = info.get("leds", {}).get("count", 0)
+        if not led_count:
+            led_count = config.get("width", 0) * config.get("height", 0)
+        if not led_count:
+            self.logger.debug("LED count unknown, using DNRGB")
+            return "dnrgb"
+
+        costs = protocol_costs(led_count, info.get("ver", ""))
+        if not costs:
+            self.logger.warning(f"No protocol can address {led_count} LEDs, using DNRGB")
+            return "dnrgb"
+
+        if protocols is not None:
+            allowed = {name: cost for name, cost in costs.items() if name in protocols}
+            if allowed:
+                costs = allowed
+            else:
+                self.logger.warning(
+                    f"{'/'.join(p.upper() for p in protocols)} can not address "
+                    f"{led_count} LEDs, the requested options are ignored"
+                )
+
+        protocol = min(costs, key=costs.get)
+        self.logger.info(
+            f"Selected {protocol.upper()} for {led_count} LEDs "
+            f"(WLED {info.get('ver', 'unknown')}): {costs}"
+        )
+        return protocol
+
+    def device_info(self, host: str) -> dict:
+        """
+        The /json/info of the WLED device at `host`, empty if it can not be
+        reached. Answers are cached for DEVICE_INFO_TTL seconds, failures for
+        DEVICE_INFO_RETRY seconds, so only the first start waits for it.
+        """
+        now = time.monotonic()
+        try:
+            host = socket.gethostbyname(host)
+        except OSError as e:
+            self.logger.warning(f"Could not resolve {host} for protocol selection: {e}")
+            return {}
+        fetched, info = self._device_info.get(host, (None, None))
+        if fetched is not None:
+            ttl = DEVICE_INFO_TTL if info is not None else DEVICE_INFO_RETRY
+            if now - fetched < ttl:
+                return info or {}
+
+        info = None
+        try:
+            response = requests.get(f"http://{host}/json/info", timeout=DEVICE_INFO_TIMEOUT)
+            info = response.json()
+        except Exception as e:
+            self.logger.warning(f"Could not get info from WLED for protocol selection: {e}")
+        self._device_info[host] = (now, info)
+        return info or {}
+
+    def force_keyframe(self):
+        """
+        Makes every streamer send its next frame in full, see
+        StaticContentGate's keepalives.
+        """
+        for streamer in self.active_streamers:
+            streamer.forceKeyframe()
+
+    def set_fast_interpolation(self, enabled: bool):
+        """
+        Switches every streamer and the layout to nearest-neighbour scaling,
+        or back to the interpolation they were configured with.
+        """
+        targets = list(self.active_streamers)
+        if self.layout is not None:
+            targets.append(self.layout)
+        for target in targets:
+            if enabled:
+                self._interpolations.setdefault(target, target._interpolation)
+                target._interpolation = cv2.INTER_NEAREST
+            elif target in self._interpolations:
+                target._interpolation = self._interpolations.pop(target)
+
+    @property
+    def max_resolution(self) -> tuple:
+        """
+        Largest (height, width) any streamer, or the canvas, works at.
+        """
+        sizes = [(streamer.height, streamer.width) for streamer in self.active_streamers]
+        if self.layout is not None:
+            sizes.append((self.layout.height, self.layout.width))
+        return (max(size[0] for size in sizes), max(size[1] for size in sizes))
+
+    def geometries(self) -> list:
+        """
+        (crop, scale, width, height, interpolation) of every distinct crop
+        and scale stage frames go through, the canvas's with a layout.
+        """
+        targets = [self.layout] if self.layout is not None else self.active_streamers
+        geometries = []
+        for target in targets:
+            geometry = (
+                tuple(target.crop),
+                target.scale,
+                target.width,
+                target.height,
+                target._interpolation,
+            )
+            if geometry not in geometries:
+                geometries.append(geometry)
+        return geometries
+
+    @property
+    def max_fps(self):
+        """
+        Lowest frame rate any streamer can sustain, None if unlimited.
+        """
+        limits = [
+            streamer.max_fps
+            for streamer in self.streamers
+            if getattr(streamer, "max_fps", None)
+        ]
+        return min(limits) if limits else None
+
+    def begin_frame(self, frame):
+        """
+        Per-frame setup before the frame is handed to the streamers. Returns
+        what they get, the rendered canvas when a layout is used.
+        """
+        if self._stage_cache is not None:
+            self._stage_cache.new_frame()
+        if self.layout is not None:
+            canvas = self.layout.render(frame)
+            if self.preview is not None:
+                self.preview(canvas)
+            return canvas
+        return frame
+
+    def process_frame(self, streamer, frame):
+        tile = self._tiles.get(streamer)
+        cache = self._stage_cache
+        if tile is not None:
+            # frame is the canvas, only the color stage is left per device
+            stream_frame = streamer.colorFrame(tile.view(frame))
+        elif cache is None:
+            stream_frame = streamer.geometryFrame(frame)
+            self._preview_streamer(streamer, stream_frame)
+            stream_frame = streamer.colorFrame(stream_frame)
+        else:
+            # crop and scale run fused, the color key extends the geometry key
+            geometry_key = (
+                tuple(streamer.crop),
+                (streamer.width, streamer.height, streamer.scale, streamer._interpolation),
+            )
+            stream_frame = cache.get(geometry_key, streamer.geometryFrame, frame)
+            self._preview_streamer(streamer, stream_frame)
+            color_key = geometry_key + (streamer.color.key,)
+            stream_frame = cache.get(color_key, streamer.colorFrame, stream_frame)
+        if self.monitor is not None and self.monitor.active:
+            self.monitor.submit(self._monitor_indices[streamer], stream_frame)
+        # the LED order belongs to the device, it is never shared
+        return streamer.mapFrame(stream_frame)
+
+    def _preview_streamer(self, streamer, frame):
+        if self.preview is not None and streamer is self.active_streamers[0]:
+            self.preview(frame)
+
+    def for_each_streamer(self, action, frame):
+        """
+        Calls `action(streamer, frame)` for every active streamer, in parallel
+        when a worker pool is configured, and returns the results in streamer
+        order. All streamers get the frame even if some fail, the failures are
+        raised together as StreamerFrameError.
+        """
+        errors = {}
+        results = [None] * len(self.active_streamers)
+        if self._executor is None:
+            for index, streamer in enumerate(self.active_streamers):
+                try:
+                    results[index] = action(streamer, frame)
+                except Exception as e:
+                    errors[index] = e
+        else:
+            futures = [
+                self._executor.submit(action, streamer, frame)
+                for streamer in self.active_streamers
+            ]
+            for index, future in enumerate(futures):
+                error = future.exception()
+                if error is not None:
+                    errors[index] = error
+                else:
+                    results[index] = future.result()
+
+        if errors:
+            raise StreamerFrameError(errors)
+        return results
+
     def process_and_send_frame(self, frame, debug: bool = False):
-        for index, streamer in enumerate(self.streamers):
-            self.logger.debug(f"Processing frame for streamer {index}")
-            stream_frame = streamer.cropFrame(frame)
-            stream_frame = streamer.scaleFrame(stream_frame)
-            stream_frame = streamer.gammaCorrectFrame(stream_frame)
-            streamer.sendFrame(stream_frame)
+        if self.sync_commit:
+            self.process_and_commit_frame(frame)
+            return
+
+        frame = self.begin_frame(frame)
+        self.for_each_streamer(self.process_and_send_streamer, frame)
+
+    def process_and_send_streamer(self, streamer, frame):
+        streamer.sendFrame(self.process_frame(streamer, frame))
+
+    def process_and_prepare_streamer(self, streamer, frame):
+        streamer.prepareFrame(self.process_frame(streamer, frame))
+
+    def process_streamer_frames(self, frame) -> list:
+        """
+        Processes the frame for every active streamer without sending it, for
+        pipelines that send from another thread. Returns the LED frames in
+        streamer order, they are only valid until the next call.
+        """
+        return self.for_each_streamer(self.process_frame, self.begin_frame(frame))
+
+    def send_streamer_frames(self, frames: list):
+        """
+        Sends LED frames from `process_streamer_frames`, one per active
+        streamer, committing them together in sync-commit mode.
+        """
+        errors = {}
+        for index, (streamer, frame) in enumerate(zip(self.active_streamers, frames)):
+            try:
+                if self.sync_commit:
+                    streamer.prepareFrame(frame)
+                else:
+                    streamer.sendFrame(frame)
+            except Exception as e:
+                errors[index] = e
+        if self.sync_commit:
+            self.commit_prepared(errors)
+        elif errors:
+            raise StreamerFrameError(errors)
+
+    def process_and_commit_frame(self, frame):
+        """
+        Processes and packetizes the frame for every streamer, then releases
+        all sends back to back. DDP devices hold the frame until their push
+        packet, which goes out last, so all of them show it together.
+        """
+        self.commit_prepared(self.prepare_streamer_frames(frame))
+
+    def prepare_streamer_frames(self, frame) -> dict:
+        """
+        Processes and packetizes the frame for every streamer without sending
+        it. Returns the failures to pass on to `commit_prepared`.
+        """
+        try:
+            self.for_each_streamer(self.process_and_prepare_streamer, self.begin_frame(frame))
+        except StreamerFrameError as e:
+            return e.errors
+        return {}
+
+    def commit_prepared(self, errors: dict = None):
+        """
+        Sends the prepared frames of all streamers except the failed ones in
+        `errors`, back to back, then raises the failures if there are any.
+        """
+        errors = errors or {}
+        ready = [
+            streamer
+            for index, streamer in enumerate(self.active_streamers)
+            if index not in errors
+        ]
+
+        # paced streamers only queue the frame for their sender thread, they
+        # are left out of the skew, which would otherwise look near zero
+        timed = [streamer for streamer in ready if not streamer.paced]
+        first_send = time.perf_counter()
+        for streamer in timed:
+            streamer.commitFrame()
+        for streamer in timed:
+            if getattr(streamer, "push_deferred", False):
+                streamer.push()
+        skew = time.perf_counter() - first_send
+        for streamer in ready:
+            if streamer.paced:
+                streamer.commitFrame()
+
+        if timed:
+            stats = self.sync_stats
+            stats["frames"] += 1
+            stats["last_skew"] = skew
+            stats["max_skew"] = max(stats["max_skew"], skew)
+            stats["total_skew"] += skew
+            self.logger.debug(
+                f"Commit skew across {len(timed)} streamers: {skew * 1000:.3f} ms"
+            )
+        if errors:
+            raise StreamerFrameError(errors)
 
     def close_all(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._stage_cache is not None:
+            cache = self._stage_cache
+            self.logger.info(
+                f"Shared stage cache: {cache.hits} hits, {cache.misses} computed"
+            )
+            cache.new_frame()
+        if self.sync_commit and self.sync_stats["frames"]:
+            stats = self.sync_stats
+            self.logger.info(
+                f"Commit skew over {stats['frames']} frames: "
+                f"mean {stats['total_skew'] / stats['frames'] * 1000:.3f} ms, "
+                f"max {stats['max_skew'] * 1000:.3f} ms"
+            )
         for index, streamer in enumerate(self.streamers):
             self.logger.debug(f"Closing streamer {index}")
             streamer.close()
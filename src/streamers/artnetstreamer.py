@@ -0,0 +1,63 @@
+from typing import List, Tuple
+
+from .dmxstreamer import DMXWLEDStreamer
+
+
+class ArtNetWLEDStreamer(DMXWLEDStreamer):
+    """
+    Streams frames as Art-Net ArtDmx packets. Set `multicast_group` (or a
+    broadcast address) to reach several mirrored receivers with one send
+    per universe.
+    """
+
+    ARTNET_PORT = 6454
+    HEADER_SIZE = 18
+    SEQUENCE_OFFSET = 12
+    # ArtDmx data length has to be even
+    PAYLOAD_ALIGN = 2
+    ARTNET_ID = b"Art-Net\x00"
+    OPCODE_DMX = 0x5000
+    PROTOCOL_VERSION = 14
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = ARTNET_PORT,
+        width: int = 0,
+        height: int = 0,
+        crop: List[int] = [],
+        scale: str = "fill",
+        interpolation: str = "smooth",
+        gamma: float = 0.5,
+        universe: int = 0,
+        multicast_group: str = "",
+    ) -> None:
+        self.multicast_group = multicast_group
+
+        DMXWLEDStreamer.__init__(
+            self, host, port, width, height, crop, scale, interpolation, gamma, universe
+        )
+
+        if self.multicast_group:
+            self._enableMulticast()
+            self._enableBroadcast()
+        self._connect()
+
+    def _destination(self, universe: int) -> Tuple[str, int]:
+        if self.multicast_group:
+            return (self.multicast_group, self._port)
+        return (self._ip, self._port)
+
+    def _channelCount(self, pixel_count: int) -> int:
+        channels = pixel_count * 3
+        return channels + (channels & 1)
+
+    def _writeHeader(self, packet: memoryview, universe: int, pixel_count: int) -> None:
+        packet[0:8] = self.ARTNET_ID
+        packet[8:10] = self.OPCODE_DMX.to_bytes(2, "little")
+        packet[10:12] = self.PROTOCOL_VERSION.to_bytes(2, "big")
+        packet[12] = 0  # sequence
+        packet[13] = 0  # physical port
+        packet[14] = universe & 0xFF  # SubUni
+        packet[15] = (universe >> 8) & 0x7F  # Net
+        packet[16:18] = self._channelCount(pixel_count).to_bytes(2, "big")
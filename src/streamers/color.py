@@ -0,0 +1,195 @@
+import cv2
+import numpy as np
+
+from typing import Optional, Sequence, Tuple, Union
+
+
+def loadCubeLut(path: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Reads a 3D LUT in the .cube format. Returns the table as an (N, N, N, 3)
+    float array indexed [blue, green, red], and the input domain minimum and
+    maximum per channel.
+    """
+    size = 0
+    domain_min = np.zeros(3)
+    domain_max = np.ones(3)
+    values = []
+    with open(path) as cube:
+        for line in cube:
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            keyword, *arguments = line.split()
+            if keyword == "LUT_3D_SIZE":
+                size = int(arguments[0])
+            elif keyword == "LUT_1D_SIZE":
+                raise ValueError(
+                    "%s is a 1D LUT, use gamma and white balance instead" % path
+                )
+            elif keyword == "DOMAIN_MIN":
+                domain_min = np.array(arguments, float)
+            elif keyword == "DOMAIN_MAX":
+                domain_max = np.array(arguments, float)
+            elif keyword == "LUT_3D_INPUT_RANGE":
+                domain_min = np.full(3, float(arguments[0]))
+                domain_max = np.full(3, float(arguments[1]))
+            elif keyword[0].isalpha():
+                # TITLE and vendor specific keywords
+                continue
+            else:
+                values.append([float(value) for value in line.split()])
+
+    if size < 2 or len(values) != size**3:
+        raise ValueError(
+            "%s: expected %d entries for LUT_3D_SIZE %d, found %d"
+            % (path, size**3, size, len(values))
+        )
+    # red changes fastest in the file
+    return np.array(values).reshape(size, size, size, 3), domain_min, domain_max
+
+
+class ColorPipeline:
+    """
+    Turns processed BGR frames into the RGB values sent to the LEDs in one
+    pass: channel swap, per-channel gamma, brightness and white balance, and
+    an optional 3D calibration LUT, to match mismatched LED batches.
+
+    Without a LUT everything is folded into one 256 entry table per channel,
+    so a frame costs a channel swap into the output buffer and one in-place
+    `cv2.LUT`, both at LED resolution. A LUT is interpolated trilinearly,
+    with gamma, brightness and white balance baked into its entries. Tables
+    are only rebuilt by `configure` when a setting actually changes.
+    """
+
+    def __init__(
+        self,
+        gamma: Union[float, Sequence[float]] = 0.5,
+        brightness: float = 1.0,
+        white_balance: Sequence[float] = (1.0, 1.0, 1.0),
+        lut_path: str = "",
+    ) -> None:
+        self.key = None  # type: Optional[tuple]
+        self._output = np.empty(0, np.uint8)
+        self.configure(gamma, brightness, white_balance, lut_path)
+
+    @property
+    def gamma(self) -> Tuple[float, float, float]:
+        return self.key[0]
+
+    @property
+    def brightness(self) -> float:
+        return self.key[1]
+
+    @property
+    def white_balance(self) -> Tuple[float, float, float]:
+        return self.key[2]
+
+    @property
+    def lut_path(self) -> str:
+        return self.key[3]
+
+    def configure(
+        self,
+        gamma: Union[float, Sequence[float], None] = None,
+        brightness: Optional[float] = None,
+        white_balance: Optional[Sequence[float]] = None,
+        lut_path: Optional[str] = None,
+    ) -> None:
+        """
+        Changes the given settings, the others are kept. Gamma and white
+        balance are either one value or one per channel in R, G, B order.
+        """
+        current = self.key or (None, None, None, None)
+        gamma = current[0] if gamma is None else self._perChannel(gamma)
+        brightness = current[1] if brightness is None else float(brightness)
+        white_balance = (
+            current[2] if white_balance is None else self._perChannel(white_balance)
+        )
+        lut_path = current[3] if lut_path is None else lut_path
+        key = (gamma, brightness, white_balance, lut_path)
+        if key == self.key:
+            return
+
+        values = np.arange(256) / 255
+        curves = np.stack(
+            [
+                np.clip((values ** (1 / gamma[c])) * 255 * brightness * white_balance[c], 0, 255)
+                for c in range(3)
+            ]
+        )
+
+        self._lut = None
+        if lut_path:
+            lut, domain_min, domain_max = loadCubeLut(lut_path)
+            size = lut.shape[0]
+            # LUT output first, then gamma, brightness and white balance
+            baked = np.empty(lut.shape, np.float32)
+            for c in range(3):
+                baked[..., c] = np.interp(
+                    np.clip(lut[..., c], 0, 1) * 255, np.arange(256), curves[c]
+                )
+            # grid position of every 8-bit input value, per channel, as an
+            # offset into the flattened table and a weight for the next node
+            position = (values[:, None] - domain_min) / (domain_max - domain_min)
+            position = np.clip(position, 0, 1) * (size - 1)
+            index = np.minimum(position.astype(np.intp), size - 2)
+            self._lut_weight = (position - index).astype(np.float32)
+            self._lut_strides = np.array([1, size, size * size])
+            self._lut_offset = index * self._lut_strides
+            self._lut = baked.reshape(-1, 3)
+        # one table per channel, in R, G, B order for cv2.LUT
+        self._table = np.ascontiguousarray(curves.T.astype(np.uint8)).reshape(256, 1, 3)
+        self.key = key
+
+    def apply(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Returns the RGB LED values for a BGR frame. The result is written to
+        a reused buffer, it is only valid until the next call.
+        """
+        if self._output.shape != frame.shape:
+            self._output = np.empty(frame.shape, np.uint8)
+
+        if self._lut is not None:
+            return self._applyLut(frame)
+
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._output)
+        cv2.LUT(self._output, self._table, dst=self._output)
+        return self._output
+
+    def _applyLut(self, frame: np.ndarray) -> np.ndarray:
+        red, green, blue = frame[..., 2], frame[..., 1], frame[..., 0]
+        base = (
+            self._lut_offset[red, 0]
+            + self._lut_offset[green, 1]
+            + self._lut_offset[blue, 2]
+        )
+        weights = [
+            self._lut_weight[value, channel][..., None]
+            for channel, value in enumerate((red, green, blue))
+        ]
+
+        # gather the 8 surrounding nodes, then interpolate along R, G and B
+        corners = [
+            np.take(self._lut, base + offset, axis=0)
+            for offset in np.dot(
+                [[r, g, b] for b in (0, 1) for g in (0, 1) for r in (0, 1)],
+                self._lut_strides,
+            )
+        ]
+        for weight in weights:
+            corners = [
+                low + (high - low) * weight
+                for low, high in zip(corners[0::2], corners[1::2])
+            ]
+        np.add(corners[0], 0.5, out=corners[0])
+        np.copyto(self._output, corners[0], casting="unsafe")
+        return self._output
+
+    @staticmethod
+    def _perChannel(value: Union[float, Sequence[float]]) -> Tuple[float, float, float]:
+        if isinstance(value, (int, float)):
+            return (float(value),) * 3
+        value = tuple(float(v) for v in value)
+        if len(value) != 3:
+            raise ValueError("Expected one value or three (R, G, B), got %r" % (value,))
+        return value
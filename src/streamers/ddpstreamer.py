@@ -0,0 +1,116 @@
+import numpy as np
+
+import socket
+import requests
+import json
+
+from typing import List
+
+from .wledstreamer import WLEDStreamer
+from .packetengine import PacketEngine
+
+
+class DDPWLEDStreamer(WLEDStreamer):
+    """
+    Streams frames using the Distributed Display Protocol, which WLED
+    receives natively on port 4048. Offsets are 32-bit, so there is no
+    limit on the number of addressable pixels.
+    """
+
+    DDP_PORT = 4048
+    HEADER_SIZE = 10
+    SEQUENCE_OFFSET = 1
+    FLAG_VERSION_1 = 0x40
+    FLAG_PUSH = 0x01
+    DATA_TYPE_RGB24 = 0x0B
+    DESTINATION_DEFAULT = 0x01
+    # IPv4 + UDP headers
+    IP_UDP_OVERHEAD = 28
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = DDP_PORT,
+        width: int = 0,
+        height: int = 0,
+        crop: List[int] = [],
+        scale: str = "fill",
+        interpolation: str = "smooth",
+        gamma: float = 0.5,
+        mtu: int = 1500,
+    ) -> None:
+        self._ip = socket.gethostbyname(host)
+        self._port = port
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sequence = 0
+
+        WLEDStreamer.__init__(self, width, height, crop, scale, interpolation, gamma)
+
+        self.max_pixels_per_packet = self.pixelsPerPacket(mtu)
+
+        self._engine = PacketEngine(
+            self.width * self.height, self.max_pixels_per_packet, self.HEADER_SIZE
+        )
+        last = len(self._engine.packets) - 1
+        for index, (start, count, _, _) in enumerate(self._engine.packets):
+            flags = self.FLAG_VERSION_1
+            if index == last:
+                flags |= self.FLAG_PUSH
+            self._engine.header(index)[:] = (
+                bytes([flags, 0, self.DATA_TYPE_RGB24, self.DESTINATION_DEFAULT])
+                + (start * 3).to_bytes(4, "big")
+                + (count * 3).to_bytes(2, "big")
+            )
+        self._engine.connect(self._socket, [(self._ip, self._port)])
+
+        # a data-less packet that only carries the push flag, used when the
+        # push is deferred to show several devices at the same moment
+        self._push_packet = bytearray(self.HEADER_SIZE)
+        self._push_packet[0:4] = bytes(
+            [
+                self.FLAG_VERSION_1 | self.FLAG_PUSH,
+                0,
+                self.DATA_TYPE_RGB24,
+                self.DESTINATION_DEFAULT,
+            ]
+        )
+        self.push_deferred = False
+
+    def packetKey(self) -> tuple:
+        return (type(self).__name__, self.max_pixels_per_packet)
+
+    @classmethod
+    def pixelsPerPacket(cls, mtu: int = 1500) -> int:
+        return (mtu - cls.IP_UDP_OVERHEAD - cls.HEADER_SIZE) // 3
+
+    def close(self):
+        self._socket.close()
+
+    def deferPush(self, deferred: bool = True) -> None:
+        """
+        Clears the push flag on the last data packet. WLED then holds the
+        frame until `push` is called.
+        """
+        self.push_deferred = deferred
+        if self._engine.packets:
+            flags = self.FLAG_VERSION_1
+            if not deferred:
+                flags |= self.FLAG_PUSH
+            self._engine.header(len(self._engine.packets) - 1)[0] = flags
+
+    def push(self) -> None:
+        self._push_packet[self.SEQUENCE_OFFSET] = self._sequence
+        self._engine.sendRaw(self._push_packet)
+
+    def prepareFrame(self, frame: np.ndarray) -> None:
+        # sequence numbers 1-15, 0 means "not used"
+        self._sequence = self._sequence % 15 + 1
+        self._engine.setHeaderByte(self.SEQUENCE_OFFSET, self._sequence)
+        self._engine.write(frame)
+
+    def commitFrame(self) -> None:
+        self._engine.send()
+
+    def _loadInfo(self) -> None:
+        response = requests.get("http://" + self._ip + "/json/info", timeout=5)
+        self._wled_info = json.loads(response.text)
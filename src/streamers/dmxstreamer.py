@@ -0,0 +1,117 @@
+import numpy as np
+
+import socket
+import requests
+import json
+
+from typing import List, Tuple
+
+from .wledstreamer import WLEDStreamer
+from .packetengine import PacketEngine
+
+
+class DMXWLEDStreamer(WLEDStreamer):
+    """
+    Base class for protocols that carry pixels in 512 channel DMX universes.
+
+    The universe map and a packet engine holding every universe are built
+    once, with the protocol headers already written. Per frame only the pixel
+    data and the sequence number are updated.
+    """
+
+    PIXELS_PER_UNIVERSE = 170
+    HEADER_SIZE = 0
+    SEQUENCE_OFFSET = 0
+    PAYLOAD_ALIGN = 1
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        width: int = 0,
+        height: int = 0,
+        crop: List[int] = [],
+        scale: str = "fill",
+        interpolation: str = "smooth",
+        gamma: float = 0.5,
+        universe: int = 1,
+    ) -> None:
+        self._ip = socket.gethostbyname(host)
+        self._port = port
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sequence = 0
+
+        WLEDStreamer.__init__(self, width, height, crop, scale, interpolation, gamma)
+
+        self.universe = universe
+        self.universe_map = self.buildUniverseMap(
+            self.width * self.height, universe, self.PIXELS_PER_UNIVERSE
+        )
+        self._engine = PacketEngine(
+            self.width * self.height,
+            self.PIXELS_PER_UNIVERSE,
+            self.HEADER_SIZE,
+            self.PAYLOAD_ALIGN,
+        )
+        for index, (universe, _, count) in enumerate(self.universe_map):
+            self._writeHeader(self._engine.packet(index), universe, count)
+
+    def _connect(self) -> None:
+        """
+        Binds the packet engine to the socket, called by subclasses once the
+        destination settings are known.
+        """
+        self._engine.connect(
+            self._socket,
+            [self._destination(universe) for universe, _, _ in self.universe_map],
+        )
+
+    @staticmethod
+    def buildUniverseMap(
+        pixel_count: int, first_universe: int, pixels_per_universe: int = 170
+    ) -> List[Tuple[int, int, int]]:
+        """
+        Splits `pixel_count` pixels into (universe, first pixel, pixel count)
+        entries, starting at `first_universe`.
+        """
+        return [
+            (
+                first_universe + index,
+                start,
+                min(pixels_per_universe, pixel_count - start),
+            )
+            for index, start in enumerate(range(0, pixel_count, pixels_per_universe))
+        ]
+
+    def packetKey(self) -> tuple:
+        return (type(self).__name__, self.universe, self._engine.pixels_per_packet)
+
+    def close(self):
+        self._socket.close()
+
+    def prepareFrame(self, frame: np.ndarray) -> None:
+        self._sequence = (self._sequence + 1) & 0xFF
+        self._engine.setHeaderByte(self.SEQUENCE_OFFSET, self._sequence)
+        self._engine.write(frame)
+
+    def commitFrame(self) -> None:
+        self._engine.send()
+
+    def _channelCount(self, pixel_count: int) -> int:
+        return pixel_count * 3
+
+    def _destination(self, universe: int) -> Tuple[str, int]:
+        return (self._ip, self._port)
+
+    def _writeHeader(self, packet: memoryview, universe: int, pixel_count: int) -> None:
+        pass
+
+    def _enableMulticast(self, ttl: int = 1) -> None:
+        self._socket.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, ttl)
+
+    def _enableBroadcast(self) -> None:
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+
+    def _loadInfo(self) -> None:
+        response = requests.get("http://" + self._ip + "/json/info", timeout=5)
+        self._wled_info = json.loads(response.text)
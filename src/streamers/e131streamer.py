@@ -0,0 +1,90 @@
+import uuid
+
+from typing import List, Tuple
+
+from .dmxstreamer import DMXWLEDStreamer
+
+
+class E131WLEDStreamer(DMXWLEDStreamer):
+    """
+    Streams frames as E1.31 (sACN) data packets. With `multicast` enabled
+    every universe is sent to its standard 239.255.x.y group, so any number
+    of receivers listening to the same universes get the frame from a
+    single send.
+    """
+
+    E131_PORT = 5568
+    HEADER_SIZE = 126
+    SEQUENCE_OFFSET = 111
+    ACN_PACKET_IDENTIFIER = b"ASC-E1.17\x00\x00\x00"
+    VECTOR_ROOT_DATA = 0x00000004
+    VECTOR_FRAMING_DATA = 0x00000002
+    VECTOR_DMP_SET_PROPERTY = 0x02
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = E131_PORT,
+        width: int = 0,
+        height: int = 0,
+        crop: List[int] = [],
+        scale: str = "fill",
+        interpolation: str = "smooth",
+        gamma: float = 0.5,
+        universe: int = 1,
+        multicast: bool = False,
+        priority: int = 100,
+        source_name: str = "WLED-Studio",
+    ) -> None:
+        self.multicast = multicast
+        self.priority = priority
+        self.source_name = source_name
+        self._cid = uuid.uuid4().bytes
+
+        DMXWLEDStreamer.__init__(
+            self, host, port, width, height, crop, scale, interpolation, gamma, universe
+        )
+
+        if self.multicast:
+            self._enableMulticast()
+        self._connect()
+
+    @staticmethod
+    def multicastAddress(universe: int) -> str:
+        return "239.255.%d.%d" % (universe >> 8, universe & 0xFF)
+
+    def _destination(self, universe: int) -> Tuple[str, int]:
+        if self.multicast:
+            return (self.multicastAddress(universe), self._port)
+        return (self._ip, self._port)
+
+    def _writeHeader(self, packet: memoryview, universe: int, pixel_count: int) -> None:
+        length = len(packet)
+        slots = self._channelCount(pixel_count)
+
+        # root layer
+        packet[0:2] = (0x0010).to_bytes(2, "big")
+        packet[2:4] = (0x0000).to_bytes(2, "big")
+        packet[4:16] = self.ACN_PACKET_IDENTIFIER
+        packet[16:18] = (0x7000 | (length - 16)).to_bytes(2, "big")
+        packet[18:22] = self.VECTOR_ROOT_DATA.to_bytes(4, "big")
+        packet[22:38] = self._cid
+
+        # framing layer
+        packet[38:40] = (0x7000 | (length - 38)).to_bytes(2, "big")
+        packet[40:44] = self.VECTOR_FRAMING_DATA.to_bytes(4, "big")
+        packet[44:108] = self.source_name.encode("utf-8")[:63].ljust(64, b"\x00")
+        packet[108] = self.priority
+        packet[109:111] = (0).to_bytes(2, "big")  # synchronization address
+        packet[111] = 0  # sequence number
+        packet[112] = 0  # options
+        packet[113:115] = universe.to_bytes(2, "big")
+
+        # DMP layer
+        packet[115:117] = (0x7000 | (length - 115)).to_bytes(2, "big")
+        packet[117] = self.VECTOR_DMP_SET_PROPERTY
+        packet[118] = 0xA1  # address type & data type
+        packet[119:121] = (0).to_bytes(2, "big")  # first property address
+        packet[121:123] = (1).to_bytes(2, "big")  # address increment
+        packet[123:125] = (slots + 1).to_bytes(2, "big")
+        packet[125] = 0  # DMX start code
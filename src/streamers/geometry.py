@@ -0,0 +1,131 @@
+import cv2
+import numpy as np
+
+import math
+
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+
+class GeometryPlan:
+    """
+    Crop, scale and letterbox padding for one input shape, worked out once.
+
+    `apply` resizes the cropped source straight into its place in a reused,
+    zero-padded output canvas. Only "fill" goes through a scratch buffer,
+    because the resized image is larger than the target and gets cut to
+    size afterwards.
+    """
+
+    def __init__(
+        self,
+        input_shape: Tuple[int, ...],
+        dtype: np.dtype,
+        crop: List[int],
+        scale: str,
+        width: int,
+        height: int,
+        interpolation: int,
+    ) -> None:
+        frame_height, frame_width = input_shape[:2]
+        if crop:
+            self.source = (
+                slice(crop[1], frame_height - crop[3]),
+                slice(crop[0], frame_width - crop[2]),
+            )
+        else:
+            self.source = (slice(None), slice(None))
+        source_height = len(range(frame_height)[self.source[0]])
+        source_width = len(range(frame_width)[self.source[1]])
+
+        self.interpolation = interpolation
+        self.size = None  # type: Optional[Tuple[int, int]]
+        if scale == "stretch":
+            self.size = (width, height)
+        elif scale in ["fill", "fit"]:
+            image_ratio = source_width / source_height
+            display_ratio = width / height
+            if (scale == "fill" and image_ratio > display_ratio) or (
+                scale == "fit" and image_ratio < display_ratio
+            ):
+                self.size = (math.floor(height * image_ratio), height)
+            else:
+                self.size = (width, math.floor(width / image_ratio))
+        resized_width, resized_height = self.size or (source_width, source_height)
+
+        # centered window of the resized image that fits the target...
+        left = max(math.floor((resized_width - width) / 2), 0)
+        top = max(math.floor((resized_height - height) / 2), 0)
+        window_width = min(resized_width, width)
+        window_height = min(resized_height, height)
+        self.window = (
+            slice(top, top + window_height),
+            slice(left, left + window_width),
+        )
+        # ...and where it lands on the canvas, the rest stays black
+        left = math.floor((width - window_width) / 2)
+        top = math.floor((height - window_height) / 2)
+
+        self.canvas = np.zeros((height, width) + tuple(input_shape[2:]), dtype)
+        self._target = self.canvas[top : top + window_height, left : left + window_width]
+
+        self._scratch = None  # type: Optional[np.ndarray]
+        if self.size is not None and (
+            resized_width != window_width or resized_height != window_height
+        ):
+            self._scratch = np.empty(
+                (resized_height, resized_width) + tuple(input_shape[2:]), dtype
+            )
+
+    def apply(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Writes `frame` into the canvas and returns it. The canvas is reused,
+        it is only valid until the next call.
+        """
+        source = frame[self.source]
+        if self.size is None:
+            self._target[...] = source[self.window]
+        elif self._scratch is None:
+            cv2.resize(
+                source, self.size, dst=self._target, interpolation=self.interpolation
+            )
+        else:
+            cv2.resize(
+                source, self.size, dst=self._scratch, interpolation=self.interpolation
+            )
+            self._target[...] = self._scratch[self.window]
+        return self.canvas
+
+
+class GeometryPlanCache:
+    """
+    Keeps the plans of the last few input shapes and settings, so a source
+    switching resolution doesn't rebuild them back and forth.
+    """
+
+    def __init__(self, max_plans: int = 4) -> None:
+        self.max_plans = max_plans
+        self._plans = OrderedDict()  # type: OrderedDict[tuple, GeometryPlan]
+
+    def get(
+        self,
+        input_shape: Tuple[int, ...],
+        dtype: np.dtype,
+        crop: List[int],
+        scale: str,
+        width: int,
+        height: int,
+        interpolation: int,
+    ) -> GeometryPlan:
+        key = (input_shape, dtype, tuple(crop), scale, width, height, interpolation)
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = GeometryPlan(
+                input_shape, dtype, crop, scale, width, height, interpolation
+            )
+            self._plans[key] = plan
+            if len(self._plans) > self.max_plans:
+                self._plans.popitem(last=False)
+        else:
+            self._plans.move_to_end(key)
+        return plan
@@ -0,0 +1,169 @@
+import numpy as np
+import requests
+
+import json
+
+from typing import Any, Dict, Optional, Tuple
+
+
+def matrixOrder(
+    width: int,
+    height: int,
+    bottom_start: bool = False,
+    right_start: bool = False,
+    vertical: bool = False,
+    serpentine: bool = False,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (x, y) of every LED of a width x height matrix in wiring order. The flags
+    are the ones of WLED's 2D panel setup: the corner of the first LED,
+    whether it runs in columns instead of rows, and whether every other row
+    (or column) runs backwards.
+    """
+    order = np.arange(width * height)
+    if vertical:
+        major, minor = np.divmod(order, height)
+        if serpentine:
+            minor = np.where(major % 2 == 1, height - 1 - minor, minor)
+        x, y = major, minor
+    else:
+        major, minor = np.divmod(order, width)
+        if serpentine:
+            minor = np.where(major % 2 == 1, width - 1 - minor, minor)
+        x, y = minor, major
+    if right_start:
+        x = width - 1 - x
+    if bottom_start:
+        y = height - 1 - y
+    return x, y
+
+
+class LedMap:
+    """
+    Reorders a frame from row-major pixels into the order the LEDs are wired
+    in. `indices[i]` is the frame pixel shown by LED i, -1 for LEDs that stay
+    dark. The table is built once, each frame is a single gather into a
+    reused buffer.
+    """
+
+    def __init__(self, indices: np.ndarray, key: Any = None) -> None:
+        self.indices = np.asarray(indices, np.intp)
+        self.key = key
+        self._gaps = np.flatnonzero(self.indices < 0)
+        self._source = np.maximum(self.indices, 0)
+        self._output = np.empty(0, np.uint8)
+
+    @classmethod
+    def matrix(cls, width: int, height: int, **order: bool) -> "LedMap":
+        """
+        A single matrix wired as described by the `matrixOrder` flags.
+        """
+        x, y = matrixOrder(width, height, **order)
+        return cls(y * width + x, ("matrix", width, height, tuple(sorted(order.items()))))
+
+    @classmethod
+    def panels(
+        cls,
+        panel_width: int,
+        panel_height: int,
+        columns: int,
+        rows: int,
+        panel_order: Optional[Dict[str, bool]] = None,
+        led_order: Optional[Dict[str, bool]] = None,
+    ) -> "LedMap":
+        """
+        A grid of `columns` x `rows` chained panels. `panel_order` describes
+        how the chain runs through the grid and `led_order` how each panel is
+        wired, both with the `matrixOrder` flags.
+        """
+        panel_order = panel_order or {}
+        led_order = led_order or {}
+        panel_x, panel_y = matrixOrder(columns, rows, **panel_order)
+        led_x, led_y = matrixOrder(panel_width, panel_height, **led_order)
+        x = (panel_x[:, None] * panel_width + led_x).reshape(-1)
+        y = (panel_y[:, None] * panel_height + led_y).reshape(-1)
+        return cls(
+            y * columns * panel_width + x,
+            (
+                "panels",
+                panel_width,
+                panel_height,
+                columns,
+                rows,
+                tuple(sorted(panel_order.items())),
+                tuple(sorted(led_order.items())),
+            ),
+        )
+
+    @classmethod
+    def fromLedmap(cls, ledmap: Dict[str, Any], led_count: int, key: Any = None) -> "LedMap":
+        """
+        Inverts a WLED ledmap.json, whose "map" lists the physical LED of
+        every logical pixel (-1 for none), into the pixel of every LED.
+        """
+        mapping = np.asarray(ledmap["map"], np.intp)[:led_count]
+        indices = np.full(led_count, -1, np.intp)
+        pixels = np.flatnonzero((mapping >= 0) & (mapping < led_count))
+        indices[mapping[pixels]] = pixels
+        return cls(indices, key)
+
+    @classmethod
+    def load(cls, source: str, led_count: int) -> "LedMap":
+        """
+        Reads a ledmap.json from a file or an http(s) URL.
+        """
+        if source.startswith(("http://", "https://")):
+            response = requests.get(source, timeout=5)
+            response.raise_for_status()
+            ledmap = json.loads(response.text)
+        else:
+            with open(source) as f:
+                ledmap = json.load(f)
+        return cls.fromLedmap(ledmap, led_count, ("ledmap", source))
+
+    @classmethod
+    def fromConfig(cls, config: Any, width: int, height: int) -> "LedMap":
+        """
+        Builds a map from a streamer config value: a ledmap.json path or URL,
+        "serpentine", or a dict of `matrixOrder` flags, optionally with a
+        "panels" entry giving width, height, columns and rows of a panel
+        grid, plus "panel_order" flags for the chain.
+        """
+        if isinstance(config, str):
+            if config == "serpentine":
+                return cls.matrix(width, height, serpentine=True)
+            return cls.load(config, width * height)
+
+        config = dict(config)
+        panels = config.pop("panels", None)
+        if panels is None:
+            return cls.matrix(width, height, **config)
+        panel_order = config.pop("panel_order", None)
+        ledmap = cls.panels(
+            panels["width"],
+            panels["height"],
+            panels["columns"],
+            panels["rows"],
+            panel_order,
+            config,
+        )
+        if ledmap.indices.size != width * height:
+            raise ValueError(
+                "Panels cover %d LEDs but the matrix has %d"
+                % (ledmap.indices.size, width * height)
+            )
+        return ledmap
+
+    def apply(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Returns the frame in wiring order, with the same shape, in a reused
+        buffer that is only valid until the next call.
+        """
+        if self._output.shape != frame.shape:
+            self._output = np.empty(frame.shape, frame.dtype)
+        pixels = frame.reshape(-1, frame.shape[-1])
+        output = self._output.reshape(pixels.shape)
+        np.take(pixels, self._source, axis=0, out=output, mode="clip")
+        if self._gaps.size:
+            output[self._gaps] = 0
+        return self._output
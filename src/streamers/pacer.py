@@ -0,0 +1,185 @@
+import numpy as np
+
+import bisect
+import logging
+import threading
+import time
+
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from .packetengine import PacketEngine
+from src.utils.latest_frame_mailbox import LatestFrameMailbox
+from src.utils.logger_handler import logger_handler
+
+
+def waitUntil(deadline: float) -> bool:
+    """
+    Sleeps until `deadline` (time.perf_counter). Returns True if it had to
+    wait at all.
+
+    There is one pacer thread per device, so it never spins: that would hold
+    the GIL against processing and sending. Packets may go out up to about a
+    millisecond late, which only makes their spacing a little wider.
+    """
+    remaining = deadline - time.perf_counter()
+    if remaining <= 0:
+        return False
+    time.sleep(remaining)
+    return True
+
+
+class TokenBucket:
+    """
+    Byte budget refilled at `rate` bytes per second, holding at most
+    `capacity` bytes.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.perf_counter()
+
+    def reserve(self, size: int) -> float:
+        """
+        Takes `size` bytes from the bucket and returns the time at which
+        they are covered, which is in the future if the budget is exhausted.
+        """
+        now = time.perf_counter()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+        self._tokens -= size
+        if self._tokens >= 0:
+            return now
+        return now - self._tokens / self.rate
+
+
+class PacketPacer:
+    """
+    Sends the packets of a device from its own thread, spaced out instead of
+    in one burst so the receiver's buffers can keep up.
+
+    Packets are at least `packet_spacing` seconds apart, spread over `spread`
+    of the frame interval, and limited to `max_bytes_per_second`. When a new
+    frame arrives before the current one is fully sent, the newer frame is
+    sent instead, starting from the packet the current one did not get to.
+    A budget too small for whole frames thus still updates every packet in
+    turn, instead of never reaching the last ones.
+    """
+
+    def __init__(
+        self,
+        engine: PacketEngine,
+        prepare: Callable[[np.ndarray], Iterable[int]],
+        frame_shape: Tuple[int, ...],
+        packet_spacing: float = 0.0,
+        max_bytes_per_second: float = 0,
+        burst_bytes: Optional[int] = None,
+        frame_interval: float = 0.0,
+        spread: float = 0.8,
+        on_sent: Optional[Callable[[list], None]] = None,
+    ) -> None:
+        self.logger = logging.getLogger("PacketPacer")
+        self.logger.propagate = False
+        if not self.logger.handlers:
+            self.logger.addHandler(logger_handler())
+        self.logger.setLevel(logging.DEBUG)
+
+        self._engine = engine
+        self._prepare = prepare
+        self._on_sent = on_sent
+
+        packet_count = max(len(engine.packets), 1)
+        self.packet_spacing = max(
+            packet_spacing, frame_interval * spread / packet_count
+        )
+
+        self._bucket = None
+        if max_bytes_per_second:
+            if burst_bytes is None:
+                # one packet of burst, the budget is spread evenly otherwise
+                burst_bytes = int(engine.packet_sizes.max(initial=0))
+            self._bucket = TokenBucket(max_bytes_per_second, burst_bytes)
+
+        self.stats = {
+            "frames": 0,
+            "packets_paced": 0,
+            "packets_delayed": 0,
+            "packets_carried": 0,
+        }
+
+        self._mailbox = LatestFrameMailbox(frame_shape)
+        self._error = None
+        self._thread = threading.Thread(
+            target=self._sendLoop, name="PacketPacer", daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def frames_dropped(self) -> int:
+        return self._mailbox.dropped
+
+    def submit(self, frame: np.ndarray) -> None:
+        if self._error is not None:
+            raise self._error
+        self._mailbox.put(frame)
+
+    def close(self) -> None:
+        self._mailbox.close()
+        self._thread.join(timeout=2)
+        self.logger.info(
+            "Paced %d packets over %d frames, %d delayed, %d carried over to "
+            "a newer frame, %d frames replaced before sending."
+            % (
+                self.stats["packets_paced"],
+                self.stats["frames"],
+                self.stats["packets_delayed"],
+                self.stats["packets_carried"],
+                self._mailbox.dropped,
+            )
+        )
+
+    def _sendLoop(self) -> None:
+        next_send = time.perf_counter()
+        # packets a newer frame cut off, they go first with that frame
+        carried = []  # type: List[int]
+        while True:
+            frame = self._mailbox.get()
+            if frame is None:
+                break
+            try:
+                indices = list(self._prepare(frame))
+                if carried:
+                    # packets come in ascending order, the newer frame
+                    # starts where the cut off one stopped and wraps around
+                    start = bisect.bisect_left(indices, carried[0])
+                    indices = indices[start:] + indices[:start]
+                    carried = []
+                sent = []
+                for position, index in enumerate(indices):
+                    if self._mailbox.pending:
+                        carried = indices[position:]
+                        self.stats["packets_carried"] += len(carried)
+                        break
+
+                    deadline = next_send
+                    if self._bucket is not None:
+                        size = int(self._engine.packet_sizes[index])
+                        deadline = max(deadline, self._bucket.reserve(size))
+                    if waitUntil(deadline):
+                        self.stats["packets_delayed"] += 1
+
+                    self._engine.sendPacket(index)
+                    sent.append(index)
+                    next_send = time.perf_counter() + self.packet_spacing
+                    self.stats["packets_paced"] += 1
+
+                self.stats["frames"] += 1
+                if self._on_sent is not None and sent:
+                    self._on_sent(sent)
+            except Exception as e:
+                self.logger.error("Paced send failed: %s" % e)
+                self._error = e
+                break
@@ -0,0 +1,406 @@
+import numpy as np
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import socket
+import sys
+
+from typing import Iterable, List, Optional, Tuple
+
+
+class _IOVec(ctypes.Structure):
+    _fields_ = [("iov_base", ctypes.c_void_p), ("iov_len", ctypes.c_size_t)]
+
+
+class _MsgHdr(ctypes.Structure):
+    _fields_ = [
+        ("msg_name", ctypes.c_void_p),
+        ("msg_namelen", ctypes.c_uint32),
+        ("msg_iov", ctypes.POINTER(_IOVec)),
+        ("msg_iovlen", ctypes.c_size_t),
+        ("msg_control", ctypes.c_void_p),
+        ("msg_controllen", ctypes.c_size_t),
+        ("msg_flags", ctypes.c_int),
+    ]
+
+
+class _MMsgHdr(ctypes.Structure):
+    _fields_ = [("msg_hdr", _MsgHdr), ("msg_len", ctypes.c_uint)]
+
+
+class _SockAddrIn(ctypes.Structure):
+    _fields_ = [
+        ("sin_family", ctypes.c_ushort),
+        ("sin_port", ctypes.c_uint16),
+        ("sin_addr", ctypes.c_uint8 * 4),
+        ("sin_zero", ctypes.c_uint8 * 8),
+    ]
+
+
+def _loadSendmmsg():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        sendmmsg = libc.sendmmsg
+    except (OSError, AttributeError):
+        return None
+    sendmmsg.argtypes = [
+        ctypes.c_int,
+        ctypes.POINTER(_MMsgHdr),
+        ctypes.c_uint,
+        ctypes.c_int,
+    ]
+    sendmmsg.restype = ctypes.c_int
+    return sendmmsg
+
+
+_sendmmsg = _loadSendmmsg()
+
+
+class _Target:
+    """
+    A socket the packet buffer is sent on, either connected to a single
+    destination or with one destination per packet.
+    """
+
+    def __init__(self, sock: socket.socket, destinations: List[Tuple[str, int]]):
+        self.socket = sock
+        self.destinations = destinations
+        if len(set(destinations)) == 1:
+            sock.connect(destinations[0])
+            self.per_packet = None  # type: Optional[List[Tuple[str, int]]]
+        else:
+            self.per_packet = destinations
+        self.msgvec = None
+        # the headers of a partial send are compacted into here, see send
+        self.partial = None
+        # asyncio datagram transport wrapping the socket, see attachTransport
+        self.transport = None
+
+    def destination(self, index: int) -> Tuple[str, int]:
+        if self.per_packet is None:
+            return self.destinations[0]
+        return self.per_packet[index]
+
+
+class PacketEngine:
+    """
+    Preallocated packet buffer for one device.
+
+    All packets of a frame live in one bytearray, each one a fixed header
+    followed by its slice of the RGB payload. Headers are written once by the
+    streamer, `write` copies a frame straight into the payload regions through
+    NumPy views and `send` transmits the packets from memoryviews of the same
+    buffer. On Linux all packets of a frame are handed to the kernel with a
+    single sendmmsg call.
+
+    Sockets can be handed to asyncio with `attachTransport`, after which
+    their packets go through the non-blocking transport instead.
+    """
+
+    def __init__(
+        self,
+        pixel_count: int,
+        pixels_per_packet: int,
+        header_size: int,
+        payload_align: int = 1,
+    ) -> None:
+        self.pixel_count = pixel_count
+        self.pixels_per_packet = pixels_per_packet
+        self.header_size = header_size
+
+        # (first pixel, pixel count, byte offset, packet size) for every packet
+        self.packets = []  # type: List[Tuple[int, int, int, int]]
+        offset = 0
+        for start in range(0, pixel_count, pixels_per_packet):
+            count = min(pixels_per_packet, pixel_count - start)
+            payload_size = -(-count * 3 // payload_align) * payload_align
+            self.packets.append((start, count, offset, header_size + payload_size))
+            offset += header_size + payload_size
+
+        self.buffer = bytearray(offset)
+        self._array = np.frombuffer(self.buffer, np.uint8)
+        self._views = [
+            memoryview(self.buffer)[offset : offset + size]
+            for _, _, offset, size in self.packets
+        ]
+        self.header_offsets = np.array(
+            [offset for _, _, offset, _ in self.packets], np.intp
+        )
+        self.packet_sizes = np.array([size for _, _, _, size in self.packets], np.intp)
+
+        # packets holding a full `pixels_per_packet` share one strided view
+        self._full_packets = pixel_count // pixels_per_packet
+        full_size = self.packets[0][3] if self.packets else 0
+        self._full_view = np.ndarray(
+            (self._full_packets, pixels_per_packet, 3),
+            np.uint8,
+            self.buffer,
+            offset=header_size,
+            strides=(full_size, 3, 1),
+        )
+        self._tail_view = None
+        if self._full_packets < len(self.packets):
+            start, count, offset, _ = self.packets[-1]
+            self._tail_view = self._array[
+                offset + header_size : offset + header_size + count * 3
+            ].reshape(count, 3)
+
+        # copy of the payloads as they were last sent, see `trackChanges`
+        self._shadow = None  # type: Optional[np.ndarray]
+
+        # the first target is the device itself, the others are mirrors
+        # that get the same packets, see `addMirror`
+        self._targets = []  # type: List[_Target]
+
+    def packet(self, index: int) -> memoryview:
+        """
+        Returns the writable packet `index`, header and payload.
+        """
+        return self._views[index]
+
+    def header(self, index: int) -> memoryview:
+        """
+        Returns the writable header of packet `index`.
+        """
+        return self._views[index][: self.header_size]
+
+    def setHeaderByte(self, position: int, value: int) -> None:
+        """
+        Sets the header byte at `position` to `value` in every packet.
+        """
+        self._array[self.header_offsets + position] = value
+
+    def payload(self, index: int) -> np.ndarray:
+        """
+        Returns the RGB payload of packet `index` as a (pixels, 3) view.
+        """
+        _, count, offset, _ = self.packets[index]
+        start = offset + self.header_size
+        return self._array[start : start + count * 3].reshape(count, 3)
+
+    @property
+    def destinations(self) -> List[Tuple[str, int]]:
+        """
+        Destinations of the device the engine was connected to.
+        """
+        return self._targets[0].destinations if self._targets else []
+
+    def connect(
+        self, sock: socket.socket, destinations: Iterable[Tuple[str, int]]
+    ) -> None:
+        """
+        Binds the engine to `sock`. With a single destination the socket is
+        connected, otherwise `destinations` holds one address per packet.
+        Replaces any previous destinations and mirrors.
+        """
+        self._targets = []
+        self.addMirror(sock, destinations)
+
+    @property
+    def sockets(self) -> List[socket.socket]:
+        """
+        The sockets of the device and its mirrors, each listed once.
+        """
+        sockets = []
+        for target in self._targets:
+            if all(target.socket is not known for known in sockets):
+                sockets.append(target.socket)
+        return sockets
+
+    def attachTransport(self, sock: socket.socket, transport) -> None:
+        """
+        Sends everything meant for `sock` through `transport`, an asyncio
+        datagram transport created on that socket, or through the socket
+        again if `transport` is None. Sending then has to happen on the
+        transport's event loop, and never blocks: packets the socket can't
+        take right away are copied into the transport's buffer.
+        """
+        for target in self._targets:
+            if target.socket is sock:
+                target.transport = transport
+
+    def addMirror(
+        self, sock: socket.socket, destinations: Iterable[Tuple[str, int]]
+    ) -> None:
+        """
+        Sends every packet to `destinations` on `sock` as well, straight from
+        the same buffer.
+        """
+        target = _Target(sock, list(destinations))
+        if _sendmmsg:
+            target.msgvec = self._buildMsgvec(target)
+            target.partial = (_MMsgHdr * len(self.packets))()
+        self._targets.append(target)
+
+    def sendRaw(self, data: bytes) -> None:
+        """
+        Sends `data` as one extra packet to every target.
+        """
+        for target in self._targets:
+            if target.transport is not None:
+                target.transport.sendto(data, target.destinations[-1])
+                continue
+            try:
+                # connected sockets refuse an address on macOS (EISCONN)
+                if target.per_packet is None:
+                    target.socket.send(data)
+                else:
+                    target.socket.sendto(data, target.destinations[-1])
+            except ConnectionRefusedError:
+                pass
+
+    def write(self, frame: np.ndarray) -> None:
+        """
+        Copies an RGB frame into the packet payloads.
+        """
+        pixels = frame.reshape(-1, 3)
+        full = self._full_packets * self.pixels_per_packet
+        self._full_view[...] = pixels[:full].reshape(self._full_view.shape)
+        if self._tail_view is not None:
+            self._tail_view[...] = pixels[full:]
+
+    def trackChanges(self) -> None:
+        """
+        Keeps a shadow copy of the sent payloads so `changedPackets` can tell
+        which packets differ from what the receiver already has.
+        """
+        self._shadow = np.zeros_like(self._array)
+        # the whole buffer is compared at once, contiguous arrays need no
+        # temporary buffers, and the payloads are then read from the result
+        self._difference = np.empty(self._array.shape, bool)
+        full_packets, pixels, _ = self._full_view.shape
+        self._difference_full = np.ndarray(
+            (full_packets, pixels * 3),
+            bool,
+            self._difference,
+            offset=self.header_size,
+            strides=(self._full_view.strides[0], 1),
+        )
+        self._difference_tail = None
+        if self._tail_view is not None:
+            _, count, offset, _ = self.packets[-1]
+            start = offset + self.header_size
+            self._difference_tail = self._difference[start : start + count * 3]
+        self._changed = np.empty(len(self.packets), bool)
+
+    def changedPackets(self) -> np.ndarray:
+        """
+        Returns a boolean mask of the packets whose payload differs from the
+        last `markSent` snapshot. The mask is reused by the next call.
+        """
+        changed = self._changed
+        np.not_equal(self._array, self._shadow, out=self._difference)
+        np.logical_or.reduce(
+            self._difference_full, axis=1, out=changed[: self._full_packets]
+        )
+        if self._difference_tail is not None:
+            changed[-1] = self._difference_tail.any()
+        return changed
+
+    def markSent(self, indices: Optional[Iterable[int]] = None) -> None:
+        """
+        Records the current payloads, or those of the packets in `indices`,
+        as received by the device.
+        """
+        if indices is None:
+            np.copyto(self._shadow, self._array)
+            return
+        for index in indices:
+            offset = self.header_offsets[index]
+            end = offset + self.packet_sizes[index]
+            self._shadow[offset:end] = self._array[offset:end]
+
+    def sendPacket(self, index: int) -> None:
+        """
+        Sends the single packet `index`.
+        """
+        for target in self._targets:
+            if target.transport is not None:
+                target.transport.sendto(self._views[index], target.destination(index))
+                continue
+            try:
+                if target.per_packet is None:
+                    target.socket.send(self._views[index])
+                else:
+                    target.socket.sendto(self._views[index], target.per_packet[index])
+            except ConnectionRefusedError:
+                # ICMP port unreachable from an earlier packet, the
+                # error is cleared once reported
+                pass
+
+    def send(self, indices: Optional[Iterable[int]] = None) -> int:
+        """
+        Sends all packets, or only the packets in `indices`, to every target.
+        Returns the number of packets sent per target.
+        """
+        if any(target.transport is not None for target in self._targets):
+            indices = range(len(self.packets)) if indices is None else list(indices)
+            for index in indices:
+                self.sendPacket(index)
+            return len(indices)
+
+        if indices is None:
+            if _sendmmsg:
+                for target in self._targets:
+                    self._sendBatch(target, target.msgvec, len(self.packets))
+                return len(self.packets)
+            indices = range(len(self.packets))
+        indices = list(indices)
+
+        if _sendmmsg and indices:
+            for target in self._targets:
+                # copies of the prebuilt headers, still pointing at the
+                # iovecs and addresses of the full msgvec
+                for position, index in enumerate(indices):
+                    target.partial[position] = target.msgvec[index]
+                self._sendBatch(target, target.partial, len(indices))
+            return len(indices)
+
+        for index in indices:
+            self.sendPacket(index)
+        return len(indices)
+
+    def _buildMsgvec(self, target: _Target):
+        base = ctypes.addressof(ctypes.c_char.from_buffer(self.buffer))
+        target.iovecs = (_IOVec * len(self.packets))()
+        target.addresses = (_SockAddrIn * len(self.packets))()
+        msgvec = (_MMsgHdr * len(self.packets))()
+        for index, (_, _, offset, size) in enumerate(self.packets):
+            target.iovecs[index].iov_base = base + offset
+            target.iovecs[index].iov_len = size
+            header = msgvec[index].msg_hdr
+            header.msg_iov = ctypes.pointer(target.iovecs[index])
+            header.msg_iovlen = 1
+            if target.per_packet is not None:
+                host, port = target.per_packet[index]
+                address = target.addresses[index]
+                address.sin_family = socket.AF_INET
+                address.sin_port = socket.htons(port)
+                address.sin_addr[:] = socket.inet_aton(host)
+                header.msg_name = ctypes.addressof(address)
+                header.msg_namelen = ctypes.sizeof(_SockAddrIn)
+        return msgvec
+
+    def _sendBatch(self, target: _Target, msgvec, count: int) -> int:
+        sent = 0
+        while sent < count:
+            result = _sendmmsg(
+                target.socket.fileno(),
+                ctypes.cast(
+                    ctypes.addressof(msgvec) + sent * ctypes.sizeof(_MMsgHdr),
+                    ctypes.POINTER(_MMsgHdr),
+                ),
+                count - sent,
+                0,
+            )
+            if result < 0:
+                error = ctypes.get_errno()
+                if error in (errno.ECONNREFUSED, errno.EINTR):
+                    continue
+                raise OSError(error, os.strerror(error))
+            sent += result
+        return sent
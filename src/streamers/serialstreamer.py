@@ -1,15 +1,21 @@
-import cv2
 import numpy as np
 
 import serial
 import json
+import threading
 
-from typing import List
+from typing import Callable, List, Optional
 
 from .wledstreamer import WLEDStreamer
+from src.utils.latest_frame_mailbox import LatestFrameMailbox
 
 
 class SerialWLEDStreamer(WLEDStreamer):
+    HEADER = [0xC9, 0xDA]
+    FOOTER = 0x36
+    # 8N1: start bit, 8 data bits, stop bit
+    BITS_PER_BYTE = 10
+
     def __init__(
         self,
         serialport: str = "COM3",
@@ -22,21 +28,94 @@ class SerialWLEDStreamer(WLEDStreamer):
         gamma: float = 0.5,
     ) -> None:
         self._serial_device = serial.Serial(serialport, baudrate, timeout=1)
+        self.baudrate = baudrate
 
         WLEDStreamer.__init__(self, width, height, crop, scale, interpolation, gamma)
 
+        # the message is built in place, header and footer are written once
+        payload_size = self.width * self.height * 3
+        self._message = bytearray(len(self.HEADER) + 2 + payload_size + 1)
+        self._message[0:4] = bytes(
+            self.HEADER + [(payload_size >> 8) & 0xFF, payload_size & 0xFF]
+        )
+        self._message[-1] = self.FOOTER
+        self._payload = np.frombuffer(
+            self._message, np.uint8, payload_size, offset=4
+        ).reshape(self.height, self.width, 3)
+
+        self.max_fps = self.maxFps(baudrate, self.width * self.height)
+        self.logger.info(
+            "Serial link at %d baud sustains at most %.1f fps for %d LEDs."
+            % (baudrate, self.max_fps, self.width * self.height)
+        )
+
+        # frames are written by a dedicated thread, the streaming loop only
+        # drops the latest frame in the mailbox and never waits for the port.
+        # The thread starts with the first frame, unless another writer was
+        # attached, see attachWriter
+        self._mailbox = LatestFrameMailbox((self.height, self.width, 3))
+        self._writer_error = None
+        self._writer = threading.Thread(
+            target=self._writeLoop, name="SerialWLEDStreamer", daemon=True
+        )
+        self._submit = None  # type: Optional[Callable[[np.ndarray], None]]
+
+    @classmethod
+    def maxFps(cls, baudrate: int, led_count: int) -> float:
+        message_size = len(cls.HEADER) + 2 + led_count * 3 + 1
+        return baudrate / (message_size * cls.BITS_PER_BYTE)
+
+    @property
+    def dropped_frames(self) -> int:
+        return self._mailbox.dropped
+
+    def attachWriter(self, submit: Optional[Callable[[np.ndarray], None]]) -> None:
+        """
+        Hands committed frames to `submit` instead of the writer thread.
+        `submit` must not keep the frame, and is expected to call
+        `writeMessage` without blocking the streaming loop.
+        """
+        self._submit = submit
+
+    def writeMessage(self, frame: np.ndarray) -> None:
+        """
+        Writes `frame` to the port, blocking until it is written.
+        """
+        self._payload[...] = frame
+        self._serial_device.write(self._message)
+
     def close(self):
+        self._mailbox.close()
+        if self._writer.ident is not None:
+            self._writer.join(timeout=2)
+        if self._mailbox.dropped:
+            self.logger.info(
+                "Serial writer dropped %d of %d frames."
+                % (self._mailbox.dropped, self._mailbox.received)
+            )
         self._serial_device.close()
 
-    def sendFrame(self, frame: np.ndarray) -> None:
-        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        frame = frame.flatten().astype("int8").tobytes()
-
-        header = bytes([0xC9, 0xDA, len(frame) >> 8, len(frame) & 0xFF])
-        footer = bytes([0x36])
-        message = header + frame + footer
+    def commitFrame(self) -> None:
+        if self._submit is not None:
+            self._submit(self._prepared_frame)
+            return
+        if self._writer_error is not None:
+            raise self._writer_error
+        if self._writer.ident is None:
+            self._writer.start()
+        self._mailbox.put(self._prepared_frame)
 
-        self._serial_device.write(message)
+    def _writeLoop(self) -> None:
+        while True:
+            frame = self._mailbox.get()
+            if frame is None:
+                break
+            try:
+                self.writeMessage(frame)
+            except Exception as e:
+                self.logger.error("Serial write failed: %s" % e)
+                self._writer_error = e
+                break
 
     def _loadInfo(self) -> None:
         self._serial_device.write(b'{"v":true}')
@@ -1,18 +1,27 @@
-import cv2
 import numpy as np
 
 import socket
 import requests
 import json
+import time
 
 from typing import List
 
 from .wledstreamer import WLEDStreamer
+from .packetengine import PacketEngine
+from .pacer import PacketPacer
 
 
 class UDPWLEDStreamer(WLEDStreamer):
+    MESSAGE_TYPE_DRGB = 2
     MESSAGE_TYPE_DNRGB = 4
     MAX_PIXELS_PER_FRAME = 480
+    # DRGB has no start index, so the whole frame has to fit in one packet
+    MAX_PIXELS_DRGB = 490
+    # DNRGB start indices are 16-bit
+    MAX_START_DNRGB = 0xFFFF
+    # seconds WLED stays in realtime mode after the last packet
+    REALTIME_TIMEOUT = 2
 
     def __init__(
         self,
@@ -24,6 +33,14 @@ class UDPWLEDStreamer(WLEDStreamer):
         scale: str = "fill",
         interpolation: str = "smooth",
         gamma: float = 0.5,
+        protocol: str = "dnrgb",
+        delta: bool = False,
+        keyframe_interval: int = 30,
+        keyframe_ms: float = 1000,
+        pacing: bool = False,
+        packet_spacing_ms: float = 0.0,
+        max_bytes_per_second: float = 0,
+        frame_interval: float = 0.0,
     ) -> None:
         self._ip = socket.gethostbyname(host)
         self._port = port
@@ -31,25 +48,164 @@ class UDPWLEDStreamer(WLEDStreamer):
 
         WLEDStreamer.__init__(self, width, height, crop, scale, interpolation, gamma)
 
+        self.protocol = protocol.lower()
+        if self.protocol == "drgb" and self.width * self.height > self.MAX_PIXELS_DRGB:
+            self.logger.warning(
+                "DRGB supports at most %d pixels, falling back to DNRGB."
+                % self.MAX_PIXELS_DRGB
+            )
+            self.protocol = "dnrgb"
+        last_start = (
+            (self.width * self.height - 1) // self.MAX_PIXELS_PER_FRAME
+        ) * self.MAX_PIXELS_PER_FRAME
+        if last_start > self.MAX_START_DNRGB:
+            self.logger.error(
+                "DNRGB can not address %d pixels, use DDP instead."
+                % (self.width * self.height)
+            )
+
+        pixel_count = self.width * self.height
+        if self.protocol == "drgb":
+            self._engine = PacketEngine(pixel_count, pixel_count, 2)
+            self._engine.header(0)[:] = bytes(
+                [self.MESSAGE_TYPE_DRGB, self.REALTIME_TIMEOUT]
+            )
+        else:
+            self._engine = PacketEngine(pixel_count, self.MAX_PIXELS_PER_FRAME, 4)
+            for index, (start, _, _, _) in enumerate(self._engine.packets):
+                self._engine.header(index)[:] = bytes(
+                    [
+                        self.MESSAGE_TYPE_DNRGB,
+                        self.REALTIME_TIMEOUT,
+                        (start >> 8) & 0xFF,
+                        start & 0xFF,
+                    ]
+                )
+        self._engine.connect(self._socket, [(self._ip, self._port)])
+
+        # delta mode only sends DNRGB chunks that changed since the last frame,
+        # with a full keyframe every `keyframe_interval` frames or `keyframe_ms`
+        # to keep WLED in realtime mode and recover from lost packets
+        self.delta = delta and self.protocol == "dnrgb"
+        if delta and not self.delta:
+            self.logger.warning("Delta mode needs DNRGB, sending full DRGB frames.")
+        self.keyframe_interval = keyframe_interval
+        self.keyframe_ms = keyframe_ms
+        self._frames_since_keyframe = 0
+        self._last_keyframe = 0.0
+        self._force_keyframe = False
+        self.delta_stats = {
+            "frames": 0,
+            "keyframes": 0,
+            "packets_sent": 0,
+            "packets_saved": 0,
+            "bytes_sent": 0,
+            "bytes_saved": 0,
+        }
+        if self.delta:
+            self._engine.trackChanges()
+
+        # with pacing, packets are sent from a per-device thread, spaced over
+        # the frame interval and limited to a byte budget
+        self._pacer = None
+        if pacing:
+            self._pacer = PacketPacer(
+                self._engine,
+                self._prepare,
+                (self.height, self.width, 3),
+                packet_spacing=packet_spacing_ms / 1000,
+                max_bytes_per_second=max_bytes_per_second,
+                frame_interval=frame_interval,
+                on_sent=self._engine.markSent if self.delta else None,
+            )
+
+    @property
+    def paced(self) -> bool:
+        return self._pacer is not None
+
+    @property
+    def pacing_stats(self) -> dict:
+        if self._pacer is None:
+            return {}
+        return dict(self._pacer.stats, frames_replaced=self._pacer.frames_dropped)
+
+    def packetKey(self) -> tuple:
+        return (type(self).__name__, self.protocol, self.delta, self._pacer is not None)
+
     def close(self):
+        if self._pacer is not None:
+            self._pacer.close()
+        if self.delta and self.delta_stats["frames"]:
+            stats = self.delta_stats
+            self.logger.info(
+                "Delta mode saved %d of %d packets and %d of %d bytes over %d frames."
+                % (
+                    stats["packets_saved"],
+                    stats["packets_saved"] + stats["packets_sent"],
+                    stats["bytes_saved"],
+                    stats["bytes_saved"] + stats["bytes_sent"],
+                    stats["frames"],
+                )
+            )
         self._socket.close()
 
-    def sendFrame(self, frame: np.ndarray) -> None:
-        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        frame = frame.flatten()
+    def forceKeyframe(self) -> None:
+        self._force_keyframe = True
 
-        for start in range(0, int(frame.size / 3), self.MAX_PIXELS_PER_FRAME):
-            start_h = start >> 8
-            start_l = start & 0xFF
+    def prepareFrame(self, frame: np.ndarray) -> None:
+        if self._pacer is not None:
+            # the pacer thread owns the packet buffer
+            self._prepared_frame = frame
+            return
+        self._prepared_indices = self._prepare(frame)
 
-            message = (
-                bytes([self.MESSAGE_TYPE_DNRGB, 2, start_h, start_l])
-                + frame[(start * 3) : (start + self.MAX_PIXELS_PER_FRAME) * 3]
-                .astype("int8")
-                .tobytes()
-            )
+    def commitFrame(self) -> None:
+        if self._pacer is not None:
+            self._pacer.submit(self._prepared_frame)
+            return
+
+        indices = self._prepared_indices
+        if indices.size == len(self._engine.packets):
+            self._engine.send()
+        elif indices.size:
+            self._engine.send(indices.tolist())
+        if self.delta and indices.size:
+            self._engine.markSent()
+
+    def _prepare(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Writes `frame` into the packet buffer and returns the indices of the
+        packets that have to be sent.
+        """
+        self._engine.write(frame)
+        if not self.delta:
+            return np.arange(len(self._engine.packets))
+
+        now = time.perf_counter()
+        keyframe = (
+            self._force_keyframe
+            or self._frames_since_keyframe >= self.keyframe_interval
+            or (now - self._last_keyframe) * 1000 >= self.keyframe_ms
+        )
+        if keyframe:
+            changed = np.ones(len(self._engine.packets), bool)
+            self._force_keyframe = False
+            self._frames_since_keyframe = 0
+            self._last_keyframe = now
+            self.delta_stats["keyframes"] += 1
+        else:
+            changed = self._engine.changedPackets()
+            self._frames_since_keyframe += 1
 
-            self._socket.sendto(message, (self._ip, self._port))
+        indices = np.flatnonzero(changed)
+        sent_bytes = int(self._engine.packet_sizes[changed].sum())
+        stats = self.delta_stats
+        stats["frames"] += 1
+        stats["packets_sent"] += indices.size
+        stats["packets_saved"] += changed.size - indices.size
+        stats["bytes_sent"] += sent_bytes
+        stats["bytes_saved"] += int(self._engine.packet_sizes.sum()) - sent_bytes
+        return indices
 
     def _loadInfo(self) -> None:
         response = requests.get("http://" + self._ip + "/json/info", timeout=5)
@@ -5,8 +5,11 @@ import math
 import logging
 import sys
 
-from typing import List
+from typing import List, Optional
 
+from .color import ColorPipeline
+from .geometry import GeometryPlanCache
+from .ledmap import LedMap
 # Correct: This imports the function directly
 from src.utils.logger_handler import logger_handler
 
@@ -46,17 +49,47 @@ class WLEDStreamer:
         self.crop = crop
         self.scale = scale
 
-        inverseGamma = 1 / gamma
-        self._gamma_table = [((i / 255) ** inverseGamma) * 255 for i in range(256)]
-        self._gamma_table = np.array(self._gamma_table, np.uint8)
+        self.color = ColorPipeline(gamma)
+        # wiring order of the LEDs, None for a plain row-major matrix
+        self.ledmap = None  # type: Optional[LedMap]
 
         self._interpolation = (
             cv2.INTER_NEAREST if interpolation == "hard" else cv2.INTER_AREA
         )
+        self._geometry = GeometryPlanCache()
 
     def close(self):
         pass
 
+    def processingKey(self) -> tuple:
+        """
+        Settings that determine the processed frame. Streamers with equal keys
+        turn the same source frame into the same LED frame.
+        """
+        return (
+            self.width,
+            self.height,
+            tuple(self.crop),
+            self.scale,
+            self._interpolation,
+            self.color.key,
+            self.ledmap.key if self.ledmap is not None else None,
+        )
+
+    def packetKey(self) -> Optional[tuple]:
+        """
+        Settings that determine the packets built from a processed frame, or
+        None if the streamer can't share packets with a mirror.
+        """
+        return None
+
+    def addMirror(self, streamer: "WLEDStreamer") -> None:
+        """
+        Sends every packet of this streamer to the device of `streamer` too.
+        Only valid for streamers with an equal `packetKey`.
+        """
+        self._engine.addMirror(streamer._socket, streamer._engine.destinations)
+
     def cropFrame(self, frame: np.ndarray) -> np.ndarray:
         if self.crop:
             frame_height, frame_width = frame.shape[:2]
@@ -87,8 +120,8 @@ class WLEDStreamer:
                 frame = cv2.resize(frame, size, interpolation=self._interpolation)
 
             frame_height, frame_width = frame.shape[:2]
-            left = math.floor((frame_width - self.width) / 2)
-            top = math.floor((frame_height - self.height) / 2)
+            left = max(math.floor((frame_width - self.width) / 2), 0)
+            top = max(math.floor((frame_height - self.height) / 2), 0)
             frame = frame[top : (top + self.height), left : (left + self.width)]
             # NB: frame could now be smaller than self.width, self.height!
             # see extension below
@@ -105,12 +138,71 @@ class WLEDStreamer:
 
         return frame
 
-    def gammaCorrectFrame(self, frame: np.ndarray) -> np.ndarray:
-        return cv2.LUT(frame, self._gamma_table)
+    def geometryFrame(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Same as `scaleFrame(cropFrame(frame))` in a single pass into a reused
+        buffer, which is only valid until the next call.
+        """
+        plan = self._geometry.get(
+            frame.shape,
+            frame.dtype,
+            self.crop,
+            self.scale,
+            self.width,
+            self.height,
+            self._interpolation,
+        )
+        return plan.apply(frame)
+
+    def colorFrame(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Gamma, brightness, white balance and calibration of a BGR frame at
+        LED resolution. Returns RGB in a reused buffer, which is only valid
+        until the next call.
+        """
+        return self.color.apply(frame)
+
+    def mapFrame(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Reorders an RGB frame into the wiring order of the LEDs, see LedMap.
+        """
+        if self.ledmap is None:
+            return frame
+        return self.ledmap.apply(frame)
 
     def sendFrame(self, frame: np.ndarray) -> None:
+        """
+        Sends an RGB frame at LED resolution, as returned by `colorFrame` and
+        `mapFrame`.
+        """
+        self.prepareFrame(frame)
+        self.commitFrame()
+
+    def prepareFrame(self, frame: np.ndarray) -> None:
+        """
+        Builds everything needed to send `frame`, so that `commitFrame` only
+        has to put it on the wire.
+        """
+        self._prepared_frame = frame
+
+    def commitFrame(self) -> None:
         self.logger.warning("Sending should be handled by a subclass of this class.")
 
+    @property
+    def paced(self) -> bool:
+        """
+        True if commitFrame only hands the frame to a thread that sends it
+        later, so the time it takes says nothing about when it was sent.
+        """
+        return False
+
+    def forceKeyframe(self) -> None:
+        """
+        Makes the next frame go out in full, used for keepalives. Only
+        streamers that skip unchanged data have to do anything.
+        """
+        pass
+
     def _loadInfo(self) -> None:
         pass
 
@@ -0,0 +1,54 @@
+# src/utils/allocation_guard.py
+
+import tracemalloc
+from contextlib import contextmanager
+
+
+class AllocationGuard:
+    """
+    Asserts that a hot loop runs without steady-state allocations.
+
+    Wrap each iteration in `with guard.frame():`. After `warmup_frames`, every
+    iteration that allocates more than `limit_bytes` at its peak, or keeps
+    more than that allocated afterwards, raises AssertionError. The limit
+    leaves room for the small Python objects every iteration creates, but
+    not for a frame-sized array. Tracing slows everything down, so this is
+    meant for debugging and benchmarks only.
+    """
+
+    def __init__(self, limit_bytes: int = 2048, warmup_frames: int = 10):
+        self.limit_bytes = limit_bytes
+        self.warmup_frames = warmup_frames
+        self.frames = 0
+        self.max_peak = 0
+        self._started = False
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started = True
+
+    def stop(self) -> None:
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+
+    @contextmanager
+    def frame(self):
+        self.start()
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        yield
+        current, peak = tracemalloc.get_traced_memory()
+
+        self.frames += 1
+        if self.frames <= self.warmup_frames:
+            return
+        allocated = peak - before
+        retained = current - before
+        self.max_peak = max(self.max_peak, allocated)
+        if allocated > self.limit_bytes or retained > self.limit_bytes:
+            raise AssertionError(
+                f"Frame {self.frames} allocated {allocated} bytes at its peak and "
+                f"kept {retained} bytes, the limit is {self.limit_bytes}"
+            )
@@ -0,0 +1,136 @@
+# src/utils/frame_clock.py
+
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+
+POLICIES = ("skip", "catch_up")
+
+
+class FrameClock:
+    """
+    Paces a loop to absolute deadlines: frame n is due at start + n / rate,
+    so sleep overshoot never accumulates into a lower frame rate.
+
+    `wait` sleeps until shortly before the next deadline and spins for the
+    last `spin` seconds, which is accurate to well below a millisecond.
+
+    When the loop falls behind, the policy decides what happens:
+    "skip" starts the late frame right away and drops only the deadlines
+    that passed entirely in the meantime, so a loop that is a little too
+    slow runs flat out instead of idling until the next deadline ahead.
+    "catch_up" returns immediately until the loop is back on schedule, as
+    long as it is at most `max_catch_up` frames behind; beyond that the
+    schedule restarts from now.
+
+    The deadline error of every frame, how late `wait` returned, is kept for
+    the last `history` frames to report jitter percentiles.
+    """
+
+    def __init__(
+        self,
+        frame_rate: float,
+        policy: str = "skip",
+        max_catch_up: int = 2,
+        spin: float = 0.001,
+        stop_event: Optional[threading.Event] = None,
+        history: int = 1024,
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown frame clock policy {policy!r}, expected one of {POLICIES}")
+        self.interval = 1.0 / frame_rate
+        self.policy = policy
+        self.max_catch_up = max_catch_up
+        self.spin = spin
+        self.stop_event = stop_event or threading.Event()
+        self.frames = 0
+        self.skipped = 0
+        self.late = 0
+        self.restarts = 0
+        self._errors = np.zeros(history)
+        self._start = None  # type: Optional[float]
+        self._index = 0
+
+    def start(self) -> None:
+        self._start = time.perf_counter()
+        self._index = 0
+
+    def set_frame_rate(self, frame_rate: float) -> None:
+        """
+        Changes the rate from the current deadline on, called from the
+        thread that waits on the clock.
+        """
+        if self._start is not None:
+            self._start += self._index * self.interval
+            self._index = 0
+        self.interval = 1.0 / frame_rate
+
+    def next_deadline(self) -> float:
+        """
+        Advances to the next frame and returns its deadline after applying
+        the policy, without waiting. A deadline in the past means the frame
+        is due now. Loops that wait on their own pass how late they were to
+        `record`.
+        """
+        if self._start is None:
+            self.start()
+        self._index += 1
+        deadline = self._start + self._index * self.interval
+        now = time.perf_counter()
+        if now <= deadline:
+            return deadline
+
+        self.late += 1
+        behind = int((now - deadline) / self.interval)
+        if self.policy == "skip":
+            # due now, the following deadline is the next one still ahead
+            self._index += behind
+            self.skipped += behind
+            return now
+        if behind >= self.max_catch_up:
+            self._start = now
+            self._index = 0
+            self.restarts += 1
+            return now
+        return deadline
+
+    def wait(self) -> bool:
+        """
+        Waits for the next frame's deadline. Returns False if the stop event
+        was set while waiting.
+        """
+        deadline = self.next_deadline()
+        remaining = deadline - time.perf_counter()
+        if remaining > self.spin:
+            if self.stop_event.wait(remaining - self.spin):
+                return False
+        while time.perf_counter() < deadline:
+            pass
+        self.record(time.perf_counter() - deadline)
+        return not self.stop_event.is_set()
+
+    def record(self, error: float) -> None:
+        """
+        Records how many seconds after its deadline a frame started.
+        """
+        self._errors[self.frames % len(self._errors)] = error
+        self.frames += 1
+
+    @property
+    def stats(self) -> dict:
+        """
+        Frames paced, deadlines skipped or missed, and the p50/p99 deadline
+        error in milliseconds over the recent history.
+        """
+        errors = self._errors[: min(self.frames, len(self._errors))]
+        p50, p99 = np.percentile(errors, [50, 99]) * 1000 if errors.size else (0.0, 0.0)
+        return {
+            "frames": self.frames,
+            "late": self.late,
+            "skipped": self.skipped,
+            "restarts": self.restarts,
+            "p50_ms": float(p50),
+            "p99_ms": float(p99),
+        }
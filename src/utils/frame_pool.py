@@ -0,0 +1,63 @@
+# src/utils/frame_pool.py
+
+import threading
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+class FramePool:
+    """
+    Reusable frame buffers with explicit ownership.
+
+    `acquire` hands out a buffer that belongs to the caller until it is given
+    back with `release`, after which it may be handed out again. Buffers are
+    kept per shape and dtype, at most `max_free` of each, so a steady stream
+    of same-sized frames stops allocating after the first few.
+    """
+
+    def __init__(self, max_free: int = 4):
+        self.max_free = max_free
+        self._free = {}  # type: Dict[Tuple, List[np.ndarray]]
+        self._owned = {}  # type: Dict[int, np.ndarray]
+        self._lock = threading.Lock()
+        self.allocated = 0
+
+    def acquire(self, shape: Tuple[int, ...], dtype=np.uint8) -> np.ndarray:
+        """
+        Returns a buffer of `shape` and `dtype` with undefined contents.
+        """
+        key = (tuple(shape), np.dtype(dtype))
+        with self._lock:
+            free = self._free.get(key)
+            frame = free.pop() if free else None
+            if frame is None:
+                frame = np.empty(shape, dtype)
+                self.allocated += 1
+            self._owned[id(frame)] = frame
+        return frame
+
+    def release(self, frame: np.ndarray) -> None:
+        """
+        Gives a buffer back. It must come from `acquire` and must not be
+        used by the caller afterwards.
+        """
+        with self._lock:
+            if self._owned.pop(id(frame), None) is None:
+                raise ValueError(
+                    "Frame was not acquired from this pool or was already released"
+                )
+            free = self._free.setdefault((frame.shape, frame.dtype), [])
+            if len(free) < self.max_free:
+                free.append(frame)
+
+    def owns(self, frame: np.ndarray) -> bool:
+        """
+        True if `frame` was acquired from this pool and not released yet.
+        """
+        with self._lock:
+            return id(frame) in self._owned
+
+    @property
+    def in_use(self) -> int:
+        return len(self._owned)
@@ -0,0 +1,81 @@
+# src/utils/frame_ring.py
+
+import threading
+from collections import deque
+from typing import Any, Callable, Optional
+
+
+class FrameRing:
+    """
+    Bounded queue between two pipeline stages that never blocks the producer.
+
+    When the ring is full, `put` drops the oldest item to make room, so the
+    consumer always works on recent frames and latency stays bounded by the
+    capacity. Dropped items are passed to `on_drop`, e.g. to return their
+    buffers to a pool. After `close`, `get` drains what is left and then
+    returns None.
+    """
+
+    def __init__(self, capacity: int = 2, on_drop: Optional[Callable[[Any], None]] = None):
+        self.capacity = capacity
+        self.on_drop = on_drop
+        self._items = deque()
+        self._closed = False
+        self._condition = threading.Condition()
+        self.received = 0
+        self.dropped = 0
+        self.max_depth = 0
+
+    def put(self, item: Any) -> bool:
+        """
+        Adds `item`, returns True if an older item was dropped for it.
+        """
+        dropped = None
+        with self._condition:
+            if self._closed:
+                dropped = item
+            else:
+                if len(self._items) >= self.capacity:
+                    dropped = self._items.popleft()
+                    self.dropped += 1
+                self._items.append(item)
+                self.received += 1
+                self.max_depth = max(self.max_depth, len(self._items))
+                self._condition.notify()
+        if dropped is not None and self.on_drop is not None:
+            self.on_drop(dropped)
+        return dropped is not None
+
+    def get(self, timeout: Optional[float] = None) -> Any:
+        """
+        Takes the oldest item, waiting up to `timeout` for one. Returns None
+        on timeout or once the ring is closed and empty.
+        """
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: self._items or self._closed, timeout
+            ):
+                return None
+            if not self._items:
+                return None
+            return self._items.popleft()
+
+    @property
+    def depth(self) -> int:
+        return len(self._items)
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def clear(self) -> None:
+        """
+        Drops everything still queued, passing it to `on_drop`.
+        """
+        with self._condition:
+            items = list(self._items)
+            self._items.clear()
+        if self.on_drop is not None:
+            for item in items:
+                self.on_drop(item)
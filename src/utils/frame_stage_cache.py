@@ -0,0 +1,73 @@
+# src/utils/frame_stage_cache.py
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+import numpy as np
+
+
+class _Entry:
+    def __init__(self):
+        self.ready = threading.Event()
+        self.value = None  # type: Optional[np.ndarray]
+        self.error = None  # type: Optional[BaseException]
+
+
+class FrameStageCache:
+    """
+    Memoizes processing stages for the duration of one frame.
+
+    Each result is computed once per key and shared by every caller asking for
+    the same key, so devices with the same crop, size or gamma do that work
+    only once. Results are returned as read-only views. When several threads
+    ask for a key that is still being computed, they wait for the first one
+    instead of computing it again.
+
+    `new_frame` drops all results, and at most `max_entries` are held at once;
+    the oldest are evicted first and simply recomputed if needed again.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # type: OrderedDict[Hashable, _Entry]
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def new_frame(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get(self, key: Hashable, compute: Callable[..., np.ndarray], *args: Any) -> np.ndarray:
+        """
+        Returns the result stored for `key`, calling `compute(*args)` if there
+        is none yet this frame.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            owner = entry is None
+            if owner:
+                entry = self._entries[key] = _Entry()
+                self.misses += 1
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            else:
+                self.hits += 1
+
+        if owner:
+            try:
+                # a view, so the caller's own array never turns read-only
+                value = compute(*args).view()
+                value.flags.writeable = False
+                entry.value = value
+            except BaseException as e:
+                entry.error = e
+                raise
+            finally:
+                entry.ready.set()
+        else:
+            entry.ready.wait()
+            if entry.error is not None:
+                raise entry.error
+        return entry.value
@@ -0,0 +1,76 @@
+# src/utils/latest_frame_mailbox.py
+
+import threading
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+class LatestFrameMailbox:
+    """
+    One-slot mailbox between a producer and a consumer thread.
+
+    `put` copies the frame into a preallocated slot and replaces any frame the
+    consumer has not taken yet, so a slow consumer drops stale frames instead
+    of queueing them. Three slots are enough for the producer to always find
+    a free one: one being consumed, one pending and one being filled.
+    """
+
+    def __init__(self, shape: Tuple[int, ...], dtype=np.uint8):
+        self._slots = [np.empty(shape, dtype) for _ in range(3)]
+        self._pending = None  # type: Optional[int]
+        self._busy = None  # type: Optional[int]
+        self._closed = False
+        self._condition = threading.Condition()
+        self.received = 0
+        self.dropped = 0
+
+    def put(self, frame: np.ndarray) -> bool:
+        """
+        Publishes a copy of `frame`. Returns True if an unconsumed frame
+        was dropped to make room for it.
+        """
+        with self._condition:
+            index = next(
+                i for i in range(3) if i != self._pending and i != self._busy
+            )
+        # the consumer never touches a slot that is neither pending nor busy
+        np.copyto(self._slots[index], frame)
+
+        with self._condition:
+            dropped = self._pending is not None
+            self._pending = index
+            self.received += 1
+            if dropped:
+                self.dropped += 1
+            self._condition.notify()
+        return dropped
+
+    def get(self, timeout: Optional[float] = None) -> Optional[np.ndarray]:
+        """
+        Waits for the next frame and returns it. The returned array stays
+        valid until the next call to `get`. Returns None on timeout or once
+        the mailbox is closed.
+        """
+        with self._condition:
+            self._busy = None
+            if not self._condition.wait_for(
+                lambda: self._pending is not None or self._closed, timeout
+            ):
+                return None
+            if self._closed:
+                return None
+            self._busy, self._pending = self._pending, None
+            return self._slots[self._busy]
+
+    @property
+    def pending(self) -> bool:
+        """
+        True if a frame is waiting to be taken.
+        """
+        return self._pending is not None
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
@@ -0,0 +1,409 @@
+# src/utils/led_monitor.py
+
+import base64
+import hashlib
+import json
+import logging
+import socket
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+import numpy as np
+
+_WEBSOCKET_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+_OPCODE_TEXT = 0x1
+_OPCODE_BINARY = 0x2
+_OPCODE_CLOSE = 0x8
+_OPCODE_PING = 0x9
+_OPCODE_PONG = 0xA
+
+# kind, device, width, height
+_HEADER = struct.Struct("<cHHH")
+# first pixel and pixel count of a changed run
+_RUN = struct.Struct("<II")
+# unchanged pixels up to this long are sent along rather than starting a new run
+_RUN_GAP = _RUN.size // 3
+
+_PAGE = b"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>WLED Studio Monitor</title>
+<style>
+body { background: #111; color: #ccc; font-family: sans-serif; }
+figure { display: inline-block; margin: 8px; }
+canvas { width: 320px; image-rendering: pixelated; background: #000; }
+</style>
+</head>
+<body>
+<div id="devices"></div>
+<script>
+const devices = {};
+function device(index, width, height) {
+  let d = devices[index];
+  if (!d || d.width !== width || d.height !== height) {
+    if (d) d.figure.remove();
+    const figure = document.createElement("figure");
+    const canvas = document.createElement("canvas");
+    const caption = document.createElement("figcaption");
+    canvas.width = width;
+    canvas.height = height;
+    caption.textContent = "Device " + index + " (" + width + "x" + height + ")";
+    figure.append(canvas, caption);
+    document.getElementById("devices").append(figure);
+    const context = canvas.getContext("2d");
+    const image = context.createImageData(width, height);
+    image.data.fill(255);
+    d = devices[index] = { figure, context, image, width, height };
+  }
+  return d;
+}
+function paint(d, rgb, start, count) {
+  const data = d.image.data;
+  for (let i = 0; i < count; i++) {
+    data[(start + i) * 4] = rgb[i * 3];
+    data[(start + i) * 4 + 1] = rgb[i * 3 + 1];
+    data[(start + i) * 4 + 2] = rgb[i * 3 + 2];
+  }
+}
+function connect() {
+  const ws = new WebSocket("ws://" + location.host + "/ws");
+  ws.binaryType = "arraybuffer";
+  ws.onmessage = (event) => {
+    if (typeof event.data === "string") {
+      if (JSON.parse(event.data).reset) {
+        for (const index in devices) devices[index].figure.remove();
+        for (const index in devices) delete devices[index];
+      }
+      return;
+    }
+    const view = new DataView(event.data);
+    const kind = String.fromCharCode(view.getUint8(0));
+    const d = device(view.getUint16(1, true), view.getUint16(3, true), view.getUint16(5, true));
+    let offset = 7;
+    if (kind === "K") {
+      paint(d, new Uint8Array(event.data, offset), 0, d.width * d.height);
+    } else {
+      while (offset < event.data.byteLength) {
+        const start = view.getUint32(offset, true);
+        const count = view.getUint32(offset + 4, true);
+        paint(d, new Uint8Array(event.data, offset + 8, count * 3), start, count);
+        offset += 8 + count * 3;
+      }
+    }
+    d.context.putImageData(d.image, 0, 0);
+  };
+  ws.onclose = () => setTimeout(connect, 1000);
+}
+connect();
+</script>
+</body>
+</html>
+"""
+
+
+class _Client:
+    def __init__(self, sock: socket.socket, address):
+        self.sock = sock
+        self.address = address
+        self.synced = False
+        self.closed = False
+        self.lock = threading.Lock()
+
+    def send(self, opcode: int, payload: bytes) -> None:
+        length = len(payload)
+        if length < 126:
+            header = struct.pack("!BB", 0x80 | opcode, length)
+        elif length < 1 << 16:
+            header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+        else:
+            header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+        with self.lock:
+            self.sock.sendall(header + payload)
+
+    def close(self) -> None:
+        self.closed = True
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+class _MonitorHandler(BaseHTTPRequestHandler):
+    # browsers reject a WebSocket handshake answered with "HTTP/1.0 101"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/ws" and self.headers.get("Upgrade", "").lower() == "websocket":
+            self._upgrade()
+        elif path == "/":
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(_PAGE)))
+            self.end_headers()
+            self.wfile.write(_PAGE)
+        else:
+            self.send_error(404)
+
+    def _upgrade(self):
+        key = self.headers.get("Sec-WebSocket-Key")
+        if not key:
+            self.send_error(400)
+            return
+        accept = base64.b64encode(hashlib.sha1(key.encode() + _WEBSOCKET_GUID).digest())
+        self.send_response(101)
+        self.send_header("Upgrade", "websocket")
+        self.send_header("Connection", "Upgrade")
+        self.send_header("Sec-WebSocket-Accept", accept.decode())
+        self.end_headers()
+        self.close_connection = True
+        self.server.monitor._serve(_Client(self.connection, self.client_address), self.rfile)
+
+    def log_message(self, format, *args):
+        self.server.monitor.logger.debug(f"{self.address_string()} {format % args}")
+
+
+class LedMonitor:
+    """
+    Serves what every device shows to browsers over HTTP and WebSocket.
+
+    The page at http://host:port/ connects to /ws and draws each device at
+    its LED resolution. `submit(device, frame)` takes a device's RGB frame
+    at most `fps` times per second and only while a client is connected,
+    otherwise it returns right away. A sender thread encodes the latest
+    frames once and pushes them to all clients: a new client gets a
+    keyframe per device, then only the runs of pixels that changed.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        fps: float = 10,
+        logger: logging.Logger = None,
+    ):
+        self.host = host
+        self.port = port
+        self.interval = 1.0 / fps
+        self.logger = logger or logging.getLogger("LedMonitor")
+        self.bytes_sent = 0
+        self._clients = []  # type: List[_Client]
+        self._wake = threading.Condition()
+        self._stopping = False
+        self._reset = False
+        self._due = {}  # type: Dict[int, float]
+        self._pending = {}  # type: Dict[int, np.ndarray]
+        self._fresh = set()
+        self._sent = {}  # type: Dict[int, np.ndarray]
+        self._server = None  # type: Optional[ThreadingHTTPServer]
+        self._threads = []  # type: List[threading.Thread]
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/"
+
+    @property
+    def active(self) -> bool:
+        return bool(self._clients)
+
+    def start(self) -> None:
+        self._server = ThreadingHTTPServer((self.host, self.port), _MonitorHandler)
+        self._server.daemon_threads = True
+        self._server.monitor = self
+        # port 0 picks a free port
+        self.port = self._server.server_address[1]
+        self._stopping = False
+        self._threads = [
+            threading.Thread(target=self._server.serve_forever, name="LedMonitorServer", daemon=True),
+            threading.Thread(target=self._broadcast, name="LedMonitor", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        self.logger.info(f"LED monitor listening on {self.url}")
+
+    def stop(self) -> None:
+        if self._server is None:
+            return
+        with self._wake:
+            self._stopping = True
+            self._wake.notify_all()
+        self._server.shutdown()
+        self._server.server_close()
+        for client in list(self._clients):
+            client.close()
+        for thread in self._threads:
+            thread.join(timeout=2)
+        self._server = None
+        self.logger.info(f"LED monitor stopped, {self.bytes_sent} bytes sent")
+
+    def reset(self) -> None:
+        """
+        Forgets all devices, for a new set of them.
+        """
+        with self._wake:
+            self._pending.clear()
+            self._fresh.clear()
+            self._due.clear()
+            self._reset = True
+            self._wake.notify_all()
+
+    def submit(self, device: int, frame: np.ndarray) -> None:
+        """
+        Offers the RGB frame a device shows, it is copied and not kept.
+        """
+        if not self._clients:
+            return
+        now = time.perf_counter()
+        if now < self._due.get(device, 0.0):
+            return
+        with self._wake:
+            self._due[device] = now + self.interval
+            slot = self._pending.get(device)
+            if slot is None or slot.shape != frame.shape:
+                slot = self._pending[device] = np.empty(frame.shape, np.uint8)
+            np.copyto(slot, frame)
+            self._fresh.add(device)
+            self._wake.notify_all()
+
+    def _serve(self, client: _Client, rfile) -> None:
+        """
+        Registers a WebSocket client and answers its control frames until
+        it disconnects.
+        """
+        with self._wake:
+            self._clients.append(client)
+            self._wake.notify_all()
+        self.logger.info(f"LED monitor client {client.address[0]} connected")
+        try:
+            while not client.closed:
+                opcode, payload = self._read_message(rfile)
+                if opcode is None or opcode == _OPCODE_CLOSE:
+                    break
+                if opcode == _OPCODE_PING:
+                    client.send(_OPCODE_PONG, payload)
+        except OSError:
+            pass
+        finally:
+            with self._wake:
+                self._clients.remove(client)
+                if not self._clients:
+                    # with nobody watching frames are not even copied, the
+                    # next client starts from the current state
+                    self._pending.clear()
+                    self._fresh.clear()
+                    self._reset = True
+                    self._wake.notify_all()
+            try:
+                client.send(_OPCODE_CLOSE, b"")
+            except OSError:
+                pass
+            client.close()
+            self.logger.info(f"LED monitor client {client.address[0]} disconnected")
+
+    @staticmethod
+    def _read_message(rfile):
+        header = rfile.read(2)
+        if len(header) < 2:
+            return None, b""
+        opcode = header[0] & 0x0F
+        length = header[1] & 0x7F
+        if length == 126:
+            length = struct.unpack("!H", rfile.read(2))[0]
+        elif length == 127:
+            length = struct.unpack("!Q", rfile.read(8))[0]
+        mask = rfile.read(4) if header[1] & 0x80 else b""
+        payload = rfile.read(length)
+        if mask:
+            key = np.resize(np.frombuffer(mask, np.uint8), length)
+            payload = (np.frombuffer(payload, np.uint8) ^ key).tobytes()
+        return opcode, payload
+
+    def _broadcast(self) -> None:
+        frames = {}  # type: Dict[int, np.ndarray]
+        while True:
+            with self._wake:
+                self._wake.wait_for(
+                    lambda: self._stopping
+                    or self._reset
+                    or self._fresh
+                    or any(not client.synced for client in self._clients)
+                )
+                if self._stopping:
+                    return
+                reset = self._reset
+                self._reset = False
+                if reset:
+                    self._sent.clear()
+                # the pending slots are handed over, the sender's take their place
+                for device in self._fresh:
+                    frames[device], self._pending[device] = (
+                        self._pending[device],
+                        frames.get(device),
+                    )
+                    if self._pending[device] is None:
+                        del self._pending[device]
+                fresh = sorted(self._fresh)
+                self._fresh.clear()
+                clients = list(self._clients)
+
+            if reset:
+                self._send(clients, _OPCODE_TEXT, json.dumps({"reset": True}).encode())
+            for client in clients:
+                if not client.synced:
+                    for device, frame in sorted(self._sent.items()):
+                        self._send([client], _OPCODE_BINARY, self._keyframe(device, frame))
+                    client.synced = True
+            for device in fresh:
+                message = self._encode(device, frames[device])
+                if message is not None:
+                    self._send(clients, _OPCODE_BINARY, message)
+
+    def _send(self, clients: List[_Client], opcode: int, payload: bytes) -> None:
+        for client in clients:
+            if client.closed:
+                continue
+            try:
+                client.send(opcode, payload)
+                self.bytes_sent += len(payload)
+            except OSError:
+                # the client's thread notices and removes it
+                client.close()
+
+    @staticmethod
+    def _keyframe(device: int, frame: np.ndarray) -> bytes:
+        height, width = frame.shape[:2]
+        return _HEADER.pack(b"K", device, width, height) + frame.tobytes()
+
+    def _encode(self, device: int, frame: np.ndarray) -> Optional[bytes]:
+        """
+        Encodes `frame` against the last one sent for the device, as a
+        keyframe or the runs of changed pixels, whichever is smaller.
+        None if nothing changed.
+        """
+        previous = self._sent.get(device)
+        if previous is None or previous.shape != frame.shape:
+            self._sent[device] = frame.copy()
+            return self._keyframe(device, frame)
+
+        changed = np.flatnonzero(np.any(frame != previous, axis=2))
+        if changed.size == 0:
+            return None
+        np.copyto(previous, frame)
+
+        breaks = np.flatnonzero(np.diff(changed) > _RUN_GAP + 1)
+        starts = changed[np.concatenate(([0], breaks + 1))]
+        ends = changed[np.concatenate((breaks, [changed.size - 1]))] + 1
+        if (ends - starts).sum() * 3 + starts.size * _RUN.size >= frame.nbytes:
+            return self._keyframe(device, frame)
+
+        height, width = frame.shape[:2]
+        pixels = frame.reshape(-1, 3)
+        parts = [_HEADER.pack(b"D", device, width, height)]
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            parts.append(_RUN.pack(start, end - start))
+            parts.append(pixels[start:end].tobytes())
+        return b"".join(parts)
@@ -0,0 +1,102 @@
+# src/utils/load_shedder.py
+
+import logging
+import time
+from typing import Callable, List, Sequence, Tuple
+
+
+class LoadShedder:
+    """
+    Steps through load levels depending on how much of its time budget each
+    frame uses.
+
+    `levels` are (name, factor) pairs, from normal operation to the deepest
+    level, and `apply(level)` switches to a level. Usage is averaged over
+    `window` frames: above `high` the level goes one step deeper, and when
+    the level's `factor`, the expected increase in usage from undoing it,
+    still keeps usage below `low`, it goes back one step. Every change is
+    followed by a full window before the next one, and is logged and kept
+    in `transitions`.
+    """
+
+    def __init__(
+        self,
+        levels: Sequence[Tuple[str, float]],
+        apply: Callable[[int], None],
+        high: float = 0.95,
+        low: float = 0.75,
+        window: int = 30,
+        logger: logging.Logger = None,
+    ):
+        self.levels = list(levels)
+        self.apply = apply
+        self.high = high
+        self.low = low
+        self.window = window
+        self.logger = logger or logging.getLogger("LoadShedder")
+        self.level = 0
+        self.transitions = []  # type: List[dict]
+        self._usage = 0.0
+        self._frames = 0
+        self._since = time.perf_counter()
+        self._time_at_level = [0.0] * len(self.levels)
+
+    @property
+    def level_name(self) -> str:
+        return self.levels[self.level][0]
+
+    def update(self, busy: float, budget: float) -> None:
+        """
+        Records a frame that kept the bottleneck busy for `busy` seconds out
+        of `budget` seconds available for it.
+        """
+        self._usage += busy / budget
+        self._frames += 1
+        if self._frames < self.window:
+            return
+
+        usage = self._usage / self._frames
+        self._usage = 0.0
+        self._frames = 0
+        if usage > self.high and self.level < len(self.levels) - 1:
+            self._change(self.level + 1, usage)
+        elif self.level > 0 and usage * self.levels[self.level][1] < self.low:
+            self._change(self.level - 1, usage)
+
+    def _change(self, level: int, usage: float) -> None:
+        now = time.perf_counter()
+        self._time_at_level[self.level] += now - self._since
+        self._since = now
+        previous = self.level_name
+        self.level = level
+        self.apply(level)
+        self.transitions.append(
+            {"time": now, "from": previous, "to": self.level_name, "usage": usage}
+        )
+        self.logger.info(
+            f"Load level {previous} -> {self.level_name}: frames used "
+            f"{usage * 100:.0f}% of their budget over the last {self.window}"
+        )
+
+    @property
+    def stats(self) -> dict:
+        """
+        Current level, number of steps in each direction and seconds spent
+        at every level.
+        """
+        seconds = list(self._time_at_level)
+        seconds[self.level] += time.perf_counter() - self._since
+        deeper = sum(
+            1
+            for transition in self.transitions
+            if self._index(transition["to"]) > self._index(transition["from"])
+        )
+        return {
+            "level": self.level_name,
+            "steps_down": deeper,
+            "steps_up": len(self.transitions) - deeper,
+            "seconds": {name: s for (name, _), s in zip(self.levels, seconds)},
+        }
+
+    def _index(self, name: str) -> int:
+        return [level_name for level_name, _ in self.levels].index(name)
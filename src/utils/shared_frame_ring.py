@@ -0,0 +1,166 @@
+# src/utils/shared_frame_ring.py
+
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+# header fields, followed by the sequence number of every slot
+_PUBLISHED = 0
+_CLOSED = 1
+_HEADER_FIELDS = 2
+
+
+class SharedFrameRing:
+    """
+    Frames of one shape in shared memory, written by one process and read by
+    any number of others as zero-copy views.
+
+    `publish` copies a frame into the next of `capacity` slots and never waits
+    for readers. Readers take the newest frame with `wait_newer` and use it in
+    place; the slot is only overwritten `capacity` frames later, and `intact`
+    tells whether that happened while the view was in use. Every slot records
+    the sequence number of its frame, set to -1 while it is being written.
+
+    The ring is created by the writing process, other processes attach to it
+    with `attach(*ring.description, condition)`. All of them share the
+    multiprocessing Condition used to wake up readers, which has to be passed
+    to the processes when they are started.
+    """
+
+    def __init__(
+        self,
+        memory: shared_memory.SharedMemory,
+        shape: Tuple[int, ...],
+        dtype,
+        capacity: int,
+        condition,
+        owner: bool,
+    ):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.capacity = capacity
+        self.condition = condition
+        self._memory = memory
+        self._owner = owner
+        self._header = np.ndarray(
+            (_HEADER_FIELDS + capacity,), np.int64, memory.buf
+        )
+        self._slots = np.ndarray(
+            (capacity,) + self.shape,
+            self.dtype,
+            memory.buf,
+            offset=self._header.nbytes,
+        )
+        self._next = 0
+
+    @staticmethod
+    def size(shape: Tuple[int, ...], dtype, capacity: int) -> int:
+        frame_bytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        return (_HEADER_FIELDS + capacity) * 8 + capacity * frame_bytes
+
+    @classmethod
+    def create(
+        cls, shape: Tuple[int, ...], dtype, capacity: int, condition
+    ) -> "SharedFrameRing":
+        memory = shared_memory.SharedMemory(
+            create=True, size=cls.size(shape, dtype, capacity)
+        )
+        ring = cls(memory, shape, dtype, capacity, condition, owner=True)
+        ring._header[:] = 0
+        ring._header[_HEADER_FIELDS:] = -1
+        return ring
+
+    @classmethod
+    def attach(
+        cls, name: str, shape: Tuple[int, ...], dtype: str, capacity: int, condition
+    ) -> "SharedFrameRing":
+        memory = shared_memory.SharedMemory(name=name)
+        return cls(memory, shape, dtype, capacity, condition, owner=False)
+
+    @property
+    def description(self) -> tuple:
+        """
+        Picklable (name, shape, dtype, capacity) to attach to the ring.
+        """
+        return (self._memory.name, self.shape, self.dtype.str, self.capacity)
+
+    @property
+    def published(self) -> int:
+        return int(self._header[_PUBLISHED])
+
+    @property
+    def closed(self) -> bool:
+        return bool(self._header[_CLOSED])
+
+    def publish(self, frame: np.ndarray) -> int:
+        """
+        Copies `frame` into the next slot and returns its sequence number,
+        counting from 1. A frame of another resolution is scaled to the
+        ring's, it must have the same channels and dtype.
+        """
+        index = self._next
+        self._next = (index + 1) % self.capacity
+        sequence = self.published + 1
+        self._header[_HEADER_FIELDS + index] = -1
+        slot = self._slots[index]
+        if frame.shape == self.shape:
+            np.copyto(slot, frame)
+        else:
+            cv2.resize(frame, (self.shape[1], self.shape[0]), dst=slot, interpolation=cv2.INTER_AREA)
+        with self.condition:
+            self._header[_HEADER_FIELDS + index] = sequence
+            self._header[_PUBLISHED] = sequence
+            self.condition.notify_all()
+        return sequence
+
+    def wait_newer(
+        self, sequence: int, timeout: Optional[float] = None
+    ) -> Optional[Tuple[int, np.ndarray]]:
+        """
+        Waits for a frame newer than `sequence` and returns the newest one as
+        (sequence, read-only view). Returns None on timeout or once the ring
+        is closed and nothing newer was published.
+        """
+        with self.condition:
+            self.condition.wait_for(
+                lambda: self.published > sequence or self.closed, timeout
+            )
+            newest = self.published
+        if newest <= sequence:
+            return None
+        view = self._slots[(newest - 1) % self.capacity]
+        view.flags.writeable = False
+        return newest, view
+
+    def intact(self, sequence: int) -> bool:
+        """
+        True if the frame `sequence` is still in its slot, i.e. a view of it
+        was not overwritten while in use.
+        """
+        slot = _HEADER_FIELDS + (sequence - 1) % self.capacity
+        return int(self._header[slot]) == sequence
+
+    def close(self) -> None:
+        """
+        Marks the end of the stream, readers drain the newest frame and then
+        get None.
+        """
+        with self.condition:
+            self._header[_CLOSED] = 1
+            self.condition.notify_all()
+
+    def release(self) -> None:
+        """
+        Detaches from the shared memory, and frees it in the creating
+        process. Views of the ring must not be used afterwards.
+        """
+        del self._header, self._slots
+        try:
+            self._memory.close()
+        except BufferError:
+            # a view is still referenced somewhere, the mapping goes with it
+            pass
+        if self._owner:
+            self._memory.unlink()
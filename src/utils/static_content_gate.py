@@ -0,0 +1,130 @@
+# src/utils/static_content_gate.py
+
+import time
+from typing import Callable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+from src.streamers.geometry import GeometryPlanCache
+
+
+class StaticContentGate:
+    """
+    Decides per source frame whether it has to be streamed at all.
+
+    Frames are compared by their probes. With `geometries`, a callable
+    returning the (crop, scale, width, height, interpolation) stages the
+    frames go through, see StreamerManager.geometries, the probes are what
+    those stages make of the frame, so a change counts if it can reach the
+    LEDs before the color stage. Otherwise the probe is the whole frame
+    area-averaged down to `probe_size` (height, width), which can average
+    away a small change inside a crop or on a nearest-sampled pixel.
+
+    A frame whose probes differ from the last streamed ones by at most
+    `tolerance` in every channel is static and is dropped, except for a
+    keepalive every `keepalive` seconds that keeps the devices in realtime
+    mode. `on_keepalive` is called for each of them, so streamers that only
+    send changes can send it in full. The first frame that changed is
+    streamed right away. Read-only frames identical to the last one, such as
+    those of still images, are static without comparing anything.
+    """
+
+    def __init__(
+        self,
+        probe_size: Tuple[int, int],
+        tolerance: int = 2,
+        keepalive: float = 1.0,
+        on_keepalive: Optional[Callable[[], None]] = None,
+        geometries: Optional[Callable[[], List[tuple]]] = None,
+    ):
+        self.probe_size = probe_size
+        self.tolerance = tolerance
+        self.keepalive = keepalive
+        self.on_keepalive = on_keepalive
+        self.geometries = geometries
+        self.frames = 0
+        self.static = 0
+        self.keepalives = 0
+        self._last_frame = None  # type: Optional[np.ndarray]
+        self._last_sent = 0.0
+        self._shape = None
+        self._stages = None  # type: Optional[List[tuple]]
+        self._plans = GeometryPlanCache()
+        self._references = []  # type: List[np.ndarray]
+        self._differences = []  # type: List[np.ndarray]
+
+    def should_send(self, frame: np.ndarray) -> bool:
+        """
+        True if `frame` changed or a keepalive is due.
+        """
+        self.frames += 1
+        now = time.perf_counter()
+        if self._changed(frame):
+            self._last_sent = now
+            return True
+        if now - self._last_sent >= self.keepalive:
+            self.keepalives += 1
+            self._last_sent = now
+            if self.on_keepalive is not None:
+                self.on_keepalive()
+            return True
+        self.static += 1
+        return False
+
+    def _changed(self, frame: np.ndarray) -> bool:
+        """
+        Compares `frame` with the last frame that changed.
+        """
+        if self._last_frame is frame and not frame.flags.writeable:
+            return False
+        self._last_frame = frame
+
+        stages = self._geometries(frame)
+        if frame.shape != self._shape or stages != self._stages:
+            self._shape = frame.shape
+            self._stages = list(stages)
+            # one plan per stage, with room for a source switching resolution
+            self._plans.max_plans = max(4, 2 * len(stages))
+            self._references = [self._probe(frame, stage).copy() for stage in stages]
+            self._differences = [np.empty_like(probe) for probe in self._references]
+            return True
+
+        probes = [self._probe(frame, stage) for stage in stages]
+        changed = False
+        for probe, reference, difference in zip(
+            probes, self._references, self._differences
+        ):
+            cv2.absdiff(probe, reference, difference)
+            if difference.max() > self.tolerance:
+                changed = True
+                break
+        if changed:
+            for probe, reference in zip(probes, self._references):
+                np.copyto(reference, probe)
+        return changed
+
+    def _geometries(self, frame: np.ndarray) -> List[tuple]:
+        if self.geometries is not None:
+            return self.geometries()
+        # never finer than the frame itself
+        height = min(self.probe_size[0], frame.shape[0])
+        width = min(self.probe_size[1], frame.shape[1])
+        return [((), "stretch", width, height, cv2.INTER_AREA)]
+
+    def _probe(self, frame: np.ndarray, stage: tuple) -> np.ndarray:
+        """
+        `frame` through one geometry stage, in a buffer reused per stage.
+        """
+        crop, scale, width, height, interpolation = stage
+        plan = self._plans.get(
+            frame.shape, frame.dtype, crop, scale, width, height, interpolation
+        )
+        return plan.apply(frame)
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "frames": self.frames,
+            "static": self.static,
+            "keepalives": self.keepalives,
+        }
@@ -0,0 +1,54 @@
+import socket
+
+import numpy as np
+import pytest
+
+
+class Receiver:
+    """
+    A UDP socket on localhost standing in for a device.
+    """
+
+    def __init__(self):
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind(("127.0.0.1", 0))
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+        self.socket.settimeout(1)
+        self.port = self.socket.getsockname()[1]
+
+    def receive(self, count):
+        return [self.socket.recv(65536) for _ in range(count)]
+
+    def receive_all(self, timeout=0.2):
+        packets = []
+        self.socket.settimeout(timeout)
+        try:
+            while True:
+                packets.append(self.socket.recv(65536))
+        except socket.timeout:
+            return packets
+        finally:
+            self.socket.settimeout(1)
+
+    def nothing_received(self):
+        return not self.receive_all(0.05)
+
+
+@pytest.fixture
+def receiver():
+    receiver = Receiver()
+    yield receiver
+    receiver.socket.close()
+
+
+def gradient(width, height):
+    """
+    A frame whose every byte differs from its neighbours.
+    """
+    pixels = np.arange(width * height * 3) % 251
+    return pixels.astype(np.uint8).reshape(height, width, 3)
+
+
+def send_frame(streamer, frame):
+    streamer.prepareFrame(frame)
+    streamer.commitFrame()
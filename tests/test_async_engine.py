@@ -0,0 +1,48 @@
+import time
+
+import numpy as np
+from conftest import Receiver
+
+from src.managers.async_engine import AsyncStreamingEngine
+from src.managers.streamer_manager import StreamerManager
+
+
+class ListPlayer:
+    def __init__(self, frames):
+        self.frames = list(frames)
+
+    def read(self):
+        return self.frames.pop(0) if self.frames else None
+
+
+def test_sessions_stream_side_by_side():
+    receivers = [Receiver(), Receiver()]
+    engine = AsyncStreamingEngine(workers=2)
+    for offset, receiver in enumerate(receivers):
+        manager = StreamerManager(
+            [
+                {
+                    "host": "127.0.0.1",
+                    "port": receiver.port,
+                    "protocol": "dnrgb",
+                    "width": 8,
+                    "height": 8,
+                    "gamma": 1.0,
+                }
+            ]
+        )
+        frames = [np.full((8, 8, 3), offset * 100 + value * 5, np.uint8) for value in range(10)]
+        engine.add_session(ListPlayer(frames), manager, frame_rate=50)
+
+    engine.start()
+    deadline = time.perf_counter() + 5
+    while engine.is_alive() and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    engine.stop()
+    assert engine.error is None
+
+    for offset, receiver in enumerate(receivers):
+        values = [packet[4] for packet in receiver.receive_all()]
+        assert values == [offset * 100 + value * 5 for value in range(10)]
+        receiver.socket.close()
+    assert all(session.stats["send"]["frames"] == 10 for session in engine.sessions)
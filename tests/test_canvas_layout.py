@@ -0,0 +1,101 @@
+import json
+
+import numpy as np
+
+from src.managers.canvas_layout import CanvasLayout, CanvasTile
+
+
+def write_layout(tmp_path, layout):
+    path = tmp_path / "layout.json"
+    path.write_text(json.dumps(layout))
+    return CanvasLayout.load(str(path))
+
+
+def test_tiles_are_views_in_device_orientation():
+    canvas = np.arange(4 * 6 * 3, dtype=np.uint8).reshape(4, 6, 3)
+
+    upright = CanvasTile(2, 1, 3, 2)
+    view = upright.view(canvas)
+    assert view.shape == (2, 3, 3)
+    assert np.shares_memory(view, canvas)
+    np.testing.assert_array_equal(view, canvas[1:3, 2:5])
+
+    # a 3x2 panel turned by 90 degrees covers 2 columns and 3 rows
+    turned = CanvasTile(0, 0, 3, 2, rotation=90)
+    assert (turned.canvas_width, turned.canvas_height) == (2, 3)
+    view = turned.view(canvas)
+    assert view.shape == (2, 3, 3)
+    np.testing.assert_array_equal(view, np.rot90(canvas[0:3, 0:2]))
+
+    flipped = CanvasTile(0, 0, 6, 4, rotation=180)
+    np.testing.assert_array_equal(flipped.view(canvas), canvas[::-1, ::-1])
+
+
+def test_load_places_tiles_and_rejects_overflow(tmp_path):
+    layout = write_layout(
+        tmp_path,
+        {
+            "canvas": {"width": 64, "height": 32, "scale": "fit"},
+            "devices": [
+                {"host": "10.0.0.1", "x": 0, "y": 0, "width": 32, "height": 32},
+                {"host": "10.0.0.2", "x": 32, "y": 0, "width": 32, "height": 32, "rotation": 270},
+            ],
+        },
+    )
+    assert [tile.key() for tile in layout.tiles] == [
+        (0, 0, 32, 32, 0),
+        (32, 0, 32, 32, 270),
+    ]
+    assert layout.scale == "fit"
+    assert "x" not in layout.devices[0]
+
+    try:
+        write_layout(
+            tmp_path,
+            {
+                "canvas": {"width": 32, "height": 32},
+                "devices": [{"host": "10.0.0.1", "x": 16, "width": 32, "height": 32}],
+            },
+        )
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("a tile outside the canvas was accepted")
+
+
+def test_render_scales_to_canvas():
+    layout = CanvasLayout(8, 4, [CanvasTile(0, 0, 8, 4)], [{}], scale="stretch")
+    frame = np.zeros((40, 80, 3), np.uint8)
+    frame[:, 40:] = 200
+    canvas = layout.render(frame)
+    assert canvas.shape == (4, 8, 3)
+    assert canvas[:, :4].max() == 0
+    assert canvas[:, 4:].min() == 200
+
+
+def test_mixed_serial_and_udp_devices_keep_their_own_transport(tmp_path):
+    layout = write_layout(
+        tmp_path,
+        {
+            "canvas": {"width": 64, "height": 16},
+            "devices": [
+                {"serialport": "/dev/ttyUSB0", "baudrate": 921600, "x": 0, "width": 16, "height": 16},
+                {"host": "10.0.0.2", "port": 4048, "protocol": "ddp", "x": 16, "width": 16, "height": 16},
+                {"x": 32, "width": 16, "height": 16},
+            ],
+        },
+    )
+    udp_defaults = {"host": "10.0.0.1", "port": 21324, "protocol": "dnrgb", "gamma": 0.6, "crop": [1, 1, 1, 1]}
+    serial, udp, inherited = layout.stream_configs(udp_defaults)
+    assert {"host", "port", "protocol"}.isdisjoint(serial)
+    assert serial["serialport"] == "/dev/ttyUSB0"
+    assert serial["gamma"] == 0.6
+    assert (udp["host"], udp["port"], udp["protocol"]) == ("10.0.0.2", 4048, "ddp")
+    assert inherited["host"] == "10.0.0.1"
+    assert all("crop" not in config for config in (serial, udp, inherited))
+
+    serial_defaults = {"serialport": "COM3", "baudrate": 115200, "gamma": 0.5}
+    serial, udp, inherited = layout.stream_configs(serial_defaults)
+    assert serial["baudrate"] == 921600
+    assert "serialport" not in udp and "baudrate" not in udp
+    assert inherited["serialport"] == "COM3"
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from src.streamers.color import ColorPipeline, loadCubeLut
+
+
+def write_cube(tmp_path, transform):
+    """
+    A 2x2x2 .cube LUT mapping every corner (r, g, b) through `transform`.
+    """
+    lines = ["TITLE \"test\"", "LUT_3D_SIZE 2"]
+    # red changes fastest
+    for b in (0, 1):
+        for g in (0, 1):
+            for r in (0, 1):
+                lines.append("%g %g %g" % transform(r, g, b))
+    path = tmp_path / "test.cube"
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+def bgr_ramp():
+    values = np.arange(0, 256, 15, dtype=np.uint8)
+    frame = np.stack([values, values[::-1], np.full_like(values, 128)], axis=-1)
+    return frame.reshape(1, -1, 3)
+
+
+def test_gamma_one_only_swaps_channels():
+    frame = bgr_ramp()
+    output = ColorPipeline(gamma=1.0).apply(frame)
+    np.testing.assert_array_equal(output, frame[..., ::-1])
+
+
+def test_gamma_brightness_and_white_balance_per_channel():
+    pipeline = ColorPipeline(gamma=0.5, brightness=0.5, white_balance=(1.0, 0.5, 0.0))
+    frame = np.full((1, 1, 3), 128, np.uint8)
+    red, green, blue = pipeline.apply(frame)[0, 0]
+    expected = (128 / 255) ** 2 * 255 * 0.5
+    assert red == int(expected)
+    assert green == int(expected * 0.5)
+    assert blue == 0
+
+
+def test_configure_keeps_other_settings():
+    pipeline = ColorPipeline(gamma=(1.0, 0.8, 0.6), brightness=0.7)
+    pipeline.configure(brightness=0.9)
+    assert pipeline.gamma == (1.0, 0.8, 0.6)
+    assert pipeline.brightness == 0.9
+    with pytest.raises(ValueError):
+        pipeline.configure(white_balance=(1.0, 1.0))
+
+
+def test_identity_lut_changes_nothing(tmp_path):
+    path = write_cube(tmp_path, lambda r, g, b: (r, g, b))
+    table, domain_min, domain_max = loadCubeLut(path)
+    assert table.shape == (2, 2, 2, 3)
+    frame = bgr_ramp()
+    output = ColorPipeline(gamma=1.0, lut_path=path).apply(frame)
+    assert np.abs(output.astype(int) - frame[..., ::-1]).max() <= 1
+
+
+def test_lut_is_applied_before_the_curves(tmp_path):
+    # swaps red and blue, then halves everything
+    path = write_cube(tmp_path, lambda r, g, b: (b, g, r))
+    pipeline = ColorPipeline(gamma=1.0, brightness=0.5, lut_path=path)
+    frame = np.zeros((1, 1, 3), np.uint8)
+    frame[0, 0] = (200, 0, 0)  # blue in BGR
+    assert pipeline.apply(frame)[0, 0].tolist() == [100, 0, 0]
+
+
+def test_one_dimensional_luts_are_rejected(tmp_path):
+    path = tmp_path / "curve.cube"
+    path.write_text("LUT_1D_SIZE 2\n0 0 0\n1 1 1\n")
+    with pytest.raises(ValueError):
+        loadCubeLut(str(path))
@@ -0,0 +1,47 @@
+from conftest import gradient, send_frame
+
+from src.streamers.ddpstreamer import DDPWLEDStreamer
+
+
+def test_packets_carry_offsets_and_push_on_last(receiver):
+    streamer = DDPWLEDStreamer("127.0.0.1", receiver.port, width=30, height=30)
+    frame = gradient(30, 30)
+    send_frame(streamer, frame)
+    send_frame(streamer, frame)
+    per_frame = len(streamer._engine.packets)
+    packets = receiver.receive(per_frame * 2)
+    streamer.close()
+
+    pixels = frame.reshape(-1).tobytes()
+    per_packet = streamer.max_pixels_per_packet * 3
+    # a 1500 byte MTU leaves 1462 bytes, whole pixels only
+    assert per_packet == 1461
+    assert per_frame == 2
+    for index, packet in enumerate(packets[:per_frame]):
+        last = index == per_frame - 1
+        assert packet[0] == (0x41 if last else 0x40)
+        assert packet[1] == 1
+        assert packet[2:4] == bytes([0x0B, 0x01])
+        offset = int.from_bytes(packet[4:8], "big")
+        length = int.from_bytes(packet[8:10], "big")
+        assert offset == index * per_packet
+        assert len(packet) == 10 + length
+        assert packet[10:] == pixels[offset : offset + length]
+    # sequence numbers count 1-15
+    assert packets[per_frame][1] == 2
+
+
+def test_deferred_push_is_sent_on_its_own(receiver):
+    streamer = DDPWLEDStreamer("127.0.0.1", receiver.port, width=30, height=30)
+    streamer.deferPush()
+    send_frame(streamer, gradient(30, 30))
+    packets = receiver.receive(2)
+    assert [packet[0] for packet in packets] == [0x40, 0x40]
+    assert receiver.nothing_received()
+
+    streamer.push()
+    (push,) = receiver.receive(1)
+    streamer.close()
+    assert len(push) == 10
+    assert push[0] == 0x41
+    assert push[1] == 1
@@ -0,0 +1,80 @@
+from conftest import gradient, send_frame
+
+from src.streamers.udpstreamer import UDPWLEDStreamer
+
+
+def test_delta_sends_changed_chunks_and_keyframes(receiver):
+    streamer = UDPWLEDStreamer(
+        "127.0.0.1",
+        receiver.port,
+        width=40,
+        height=36,
+        protocol="dnrgb",
+        delta=True,
+        keyframe_interval=3,
+        keyframe_ms=60000,
+    )
+    frame = gradient(40, 36)
+    # the first frame is a keyframe
+    send_frame(streamer, frame)
+    assert len(receiver.receive(3)) == 3
+
+    # an unchanged frame sends nothing
+    send_frame(streamer, frame)
+    assert receiver.nothing_received()
+
+    # only the chunk holding the changed pixel is sent
+    frame[13, 5] += 1
+    send_frame(streamer, frame)
+    (packet,) = receiver.receive(1)
+    start = int.from_bytes(packet[2:4], "big")
+    assert start == 480
+    assert packet[4:] == frame.reshape(-1)[480 * 3 : 960 * 3].tobytes()
+    assert receiver.nothing_received()
+
+    send_frame(streamer, frame)
+    assert receiver.nothing_received()
+
+    # after `keyframe_interval` frames everything is sent again
+    send_frame(streamer, frame)
+    assert len(receiver.receive(3)) == 3
+    streamer.close()
+
+    stats = streamer.delta_stats
+    assert stats["frames"] == 5
+    assert stats["keyframes"] == 2
+    assert stats["packets_sent"] == 7
+    assert stats["packets_saved"] == 8
+
+
+def test_forced_keyframe_sends_unchanged_frame_in_full(receiver):
+    streamer = UDPWLEDStreamer(
+        "127.0.0.1",
+        receiver.port,
+        width=40,
+        height=24,
+        protocol="dnrgb",
+        delta=True,
+        keyframe_ms=60000,
+    )
+    frame = gradient(40, 24)
+    send_frame(streamer, frame)
+    assert len(receiver.receive(2)) == 2
+    send_frame(streamer, frame)
+    assert receiver.nothing_received()
+
+    # a gate keepalive must reach the device even though nothing changed
+    streamer.forceKeyframe()
+    send_frame(streamer, frame)
+    assert len(receiver.receive(2)) == 2
+    send_frame(streamer, frame)
+    assert receiver.nothing_received()
+    streamer.close()
+
+
+def test_delta_only_applies_to_dnrgb(receiver):
+    streamer = UDPWLEDStreamer(
+        "127.0.0.1", receiver.port, width=10, height=10, protocol="drgb", delta=True
+    )
+    assert not streamer.delta
+    streamer.close()
@@ -0,0 +1,93 @@
+from conftest import gradient, send_frame
+
+from src.managers.streamer_manager import StreamerManager
+from src.streamers.artnetstreamer import ArtNetWLEDStreamer
+from src.streamers.dmxstreamer import DMXWLEDStreamer
+from src.streamers.e131streamer import E131WLEDStreamer
+
+
+def test_universe_map_splits_pixels_into_170s():
+    assert DMXWLEDStreamer.buildUniverseMap(400, 7) == [
+        (7, 0, 170),
+        (8, 170, 170),
+        (9, 340, 60),
+    ]
+
+
+def test_e131_packets_fill_consecutive_universes(receiver):
+    streamer = E131WLEDStreamer("127.0.0.1", receiver.port, width=20, height=10, universe=5)
+    frame = gradient(20, 10)
+    send_frame(streamer, frame)
+    send_frame(streamer, frame)
+    packets = receiver.receive(4)
+    streamer.close()
+
+    pixels = frame.reshape(-1).tobytes()
+    for index, packet in enumerate(packets[:2]):
+        count = (170, 30)[index]
+        assert len(packet) == 126 + count * 3
+        assert packet[4:16] == b"ASC-E1.17\x00\x00\x00"
+        assert int.from_bytes(packet[16:18], "big") == 0x7000 | (len(packet) - 16)
+        assert int.from_bytes(packet[38:40], "big") == 0x7000 | (len(packet) - 38)
+        assert packet[44:56] == b"WLED-Studio\x00"
+        assert packet[108] == 100
+        assert packet[111] == 1
+        assert int.from_bytes(packet[113:115], "big") == 5 + index
+        assert int.from_bytes(packet[123:125], "big") == count * 3 + 1
+        assert packet[125] == 0
+        assert packet[126:] == pixels[index * 510 : index * 510 + count * 3]
+    # the sequence number counts frames
+    assert [packet[111] for packet in packets[2:]] == [2, 2]
+
+
+def test_e131_multicast_groups_follow_the_universe():
+    assert E131WLEDStreamer.multicastAddress(1) == "239.255.0.1"
+    assert E131WLEDStreamer.multicastAddress(300) == "239.255.1.44"
+    streamer = E131WLEDStreamer(width=20, height=10, universe=255, multicast=True)
+    assert streamer._engine.destinations == [("239.255.0.255", 5568), ("239.255.1.0", 5568)]
+    streamer.close()
+
+
+def test_artnet_packets_have_even_length(receiver):
+    streamer = ArtNetWLEDStreamer(
+        "127.0.0.1", receiver.port, width=19, height=9, universe=0x123
+    )
+    frame = gradient(19, 9)
+    send_frame(streamer, frame)
+    first, last = receiver.receive(2)
+    streamer.close()
+
+    pixels = frame.reshape(-1).tobytes()
+    for index, packet in enumerate([first, last]):
+        assert packet[:8] == b"Art-Net\x00"
+        # OpDmx is little-endian, the protocol version big-endian
+        assert packet[8:10] == bytes([0x00, 0x50])
+        assert packet[10:12] == bytes([0, 14])
+        assert packet[12] == 1
+        # SubUni, then Net
+        assert packet[14:16] == bytes([0x23 + index, 0x01])
+    assert int.from_bytes(first[16:18], "big") == 510
+    assert first[18:] == pixels[:510]
+    # 1 pixel left over, 3 channels padded to 4
+    assert int.from_bytes(last[16:18], "big") == 4
+    assert len(last) == 18 + 4
+    assert last[18:21] == pixels[510:]
+    assert last[21] == 0
+
+
+def test_artnet_multicast_group_gets_every_universe():
+    streamer = ArtNetWLEDStreamer(width=19, height=9, multicast_group="239.1.2.3")
+    assert streamer._engine.destinations == [("239.1.2.3", 6454)] * 2
+    streamer.close()
+
+
+def test_e131_mirrors_keep_per_universe_destinations():
+    config = dict(host="127.0.0.1", width=20, height=10, protocol="e131", multicast=True)
+    manager = StreamerManager(
+        [dict(config, mirror_address="192.168.1.255"), config]
+    )
+    leader = manager.active_streamers[0]
+    assert len(manager.active_streamers) == 1
+    assert len(manager.mirror_groups[0]) == 2
+    assert leader._engine.destinations == [("239.255.0.1", 5568), ("239.255.0.2", 5568)]
+    manager.close_all()
@@ -0,0 +1,15 @@
+from src.capture.ffmpeg_capture import decode_filter, decode_resolution
+
+
+def test_decode_resolution_keeps_aspect_and_oversamples():
+    assert decode_resolution((1920, 1080), (32, 16)) == (64, 36)
+    # never larger than the source
+    assert decode_resolution((320, 240), (256, 256)) == (320, 240)
+
+
+def test_decode_filter_drops_frames_before_scaling():
+    assert decode_filter((64, 36), 60, 30) == "fps=30,scale=64:36:flags=area"
+    assert decode_filter((64, 36), 24, 12.5) == "fps=12.5,scale=64:36:flags=area"
+    # streams at or above the video's rate need every frame
+    assert decode_filter((64, 36), 24, 30) == "scale=64:36:flags=area"
+    assert decode_filter((64, 36), 24) == "scale=64:36:flags=area"
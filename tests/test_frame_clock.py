@@ -0,0 +1,81 @@
+import pytest
+
+from src.utils import frame_clock
+from src.utils.frame_clock import FrameClock
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 0.0
+
+    def perf_counter(self):
+        return self.now
+
+
+@pytest.fixture
+def fake_time(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(frame_clock, "time", fake)
+    return fake
+
+
+def run(clock, fake_time, frames, work):
+    """
+    Runs `frames` frames that take `work` seconds each, waiting for every
+    deadline still ahead, and returns the seconds that took.
+    """
+    clock.start()
+    for _ in range(frames):
+        fake_time.now = max(fake_time.now, clock.next_deadline())
+        fake_time.now += work
+    return fake_time.now
+
+
+def test_on_time_frames_follow_the_grid(fake_time):
+    clock = FrameClock(100)
+    clock.start()
+    fake_time.now = 0.004
+    assert clock.next_deadline() == pytest.approx(0.01)
+    fake_time.now = 0.0101
+    assert clock.next_deadline() == pytest.approx(0.02)
+    assert clock.late == 0
+
+
+@pytest.mark.parametrize("policy", ["skip", "catch_up"])
+def test_slightly_slow_frames_run_back_to_back(fake_time, policy):
+    # 60 FPS with 17.5 ms of work per frame is about 57 FPS either way
+    clock = FrameClock(60, policy=policy)
+    elapsed = run(clock, fake_time, 114, 0.0175)
+    assert 114 / elapsed > 55
+
+
+def test_skip_starts_late_frames_now_and_drops_missed_deadlines(fake_time):
+    clock = FrameClock(100, policy="skip")
+    clock.start()
+    fake_time.now = 0.045
+    assert clock.next_deadline() == 0.045
+    # the deadlines at 20, 30 and 40 ms passed while the frame was late
+    assert clock.skipped == 3
+    assert clock.next_deadline() == pytest.approx(0.05)
+    assert clock.late == 1
+
+
+def test_catch_up_returns_missed_deadlines_then_restarts(fake_time):
+    clock = FrameClock(100, policy="catch_up", max_catch_up=2)
+    clock.start()
+    fake_time.now = 0.025
+    assert clock.next_deadline() == pytest.approx(0.01)
+    assert clock.next_deadline() == pytest.approx(0.02)
+    assert clock.next_deadline() == pytest.approx(0.03)
+    assert clock.skipped == 0
+
+    # too far behind, the schedule starts over from now
+    fake_time.now = 0.1
+    assert clock.next_deadline() == 0.1
+    assert clock.restarts == 1
+    assert clock.next_deadline() == pytest.approx(0.11)
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        FrameClock(30, policy="drop")
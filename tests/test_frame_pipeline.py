@@ -0,0 +1,82 @@
+import time
+
+import numpy as np
+import pytest
+
+from src.managers.frame_pipeline import FramePipeline
+from src.managers.streamer_manager import StreamerManager
+
+
+class ListPlayer:
+    """
+    Plays `frames` once, like a video file without looping.
+    """
+
+    def __init__(self, frames):
+        self.frames = list(frames)
+        self.reads = 0
+
+    def read(self):
+        if self.reads >= len(self.frames):
+            return None
+        self.reads += 1
+        return self.frames[self.reads - 1]
+
+
+def manager_for(receiver):
+    config = {
+        "host": "127.0.0.1",
+        "port": receiver.port,
+        "protocol": "dnrgb",
+        "width": 8,
+        "height": 8,
+        "gamma": 1.0,
+        "scale": "stretch",
+    }
+    return StreamerManager([config])
+
+
+def run(pipeline, timeout=5):
+    pipeline.start()
+    deadline = time.perf_counter() + timeout
+    while pipeline.is_alive() and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    pipeline.stop()
+    assert pipeline.error is None
+
+
+@pytest.mark.parametrize("pipelined", [True, False])
+def test_every_frame_reaches_the_device(receiver, pipelined):
+    frames = [np.full((16, 16, 3), value, np.uint8) for value in range(1, 21)]
+    manager = manager_for(receiver)
+    pipeline = FramePipeline(
+        ListPlayer(frames),
+        manager,
+        frame_rate=50,
+        pipelined=pipelined,
+        load_shedding=False,
+        adaptive_rate=False,
+    )
+    run(pipeline)
+    manager.close_all()
+
+    packets = receiver.receive_all()
+    # gray frames at gamma 1.0 come out unchanged, in order
+    assert [packet[4] for packet in packets] == list(range(1, 21))
+    stats = pipeline.stats
+    assert stats["process"]["frames"] == stats["send"]["frames"] == 20
+
+
+def test_static_frames_are_not_streamed(receiver):
+    still = np.full((16, 16, 3), 50, np.uint8)
+    still.flags.writeable = False
+    manager = manager_for(receiver)
+    pipeline = FramePipeline(
+        ListPlayer([still] * 20), manager, frame_rate=100, load_shedding=False
+    )
+    run(pipeline)
+    manager.close_all()
+
+    # the first frame, then nothing within the keepalive interval
+    assert len(receiver.receive_all()) == 1
+    assert pipeline.stats["capture"]["static"]["static"] == 19
@@ -0,0 +1,63 @@
+import cv2
+import numpy as np
+
+from src.streamers.geometry import GeometryPlan, GeometryPlanCache
+
+
+def plan_for(frame, scale, width, height, crop=[], interpolation=cv2.INTER_NEAREST):
+    return GeometryPlan(frame.shape, frame.dtype, crop, scale, width, height, interpolation)
+
+
+def halves(height, width):
+    """
+    Left half dark, right half bright.
+    """
+    frame = np.zeros((height, width, 3), np.uint8)
+    frame[:, width // 2 :] = 200
+    return frame
+
+
+def test_stretch_fills_the_target():
+    frame = halves(10, 40)
+    output = plan_for(frame, "stretch", 8, 8).apply(frame)
+    assert output.shape == (8, 8, 3)
+    assert output[:, :4].max() == 0
+    assert output[:, 4:].min() == 200
+
+
+def test_fit_letterboxes_and_fill_cuts_the_sides():
+    frame = np.full((10, 40, 3), 100, np.uint8)
+    output = plan_for(frame, "fit", 8, 8).apply(frame)
+    # 40x10 fitted into 8x8 is 8x2, centered with black bars
+    assert output[3:5].min() == 100
+    assert output[:3].max() == 0 and output[5:].max() == 0
+
+    frame = halves(10, 40)
+    output = plan_for(frame, "fill", 8, 8).apply(frame)
+    # 32x8, the middle 8 columns straddle both halves
+    assert output[:, :4].max() == 0
+    assert output[:, 4:].min() == 200
+
+
+def test_crop_is_taken_in_source_pixels():
+    frame = np.zeros((20, 20, 3), np.uint8)
+    frame[5:15, 5:15] = 90
+    output = plan_for(frame, "stretch", 4, 4, crop=[5, 5, 5, 5]).apply(frame)
+    assert output.min() == 90
+
+
+def test_crop_scale_copies_the_centered_window():
+    frame = np.arange(6 * 6 * 3, dtype=np.uint8).reshape(6, 6, 3)
+    output = plan_for(frame, "crop", 4, 2).apply(frame)
+    np.testing.assert_array_equal(output, frame[2:4, 1:5])
+
+
+def test_plans_are_cached_per_shape_and_setting():
+    cache = GeometryPlanCache(max_plans=2)
+    args = (np.dtype(np.uint8), [], "fill", 8, 8, cv2.INTER_AREA)
+    first = cache.get((10, 10, 3), *args)
+    assert cache.get((10, 10, 3), *args) is first
+    cache.get((20, 20, 3), *args)
+    cache.get((30, 30, 3), *args)
+    # the least recently used plan was dropped
+    assert cache.get((10, 10, 3), *args) is not first
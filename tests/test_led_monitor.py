@@ -0,0 +1,112 @@
+import base64
+import hashlib
+import socket
+import struct
+import time
+import urllib.error
+import urllib.request
+
+import numpy as np
+import pytest
+
+from src.utils.led_monitor import LedMonitor
+
+
+@pytest.fixture
+def monitor():
+    monitor = LedMonitor(port=0, fps=100)
+    monitor.start()
+    yield monitor
+    monitor.stop()
+
+
+def connect(monitor):
+    sock = socket.create_connection(("127.0.0.1", monitor.port), timeout=2)
+    key = base64.b64encode(b"0123456789abcdef").decode()
+    sock.sendall(
+        (
+            "GET /ws HTTP/1.1\r\nHost: localhost\r\nUpgrade: websocket\r\n"
+            "Connection: Upgrade\r\nSec-WebSocket-Version: 13\r\n"
+            f"Sec-WebSocket-Key: {key}\r\n\r\n"
+        ).encode()
+    )
+    rfile = sock.makefile("rb")
+    headers = []
+    while True:
+        line = rfile.readline()
+        if line in (b"\r\n", b""):
+            break
+        headers.append(line.decode().strip())
+    accept = base64.b64encode(
+        hashlib.sha1(key.encode() + b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11").digest()
+    ).decode()
+    return sock, rfile, headers, accept
+
+
+def read_message(rfile):
+    header = rfile.read(2)
+    length = header[1] & 0x7F
+    if length == 126:
+        length = struct.unpack("!H", rfile.read(2))[0]
+    elif length == 127:
+        length = struct.unpack("!Q", rfile.read(8))[0]
+    return header[0] & 0x0F, rfile.read(length)
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        assert time.perf_counter() < deadline
+        time.sleep(0.01)
+
+
+def test_page_is_served_over_http_1_1(monitor):
+    with urllib.request.urlopen(monitor.url) as response:
+        assert response.status == 200
+        assert response.version == 11
+        assert b"new WebSocket" in response.read()
+
+
+def test_unknown_path_is_not_found(monitor):
+    with pytest.raises(urllib.error.HTTPError) as error:
+        urllib.request.urlopen(monitor.url + "missing")
+    assert error.value.code == 404
+
+
+def test_websocket_handshake(monitor):
+    sock, rfile, headers, accept = connect(monitor)
+    try:
+        assert headers[0].startswith("HTTP/1.1 101")
+        assert f"Sec-WebSocket-Accept: {accept}" in headers
+        wait_for(lambda: monitor.active)
+    finally:
+        rfile.close()
+        sock.close()
+    wait_for(lambda: not monitor.active)
+
+
+def test_client_gets_keyframe_then_changed_runs(monitor):
+    # without a client frames are not even copied
+    monitor.submit(0, np.zeros((2, 4, 3), np.uint8))
+    assert not monitor._pending
+
+    sock, rfile, _, _ = connect(monitor)
+    try:
+        wait_for(lambda: monitor.active)
+        frame = np.zeros((2, 4, 3), np.uint8)
+        monitor.submit(0, frame)
+        opcode, payload = read_message(rfile)
+        assert opcode == 0x2
+        assert payload[:7] == struct.pack("<cHHH", b"K", 0, 4, 2)
+        assert payload[7:] == frame.tobytes()
+
+        time.sleep(0.02)
+        frame[1, 3] = (1, 2, 3)
+        monitor.submit(0, frame)
+        opcode, payload = read_message(rfile)
+        assert opcode == 0x2
+        assert payload[:1] == b"D"
+        assert payload[7:] == struct.pack("<II", 7, 1) + bytes((1, 2, 3))
+    finally:
+        rfile.close()
+        sock.close()
@@ -0,0 +1,67 @@
+import json
+
+import numpy as np
+
+from src.streamers.ledmap import LedMap, matrixOrder
+
+
+def numbered(width, height):
+    # every pixel holds its row-major index in the red channel
+    frame = np.zeros((height, width, 3), np.uint8)
+    frame[..., 0] = np.arange(width * height).reshape(height, width)
+    return frame
+
+
+def test_serpentine_reverses_every_other_row():
+    ledmap = LedMap.fromConfig("serpentine", 4, 3)
+    output = ledmap.apply(numbered(4, 3))
+    assert output.shape == (3, 4, 3)
+    assert output[..., 0].reshape(-1).tolist() == [0, 1, 2, 3, 7, 6, 5, 4, 8, 9, 10, 11]
+
+
+def test_matrix_order_flags():
+    x, y = matrixOrder(3, 2, bottom_start=True, vertical=True, serpentine=True)
+    assert list(zip(x.tolist(), y.tolist())) == [(0, 1), (0, 0), (1, 0), (1, 1), (2, 1), (2, 0)]
+
+
+def test_panels_are_chained_one_after_another():
+    ledmap = LedMap.fromConfig(
+        {"panels": {"width": 2, "height": 2, "columns": 2, "rows": 1}}, 4, 2
+    )
+    output = ledmap.apply(numbered(4, 2))
+    # the whole left panel comes before the right one
+    assert output[..., 0].reshape(-1).tolist() == [0, 1, 4, 5, 2, 3, 6, 7]
+
+
+def test_panels_must_cover_the_matrix():
+    try:
+        LedMap.fromConfig(
+            {"panels": {"width": 2, "height": 2, "columns": 2, "rows": 1}}, 4, 4
+        )
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("a panel grid smaller than the matrix was accepted")
+
+
+def test_wled_ledmap_is_inverted_and_unmapped_leds_stay_dark():
+    # pixel 0 drives LED 2, pixel 1 LED 0, pixel 2 is not shown, LED 1 is unused
+    ledmap = LedMap.fromLedmap({"map": [2, 0, -1]}, 3)
+    assert ledmap.indices.tolist() == [1, -1, 0]
+
+    frame = np.full((1, 3, 3), 50, np.uint8)
+    frame[0, :, 0] = [10, 20, 30]
+    output = ledmap.apply(frame)
+    assert output[0, :, 0].tolist() == [20, 0, 10]
+    assert output[0, 1].tolist() == [0, 0, 0]
+
+    # the output buffer is reused
+    assert ledmap.apply(frame) is output
+
+
+def test_ledmap_file_is_loaded(tmp_path):
+    path = tmp_path / "ledmap.json"
+    path.write_text(json.dumps({"map": [1, 0]}))
+    ledmap = LedMap.fromConfig(str(path), 2, 1)
+    assert ledmap.indices.tolist() == [1, 0]
+    assert ledmap.key == ("ledmap", str(path))
@@ -0,0 +1,40 @@
+from src.utils.load_shedder import LoadShedder
+
+LEVELS = [("normal", 1.0), ("preview", 1.1), ("interpolation", 1.25), ("output_fps", 2.0)]
+
+
+def feed(shedder, usage, frames):
+    for _ in range(frames):
+        shedder.update(usage, 1.0)
+
+
+def test_overload_steps_down_once_per_window():
+    applied = []
+    shedder = LoadShedder(LEVELS, applied.append, window=10)
+    feed(shedder, 1.2, 9)
+    assert applied == []
+    feed(shedder, 1.2, 1)
+    assert applied == [1]
+    feed(shedder, 1.2, 25)
+    assert applied == [1, 2, 3]
+    # there is no deeper level
+    feed(shedder, 1.2, 10)
+    assert shedder.level_name == "output_fps"
+
+
+def test_level_is_only_undone_with_headroom_for_its_cost():
+    applied = []
+    shedder = LoadShedder(LEVELS, applied.append, window=10)
+    feed(shedder, 1.0, 30)
+    assert shedder.level == 3
+    # halving the FPS again would double usage to 0.9, above `low`
+    feed(shedder, 0.45, 10)
+    assert shedder.level == 3
+    feed(shedder, 0.3, 10)
+    assert shedder.level == 2
+
+    feed(shedder, 0.8, 10)
+    assert shedder.level == 2
+    stats = shedder.stats
+    assert (stats["steps_down"], stats["steps_up"]) == (3, 1)
+    assert set(stats["seconds"]) == {name for name, _ in LEVELS}
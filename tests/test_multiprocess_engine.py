@@ -0,0 +1,97 @@
+import functools
+import multiprocessing
+import time
+
+import numpy as np
+from conftest import Receiver
+
+from src.managers.multiprocess_engine import MultiprocessEngine, split_groups
+from src.utils.shared_frame_ring import SharedFrameRing
+
+
+class CountingSource:
+    """
+    `count` gray frames getting brighter by 5, picklable for the source
+    process.
+    """
+
+    def __init__(self, count):
+        self.count = count
+        self.position = 0
+
+    def read(self):
+        if self.position >= self.count:
+            return None
+        self.position += 1
+        return np.full((16, 16, 3), self.position * 5, np.uint8)
+
+    def stop(self):
+        pass
+
+
+def test_groups_are_consecutive_and_balanced():
+    assert split_groups(list(range(7)), 3) == [[0, 1, 2], [3, 4], [5, 6]]
+    assert split_groups([1], 4) == [[1]]
+
+
+def test_ring_hands_out_the_newest_frame():
+    condition = multiprocessing.Condition()
+    ring = SharedFrameRing.create((4, 4, 3), np.uint8, 2, condition)
+    reader = SharedFrameRing.attach(*ring.description, condition)
+    for value in (1, 2, 3):
+        ring.publish(np.full((4, 4, 3), value, np.uint8))
+
+    sequence, frame = reader.wait_newer(0, timeout=1)
+    assert sequence == 3
+    assert frame[0, 0, 0] == 3
+    assert not frame.flags.writeable
+    # frame 1 has been overwritten by frame 3
+    assert reader.intact(3) and not reader.intact(1)
+
+    # frames of another resolution are scaled into the slot
+    ring.publish(np.full((8, 8, 3), 9, np.uint8))
+    sequence, frame = reader.wait_newer(3, timeout=1)
+    assert frame.shape == (4, 4, 3) and frame.min() == 9
+
+    ring.close()
+    assert reader.wait_newer(sequence, timeout=1) is None
+    del frame
+    reader.release()
+    ring.release()
+
+
+def test_workers_stream_every_device():
+    receivers = [Receiver(), Receiver()]
+    configs = [
+        {
+            "host": "127.0.0.1",
+            "port": receiver.port,
+            "protocol": "dnrgb",
+            "width": 8,
+            "height": 8,
+            "gamma": 1.0,
+        }
+        for receiver in receivers
+    ]
+    previews = []
+    engine = MultiprocessEngine(
+        functools.partial(CountingSource, 40),
+        configs,
+        20,
+        processes=2,
+        preview=lambda frame: previews.append(frame.shape),
+    )
+    engine.start()
+    deadline = time.perf_counter() + 20
+    while engine.is_alive() and time.perf_counter() < deadline:
+        time.sleep(0.05)
+    engine.stop()
+    assert engine.error is None
+
+    for receiver in receivers:
+        values = [packet[4] for packet in receiver.receive_all()]
+        # workers may skip frames, never reorder them, and end on the last
+        assert values == sorted(values)
+        assert values[-1] == 200
+        receiver.socket.close()
+    assert previews and set(previews) == {(8, 8, 3)}
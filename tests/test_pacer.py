@@ -0,0 +1,69 @@
+import time
+from collections import Counter
+
+import numpy as np
+
+from src.managers.streamer_manager import StreamerManager
+from src.streamers.pacer import TokenBucket
+from src.streamers.udpstreamer import UDPWLEDStreamer
+
+
+def test_token_bucket_delays_past_the_burst():
+    bucket = TokenBucket(rate=1000, capacity=100)
+    now = time.perf_counter()
+    assert bucket.reserve(100) <= time.perf_counter()
+    # the next 50 bytes are covered 50 ms later
+    assert bucket.reserve(50) - now >= 0.045
+
+
+def test_small_budget_updates_every_packet_in_turn(receiver):
+    # 9 packets of 1444 bytes a frame, the budget covers about 7 of them
+    streamer = UDPWLEDStreamer(
+        "127.0.0.1",
+        receiver.port,
+        width=64,
+        height=64,
+        protocol="dnrgb",
+        pacing=True,
+        max_bytes_per_second=100000,
+        frame_interval=1 / 15,
+    )
+    frame = np.zeros((64, 64, 3), np.uint8)
+    for index in range(20):
+        frame[:] = index
+        streamer.prepareFrame(frame)
+        streamer.commitFrame()
+        time.sleep(1 / 15)
+    time.sleep(0.2)
+    streamer.close()
+    stats = streamer.pacing_stats
+
+    starts = Counter(int.from_bytes(packet[2:4], "big") for packet in receiver.receive_all())
+    assert set(starts) == set(range(0, 64 * 64, 480))
+    # the packets a frame misses go first with the next one, so all of
+    # them are sent about equally often, not just with the last frame
+    assert min(starts.values()) >= 6
+    assert stats["packets_carried"] > 0
+
+
+def test_paced_streamers_are_left_out_of_the_commit_skew(receiver):
+    def config(pacing):
+        return dict(
+            host="127.0.0.1", port=receiver.port, width=8, height=8, protocol="dnrgb", pacing=pacing
+        )
+
+    manager = StreamerManager([config(True), config(True)], sync_commit=True)
+    frame = np.zeros((8, 8, 3), np.uint8)
+    for _ in range(3):
+        manager.process_and_send_frame(frame)
+    time.sleep(0.1)
+    manager.close_all()
+    assert manager.sync_stats["frames"] == 0
+    # the frames were still sent
+    assert len(receiver.receive_all()) >= 2
+
+    manager = StreamerManager([config(True), config(False)], sync_commit=True)
+    for _ in range(3):
+        manager.process_and_send_frame(frame)
+    manager.close_all()
+    assert manager.sync_stats["frames"] == 3
@@ -0,0 +1,104 @@
+import errno
+import socket
+
+import numpy as np
+from conftest import Receiver, gradient, send_frame
+
+from src.streamers.packetengine import PacketEngine
+from src.streamers.udpstreamer import UDPWLEDStreamer
+
+
+def test_layout_places_headers_before_each_payload():
+    engine = PacketEngine(10, 4, 2, payload_align=2)
+    assert engine.packets == [(0, 4, 0, 14), (4, 4, 14, 14), (8, 2, 28, 8)]
+    engine.setHeaderByte(1, 7)
+    engine.write(gradient(5, 2))
+    assert bytes(engine.header(2)) == bytes([0, 7])
+    np.testing.assert_array_equal(engine.payload(1), gradient(5, 2).reshape(-1, 3)[4:8])
+    assert len(engine.buffer) == 36
+
+
+def test_dnrgb_packets_carry_start_index(receiver):
+    streamer = UDPWLEDStreamer("127.0.0.1", receiver.port, width=40, height=20, protocol="dnrgb")
+    frame = gradient(40, 20)
+    send_frame(streamer, frame)
+    first, second = receiver.receive(2)
+    streamer.close()
+
+    pixels = frame.reshape(-1)
+    assert first[:4] == bytes([4, 2, 0, 0])
+    assert first[4:] == pixels[: 480 * 3].tobytes()
+    assert second[:4] == bytes([4, 2, 480 >> 8, 480 & 0xFF])
+    assert second[4:] == pixels[480 * 3 :].tobytes()
+
+
+def test_drgb_frame_is_one_packet(receiver):
+    streamer = UDPWLEDStreamer("127.0.0.1", receiver.port, width=16, height=16, protocol="drgb")
+    frame = gradient(16, 16)
+    send_frame(streamer, frame)
+    (packet,) = receiver.receive(1)
+    streamer.close()
+    assert packet == bytes([2, 2]) + frame.tobytes()
+
+
+def test_partial_sends_and_mirrors(receiver):
+    mirror = Receiver()
+    engine = PacketEngine(12, 4, 1)
+    for index in range(3):
+        engine.header(index)[0] = index
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    mirror_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    engine.connect(sock, [("127.0.0.1", receiver.port)])
+    engine.addMirror(mirror_sock, [("127.0.0.1", mirror.port)])
+    engine.write(gradient(4, 3))
+
+    assert engine.send([2, 0]) == 2
+    assert [packet[0] for packet in receiver.receive(2)] == [2, 0]
+    assert [packet[0] for packet in mirror.receive(2)] == [2, 0]
+    # the reused header array holds no leftovers from the last call
+    assert engine.send([1]) == 1
+    assert receiver.receive(1)[0] == bytes(engine.packet(1))
+    assert receiver.nothing_received()
+    sock.close()
+    mirror_sock.close()
+    mirror.socket.close()
+
+
+def test_changed_packets_follow_the_last_sent_payloads():
+    engine = PacketEngine(12, 4, 1)
+    engine.trackChanges()
+    frame = gradient(4, 3)
+    engine.write(frame)
+    assert engine.changedPackets().tolist() == [True, True, True]
+    engine.markSent()
+    assert engine.changedPackets().tolist() == [False, False, False]
+
+    frame[2, 3] += 1
+    engine.write(frame)
+    assert engine.changedPackets().tolist() == [False, False, True]
+    # header changes don't count
+    engine.setHeaderByte(0, 9)
+    engine.markSent([2])
+    assert engine.changedPackets().tolist() == [False, False, False]
+
+
+class ConnectedSocket(socket.socket):
+    """
+    Refuses an address once connected, like macOS does with EISCONN.
+    """
+
+    def sendto(self, data, address):
+        try:
+            self.getpeername()
+        except OSError:
+            return super().sendto(data, address)
+        raise OSError(errno.EISCONN, "Socket is already connected")
+
+
+def test_raw_packets_use_the_connection(receiver):
+    engine = PacketEngine(4, 4, 1)
+    sock = ConnectedSocket(socket.AF_INET, socket.SOCK_DGRAM)
+    engine.connect(sock, [("127.0.0.1", receiver.port)])
+    engine.sendRaw(b"push")
+    assert receiver.receive(1) == [b"push"]
+    sock.close()
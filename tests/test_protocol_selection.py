@@ -0,0 +1,83 @@
+import pytest
+
+from src.managers import streamer_manager
+from src.managers.streamer_manager import StreamerManager, parse_wled_version, protocol_costs
+
+
+def test_wled_versions_compare_numerically():
+    assert parse_wled_version("0.14.0-b1") == (0, 14, 0)
+    assert parse_wled_version("0.9") == (0, 9, 0)
+    assert parse_wled_version("") == (0, 0, 0)
+    assert parse_wled_version("0.10.2") > parse_wled_version("0.9.1")
+
+
+def test_small_matrices_fit_one_drgb_packet():
+    costs = protocol_costs(256, "0.14.0")
+    assert costs["drgb"] == (1, 256 * 3 + 2 + 28)
+    assert min(costs, key=costs.get) == "drgb"
+
+
+def test_fewest_packets_win_then_fewest_bytes():
+    # 480 LEDs per DNRGB packet, 487 per DDP packet
+    costs = protocol_costs(1450, "0.14.0")
+    assert "drgb" not in costs
+    assert (costs["dnrgb"][0], costs["ddp"][0]) == (4, 3)
+    assert min(costs, key=costs.get) == "ddp"
+
+    # same packet count, DNRGB has the smaller header
+    costs = protocol_costs(64 * 64, "0.14.0")
+    assert costs["dnrgb"][0] == costs["ddp"][0] == 9
+    assert min(costs, key=costs.get) == "dnrgb"
+
+    # WLED before 0.11 has no DDP input
+    assert "ddp" not in protocol_costs(1450, "0.10.2")
+
+
+def test_dnrgb_start_index_limits_the_led_count():
+    assert "dnrgb" not in protocol_costs(70000, "0.14.0")
+    assert "ddp" in protocol_costs(70000, "0.14.0")
+
+
+class Info:
+    def __init__(self, count):
+        self.count = count
+
+    def json(self):
+        return {"leds": {"count": self.count}, "ver": "0.14.0"}
+
+
+@pytest.fixture
+def device_info(monkeypatch):
+    requests_made = []
+
+    def get(url, timeout):
+        requests_made.append(url)
+        return Info(256)
+
+    monkeypatch.setattr(StreamerManager, "_device_info", {})
+    monkeypatch.setattr(streamer_manager.requests, "get", get)
+    return requests_made
+
+
+def config(port, **options):
+    return dict(dict(host="127.0.0.1", port=port, width=16, height=16, protocol="auto"), **options)
+
+
+def test_auto_protocol_honours_delta(device_info, receiver):
+    manager = StreamerManager([config(receiver.port)])
+    assert manager.streamers[0].protocol == "drgb"
+    manager.close_all()
+
+    manager = StreamerManager([config(receiver.port, delta=True)])
+    assert manager.streamers[0].protocol == "dnrgb"
+    assert manager.streamers[0].delta
+    manager.close_all()
+
+    # the device was only asked once
+    assert len(device_info) == 1
+
+
+def test_ignored_udp_options_are_reported(device_info, receiver, caplog):
+    manager = StreamerManager([config(receiver.port, protocol="ddp", delta=True, pacing=True)])
+    manager.close_all()
+    assert "delta, pacing only work(s) with DRGB/DNRGB, ignored for DDP" in caplog.text
@@ -0,0 +1,94 @@
+import cv2
+import numpy as np
+
+from src.utils.static_content_gate import StaticContentGate
+
+
+def led_frame(frame, size=(32, 32)):
+    return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+
+def test_small_moving_sprite_is_streamed():
+    gate = StaticContentGate((32, 32), keepalive=100)
+    frame = np.zeros((1080, 1920, 3), np.uint8)
+    last_sent = None
+    changes = 0
+    for step in range(30):
+        frame[:] = 0
+        frame[500:520, 100 + step * 10 : 120 + step * 10] = 255
+        led = led_frame(frame)
+        sent = gate.should_send(frame)
+        if last_sent is None or cv2.absdiff(led, last_sent).max() > gate.tolerance:
+            changes += 1
+            assert sent, f"moving frame {step} was dropped"
+        if sent:
+            last_sent = led
+    assert changes > 10
+    assert gate.frames - gate.static == changes
+
+
+def test_unchanged_frames_only_get_keepalives():
+    gate = StaticContentGate((32, 32), keepalive=0)
+    image = np.full((720, 1280, 3), 40, np.uint8)
+    image.flags.writeable = False
+    assert gate.should_send(image)
+    assert gate.should_send(image)
+    assert gate.keepalives == 1
+
+    gate.keepalive = 100
+    assert not gate.should_send(image)
+    noisy = image.copy()
+    noisy[::7, ::5] += 1
+    assert not gate.should_send(noisy)
+    assert gate.static == 2
+
+
+def test_new_resolution_is_streamed():
+    gate = StaticContentGate((16, 16), keepalive=100)
+    assert gate.should_send(np.zeros((100, 200, 3), np.uint8))
+    assert gate.should_send(np.zeros((8, 8, 3), np.uint8))
+    assert not gate.should_send(np.zeros((8, 8, 3), np.uint8))
+
+
+def test_keepalives_are_reported():
+    keepalives = []
+    gate = StaticContentGate((8, 8), keepalive=0, on_keepalive=lambda: keepalives.append(1))
+    frame = np.zeros((8, 8, 3), np.uint8)
+    assert gate.should_send(frame)
+    assert keepalives == []
+    assert gate.should_send(frame.copy())
+    assert keepalives == [1]
+
+
+def test_changes_are_compared_after_the_streamer_geometry():
+    frame = np.zeros((1000, 1000, 3), np.uint8)
+    changed = frame.copy()
+    changed[500:510, 500:510] = 255
+
+    # averaged over the whole frame the patch stays within the tolerance
+    gate = StaticContentGate((8, 8), keepalive=100)
+    assert gate.should_send(frame)
+    assert not gate.should_send(changed)
+
+    # the streamers only show the cropped middle, where it does count
+    cropped = [((100, 100, 100, 100), "stretch", 8, 8, cv2.INTER_AREA)]
+    gate = StaticContentGate((8, 8), keepalive=100, geometries=lambda: cropped)
+    assert gate.should_send(frame)
+    assert gate.should_send(changed)
+    assert not gate.should_send(changed.copy())
+
+
+def test_nearest_sampled_pixels_count_in_full():
+    geometries = [((), "stretch", 8, 8, cv2.INTER_AREA)]
+    gate = StaticContentGate((8, 8), keepalive=100, geometries=lambda: geometries)
+    frame = np.zeros((80, 80, 3), np.uint8)
+    changed = frame.copy()
+    changed[0, 0] = 150
+    assert gate.should_send(frame)
+    assert not gate.should_send(changed)
+
+    # switching to nearest-neighbour, as the load shedder does, is a new
+    # stage, after which the sampled pixel alone is a change
+    geometries[0] = ((), "stretch", 8, 8, cv2.INTER_NEAREST)
+    assert gate.should_send(frame)
+    assert gate.should_send(changed)
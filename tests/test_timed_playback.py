@@ -0,0 +1,67 @@
+import numpy as np
+
+from src.capture import timed_playback
+from src.capture.timed_playback import TimedPlayback
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 0.0
+
+    def perf_counter(self):
+        return self.now
+
+
+class CountingSource:
+    fps = 30
+
+    def __init__(self, frames=100):
+        self.frames = frames
+        self.position = 0
+        self.decoded = []
+
+    def grab(self):
+        if self.position >= self.frames:
+            return False
+        self.position += 1
+        return True
+
+    def read(self):
+        if self.position >= self.frames:
+            return None
+        self.decoded.append(self.position)
+        self.position += 1
+        return np.full((2, 2, 3), self.position - 1, np.uint8)
+
+    def stop(self):
+        pass
+
+
+def play(monkeypatch, speed, reads, interval):
+    clock = FakeTime()
+    monkeypatch.setattr(timed_playback, "time", clock)
+    playback = TimedPlayback(CountingSource, speed=speed)
+    frames = []
+    for _ in range(reads):
+        frames.append(int(playback.read()[0, 0, 0]))
+        clock.now += interval
+    return playback, frames
+
+
+def test_slow_reads_skip_frames_without_reading_them(monkeypatch):
+    playback, frames = play(monkeypatch, 1.0, 5, 0.1)
+    # 30 FPS video read at 10 FPS shows every third frame
+    assert frames == [0, 3, 6, 9, 12]
+    assert playback.source.decoded == frames
+    assert playback.skipped == 8
+
+
+def test_fast_reads_repeat_the_last_frame(monkeypatch):
+    playback, frames = play(monkeypatch, 1.0, 4, 1 / 60)
+    assert frames == [0, 0, 1, 1]
+    assert playback.repeated == 2
+
+
+def test_speed_scales_the_video_clock(monkeypatch):
+    _, frames = play(monkeypatch, 2.0, 4, 0.1)
+    assert frames == [0, 6, 12, 18]